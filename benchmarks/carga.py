@@ -0,0 +1,266 @@
+"""
+Teste de carga da API com banco sintético grande.
+
+Popula um banco SQLite temporário com o gerador sintético
+(src/database/sintetico.py, semente fixa) e executa uma carga mista de
+leituras e escritas por alguns segundos, com várias threads:
+
+    - processo: create_app() chamado em processo, pelo test_client do Flask
+    - wsgi: servidor WSGI local (werkzeug, com threads) acessado por HTTP
+
+Para cada modo e endpoint informa req/s, latência (p50, p90, p99, máxima) e
+respostas com erro, e grava tudo em um JSON (com o commit atual) para
+comparar execuções.
+
+Uso: python -m benchmarks.carga [--segundos 10] [--threads 8] [--modos processo wsgi]
+                                [--livros 50000] [--saida arquivo.json]
+"""
+import argparse
+import http.client
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from sqlalchemy import insert
+from werkzeug.serving import WSGIRequestHandler, make_server
+from src.app import create_app
+from src.database.models import db, Usuario, Participa
+from src.database import sintetico
+from src.database import model_validation as validator
+
+# Usuários reservados às escritas da carga, sem avaliações no banco inicial:
+# cada avaliação escrita usa um par (usuário, livro) ainda inexistente
+ESCRITORES = 100
+
+# Operação -> peso na carga mista
+OPERACOES = {
+    'GET /livros/buscar': 40,
+    'GET /livros/<id>': 20,
+    'GET /clube/<id>/livros': 20,
+    'GET /usuarios/login/': 10,
+    'POST /livros/avaliar': 7,
+    'POST /clube/livros': 3,
+}
+
+
+def popular(escala: sintetico.Escala):
+    """
+    Grava o banco sintético (src/database/sintetico.py) e os usuários escritores,
+    que participam de todos os clubes.
+    """
+    sintetico.gerar(escala)
+    escritores = [f'E{i}' for i in range(ESCRITORES)]
+    db.session.execute(insert(Usuario), [
+        {'id': id, 'email': f'{id.lower()}@bookbridge.com', 'senha': sintetico.SENHA, 'nickname': id.lower(),
+         'nome': 'Escritor', 'sobrenome': id}
+        for id in escritores
+    ])
+    db.session.execute(insert(Participa), [
+        {'usuario_id': id, 'clube_id': sintetico.clube_id(c)} for id in escritores for c in range(escala.clubes)
+    ])
+    db.session.commit()
+
+
+def percentil(ordenados: list, p: float) -> float:
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+class Carga:
+    """Gera as requisições da carga mista; o mesmo objeto é usado por todas as threads."""
+
+    def __init__(self, escala: sintetico.Escala, tokens: list):
+        self.livros, self.usuarios, self.clubes = escala.livros, escala.usuarios, escala.clubes
+        self.autores = escala.autores
+        self.tokens = tokens
+        self.semente = escala.semente
+        self.escritas = itertools.count()
+        self.nomes, self.pesos = zip(*OPERACOES.items())
+
+    def requisicao(self, aleatorio: random.Random):
+        """Retorna (operação, método, caminho, corpo JSON, token)."""
+        operacao = aleatorio.choices(self.nomes, self.pesos)[0]
+        if operacao == 'GET /livros/buscar':
+            return operacao, 'GET', f'/livros/buscar?autor=Autor%20{aleatorio.randrange(self.autores)}', None, None
+        if operacao == 'GET /livros/<id>':
+            return operacao, 'GET', f'/livros/{sintetico.livro_id(aleatorio.randrange(self.livros))}', None, None
+        if operacao == 'GET /clube/<id>/livros':
+            return operacao, 'GET', f'/clube/{sintetico.clube_id(aleatorio.randrange(self.clubes))}/livros', None, None
+        if operacao == 'GET /usuarios/login/':
+            return operacao, 'GET', '/usuarios/login/', {'email': f'u{aleatorio.randrange(self.usuarios)}@bookbridge.com', 'senha': sintetico.SENHA}, None
+
+        # Escritas: o contador compartilhado garante pares (escritor, livro) inéditos
+        n = next(self.escritas)
+        escritor, livro = n % ESCRITORES, (n // ESCRITORES) % self.livros
+        if operacao == 'POST /livros/avaliar':
+            corpo = {'livro_id': sintetico.livro_id(livro), 'estrelas': aleatorio.randint(1, 5), 'descricao': 'Avaliação da carga'}
+            return operacao, 'POST', '/livros/avaliar', corpo, self.tokens[escritor]
+        corpo = {'clube_id': sintetico.clube_id(aleatorio.randrange(self.clubes)), 'livro_id': sintetico.livro_id(livro)}
+        return operacao, 'POST', '/clube/livros', corpo, self.tokens[escritor]
+
+
+def executar(enviar_fabrica, carga: Carga, threads: int, segundos: float) -> dict:
+    """
+    Executa a carga com `threads` threads por `segundos`. `enviar_fabrica()` cria,
+    para cada thread, a função enviar(método, caminho, corpo, headers) -> status.
+    """
+    latencias = defaultdict(list)
+    status = defaultdict(Counter)
+    trava = threading.Lock()
+    inicio_geral = time.perf_counter()
+    fim = inicio_geral + segundos
+
+    def trabalhar(indice: int):
+        aleatorio = random.Random(carga.semente * 1000 + indice)
+        enviar = enviar_fabrica()
+        locais, codigos = defaultdict(list), defaultdict(Counter)
+        while time.perf_counter() < fim:
+            operacao, metodo, caminho, corpo, token = carga.requisicao(aleatorio)
+            headers = {'Content-Type': 'application/json'}
+            if token:
+                headers['Authorization'] = f'Bearer {token}'
+            inicio = time.perf_counter()
+            codigo = enviar(metodo, caminho, json.dumps(corpo) if corpo is not None else None, headers)
+            locais[operacao].append(time.perf_counter() - inicio)
+            codigos[operacao][codigo] += 1
+        with trava:
+            for operacao, valores in locais.items():
+                latencias[operacao] += valores
+                status[operacao].update(codigos[operacao])
+
+    trabalhadores = [threading.Thread(target=trabalhar, args=(i,)) for i in range(threads)]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    duracao = time.perf_counter() - inicio_geral
+
+    resultado = {}
+    for operacao in carga.nomes:
+        if not (valores := sorted(latencias[operacao])):
+            continue
+        erros = sum(total for codigo, total in status[operacao].items() if codigo >= 400)
+        resultado[operacao] = {
+            'requisicoes': len(valores),
+            'req/s': round(len(valores) / duracao, 1),
+            'p50_ms': round(percentil(valores, 50) * 1000, 2),
+            'p90_ms': round(percentil(valores, 90) * 1000, 2),
+            'p99_ms': round(percentil(valores, 99) * 1000, 2),
+            'max_ms': round(valores[-1] * 1000, 2),
+            'erros': erros,
+            'status': {str(codigo): total for codigo, total in sorted(status[operacao].items())},
+        }
+    total = sum(item['requisicoes'] for item in resultado.values())
+    resultado['total'] = {'requisicoes': total, 'req/s': round(total / duracao, 1)}
+    return resultado
+
+
+def cliente_processo(app):
+    def fabrica():
+        cliente = app.test_client()
+
+        def enviar(metodo, caminho, corpo, headers):
+            return cliente.open(caminho, method=metodo, data=corpo, headers=headers).status_code
+        return enviar
+    return fabrica
+
+
+def cliente_wsgi(porta: int):
+    def fabrica():
+        # Uma conexão keep-alive por thread
+        conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=30)
+
+        def enviar(metodo, caminho, corpo, headers):
+            conexao.request(metodo, caminho, body=corpo, headers=headers)
+            resposta = conexao.getresponse()
+            resposta.read()
+            return resposta.status
+        return enviar
+    return fabrica
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir(modo: str, resultado: dict):
+    print(f'\n[{modo}]')
+    print(f"{'operação':28} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'máx ms':>8} {'erros':>6}")
+    for operacao, item in resultado.items():
+        if operacao == 'total':
+            continue
+        print(f"{operacao:28} {item['req/s']:8} {item['p50_ms']:8} {item['p90_ms']:8} {item['p99_ms']:8} {item['max_ms']:8} {item['erros']:6}")
+    print(f"{'total':28} {resultado['total']['req/s']:8}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--modos', nargs='+', choices=['processo', 'wsgi'], default=['processo', 'wsgi'])
+    parser.add_argument('--livros', type=int, default=50000)
+    parser.add_argument('--usuarios', type=int, default=10000)
+    parser.add_argument('--clubes', type=int, default=1000)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--perfil', default='production', help='DATABASE_PERFIL do app')
+    parser.add_argument('--saida', help='arquivo JSON (padrão: benchmarks/resultados/carga-<data>-<commit>.json)')
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(pasta, 'carga.db')}",
+        'DATABASE_PERFIL': args.perfil,
+        'LOG_ARQUIVO': os.path.join(pasta, 'carga.log'),
+        'LOG_NIVEL': 'WARNING',
+        'LOG_CONSOLE': False,
+    })
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    escala = sintetico.Escala(usuarios=args.usuarios, clubes=args.clubes, livros=args.livros, semente=args.semente)
+    inicio = time.perf_counter()
+    with app.app_context():
+        popular(escala)
+        tokens = [validator.get_token(f'E{i}') for i in range(ESCRITORES)]
+    print(f'Banco sintético populado em {time.perf_counter() - inicio:.1f} s ({pasta})')
+
+    carga = Carga(escala, tokens)
+    resultados = {}
+    for modo in args.modos:
+        # Cada modo começa com o cache de respostas vazio
+        app.cache.clear()
+        if modo == 'processo':
+            resultados[modo] = executar(cliente_processo(app), carga, args.threads, args.segundos)
+        else:
+            WSGIRequestHandler.protocol_version = 'HTTP/1.1'
+            servidor = make_server('127.0.0.1', 0, app, threaded=True)
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            try:
+                resultados[modo] = executar(cliente_wsgi(servidor.server_port), carga, args.threads, args.segundos)
+            finally:
+                servidor.shutdown()
+        imprimir(modo, resultados[modo])
+
+    commit = commit_atual()
+    data = datetime.now(timezone.utc)
+    saida = args.saida or os.path.join(
+        os.path.dirname(__file__), 'resultados', f"carga-{data:%Y%m%d-%H%M%S}-{commit or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as arquivo:
+        json.dump({
+            'commit': commit,
+            'data': data.isoformat(),
+            'parametros': vars(args),
+            'resultados': resultados,
+        }, arquivo, ensure_ascii=False, indent=2)
+    print(f'\nResultados gravados em {saida}')
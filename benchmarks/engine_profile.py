@@ -0,0 +1,103 @@
+"""
+Benchmark de vazão de leitura/escrita do SQLite com e sem o perfil de engine.
+
+Cria um banco temporário para cada perfil, popula a tabela livro e executa,
+durante alguns segundos, threads leitoras (busca de livro por id) em paralelo
+com threads escritoras (inserção de avaliações, um commit por escrita).
+
+Uso: python -m benchmarks.engine_profile [--segundos 5] [--leitores 4] [--escritores 2]
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from src.database.models import db
+from src.database import engine as db_engine
+
+# Pragmas padrão do SQLite (journal em arquivo, synchronous=FULL), sem pool dimensionado
+PERFIS = {
+    'sem perfil': {'pragmas': {}, 'pool': {}},
+    **db_engine.PERFIS,
+}
+
+
+def preparar(caminho: str, livros: int):
+    engine = create_engine(f'sqlite:///{caminho}')
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            text('INSERT INTO livro (id, autor, nome, genero, descricao) VALUES (:id, :autor, :nome, :genero, :descricao)'),
+            [{'id': f'L{i}', 'autor': f'Autor {i % 500}', 'nome': f'Livro {i}', 'genero': 'Romance', 'descricao': 'x' * 200}
+             for i in range(livros)]
+        )
+    engine.dispose()
+
+
+def executar(nome: str, configuracao: dict, segundos: float, leitores: int, escritores: int, livros: int) -> dict:
+    caminho = os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+    preparar(caminho, livros)
+
+    engine = create_engine(f'sqlite:///{caminho}', connect_args={'check_same_thread': False}, **configuracao['pool'])
+    db_engine.aplicar_pragmas(engine, configuracao['pragmas'])
+
+    contadores = {'leituras': 0, 'escritas': 0, 'travado': 0}
+    lock = threading.Lock()
+    fim = time.monotonic() + segundos
+
+    def ler():
+        n = 0
+        with engine.connect() as conn:
+            while time.monotonic() < fim:
+                conn.execute(text('SELECT * FROM livro WHERE id = :id'), {'id': f'L{random.randrange(livros)}'}).all()
+                conn.rollback()
+                n += 1
+        with lock:
+            contadores['leituras'] += n
+
+    def escrever(indice: int):
+        n = travado = 0
+        while time.monotonic() < fim:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text('INSERT INTO avaliacao (avaliador_id, livro_id, estrelas, data_avaliacao) VALUES (:u, :l, :e, CURRENT_TIMESTAMP)'),
+                        {'u': f'U{indice}-{n}', 'l': f'L{random.randrange(livros)}', 'e': random.randint(0, 5)}
+                    )
+                n += 1
+            except OperationalError:
+                travado += 1
+        with lock:
+            contadores['escritas'] += n
+            contadores['travado'] += travado
+
+    threads = [threading.Thread(target=ler) for _ in range(leitores)]
+    threads += [threading.Thread(target=escrever, args=(i,)) for i in range(escritores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        'perfil': nome,
+        'leituras/s': round(contadores['leituras'] / segundos),
+        'escritas/s': round(contadores['escritas'] / segundos),
+        'erros de trava': contadores['travado'],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--leitores', type=int, default=4)
+    parser.add_argument('--escritores', type=int, default=2)
+    parser.add_argument('--livros', type=int, default=20000)
+    args = parser.parse_args()
+
+    for nome, configuracao in PERFIS.items():
+        resultado = executar(nome, configuracao, args.segundos, args.leitores, args.escritores, args.livros)
+        print(' | '.join(f'{chave}: {valor}' for chave, valor in resultado.items()))
@@ -0,0 +1,73 @@
+"""
+Microbenchmark do custo do log na thread da requisição.
+
+Compara o FileHandler e o console síncronos com f-string (configuração antiga)
+com a fila assíncrona de src/utils/logs.py usando formatação lazy, com e sem
+amostragem dos registros INFO. Mede apenas o tempo das chamadas ao logger; a
+gravação pendente na fila é descarregada fora da medição.
+
+Uso: python -m benchmarks.logs [--registros 20000] [--repeticoes 5]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import timeit
+from flask import Flask
+from src.utils import logs
+
+LIVROS = [{'id': f'L{i:03}', 'nome': f'Livro {i}', 'autor': 'Autor', 'media_avaliacoes': 4.5} for i in range(50)]
+
+
+def _app(arquivo, **config):
+    app = Flask('benchmark_logs')
+    app.config.update({
+        'LOG_ARQUIVO': arquivo,
+        'LOG_NIVEL': 'DEBUG',
+        'LOG_TAMANHO_MAXIMO': 1024 * 1024 * 1024,
+        'LOG_BACKUPS': 1,
+        'LOG_AMOSTRAGEM': {},
+        'LOG_CONSOLE': True,
+        'LOG_ASSINCRONO': True,
+        **config
+    })
+    return app
+
+
+def medir(nome, funcao, repeticoes, registros):
+    melhor = min(timeit.repeat(funcao, number=1, repeat=repeticoes))
+    print(f'{nome:45} {melhor * 1e6 / registros:8.2f} us/registro')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--registros', type=int, default=20000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+    pasta = tempfile.mkdtemp()
+
+    logger = logging.getLogger('benchmark_logs_antigo')
+    logger.propagate = False
+    antigo = logging.FileHandler(os.path.join(pasta, 'antigo.log'))
+    antigo.setFormatter(logging.Formatter(logs.FORMATO))
+    logger.addHandler(antigo)
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.DEBUG)
+
+    def sincrono():
+        for _ in range(args.registros):
+            logger.info(f'Livros encontrados no clube C001: {LIVROS}')
+
+    medir('FileHandler + console síncronos, f-string', sincrono, args.repeticoes, args.registros)
+
+    for nome, amostragem in (('fila + formatação lazy', {}), ('fila + lazy + amostragem INFO 1%', {'INFO': 0.01})):
+        app = _app(os.path.join(pasta, 'novo.log'), LOG_AMOSTRAGEM=amostragem)
+        listener = logs.configurar(app)
+        app.logger.propagate = False
+
+        def assincrono():
+            for _ in range(args.registros):
+                app.logger.info('Livros encontrados no clube %s: %s', 'C001', LIVROS)
+
+        medir(nome, assincrono, args.repeticoes, args.registros)
+        logs._parar(listener)
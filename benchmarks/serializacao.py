@@ -0,0 +1,71 @@
+"""
+Microbenchmark da serialização de listagens com 10k livros.
+
+Compara o caminho antigo (entidades do ORM + to_dict percorrendo
+__table__.columns + jsonify com o json da biblioteca padrão) com o novo
+(somente as colunas + serializador gerado + JSONProvider com orjson), por
+etapa e de ponta a ponta.
+
+Uso: python -m benchmarks.serializacao [--livros 10000] [--repeticoes 5]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import timeit
+from flask.json.provider import DefaultJSONProvider
+from src.app import create_app
+from src.database.models import db, Livro
+
+
+def to_dict_antigo(livro):
+    return {c.name: getattr(livro, c.name) for c in livro.__table__.columns}
+
+
+def medir(nome, funcao, repeticoes):
+    melhor = min(timeit.repeat(funcao, number=1, repeat=repeticoes))
+    print(f'{nome:45} {melhor * 1000:8.1f} ms')
+    return melhor
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--livros', type=int, default=10000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(), 'serializacao.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{caminho}'})
+    app.logger.setLevel(logging.WARNING)
+    padrao = DefaultJSONProvider(app)
+
+    with app.app_context():
+        db.session.execute(db.insert(Livro), [
+            {'id': f'L{i:06d}', 'nome': f'Livro {i}', 'autor': 'Autor Benchmark', 'genero': 'Romance', 'descricao': 'Descrição ' * 20}
+            for i in range(args.livros)
+        ])
+        db.session.commit()
+
+        entidades = Livro.query.all()
+        linhas = db.session.query(*Livro.colunas()).all()
+        dicts = [livro.to_dict() for livro in entidades]
+        r = args.repeticoes
+
+        print(f'{args.livros} livros, melhor de {r} execuções\n')
+        medir('carga: entidades (Livro.query)', lambda: (db.session.expunge_all(), Livro.query.all()), r)
+        medir('carga: colunas (query(*Livro.colunas()))', lambda: db.session.query(*Livro.colunas()).all(), r)
+        medir('to_dict antigo (__table__.columns)', lambda: [to_dict_antigo(l) for l in entidades], r)
+        medir('to_dict gerado (attrgetter)', lambda: [l.to_dict() for l in entidades], r)
+        medir('linha_para_dict', lambda: [Livro.linha_para_dict(l) for l in linhas], r)
+        medir('json: provider padrão', lambda: padrao.response(livros=dicts), r)
+        medir('json: JSONProvider', lambda: app.json.response(livros=dicts), r)
+
+        print()
+        antigo = medir('ponta a ponta: antigo', lambda: (
+            db.session.expunge_all(),
+            padrao.response(livros=[to_dict_antigo(l) for l in Livro.query.all()])
+        ), r)
+        novo = medir('ponta a ponta: novo', lambda: app.json.response(
+            livros=[Livro.linha_para_dict(l) for l in db.session.query(*Livro.colunas()).all()]
+        ), r)
+        print(f'\nganho: {antigo / novo:.1f}x')
@@ -0,0 +1,53 @@
+"""
+Compara a listagem de livros em JSON paginado (uma página com todos os itens)
+e em NDJSON: tempo até o primeiro bloco, tempo total e pico de memória
+alocada (tracemalloc) durante a resposta.
+
+Uso: python -m benchmarks.streaming [--livros 100000]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+from src.app import create_app
+from src.database.models import db, Livro
+
+
+def medir(client, url, headers):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    response = client.get(url, headers=headers, buffered=False)
+    corpo = iter(response.response)
+    tamanho = len(next(corpo))
+    primeiro = time.perf_counter() - inicio
+    tamanho += sum(len(bloco) for bloco in corpo)
+    total = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    response.close()
+    return {'primeiro bloco (ms)': round(primeiro * 1000), 'total (ms)': round(total * 1000),
+            'pico de memória (MB)': round(pico / 2**20, 1), 'bytes': tamanho}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--livros', type=int, default=100000)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(), 'streaming.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{caminho}', 'PAGINACAO_LIMITE_MAXIMO': args.livros})
+    app.logger.setLevel(logging.WARNING)
+    with app.app_context():
+        db.session.execute(db.insert(Livro), [
+            {'id': f'L{i:07d}', 'nome': f'Livro {i}', 'autor': 'Autor Benchmark', 'genero': 'Romance', 'descricao': 'x' * 200}
+            for i in range(args.livros)
+        ])
+        db.session.commit()
+
+    url = f'/livros/buscar?autor=Benchmark&modo=substring&limit={args.livros}'
+    with app.test_client() as client:
+        for nome, headers in [('json', {}), ('ndjson', {'Accept': 'application/x-ndjson'})]:
+            resultado = medir(client, url, headers)
+            print(f'{nome:6} | ' + ' | '.join(f'{chave}: {valor}' for chave, valor in resultado.items()))
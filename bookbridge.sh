@@ -86,6 +86,54 @@ flask (){
   fi
 }
 
+migrate (){
+  if [ -d "$VENV_DIR" ]; then
+    $PYTHON_EXEC -m src.database.migrations $@
+  else
+    echo "Virtual environment $VENV_DIR not found. Please run 'bookbridge build' first."
+  fi
+}
+
+importar (){
+  if [ -d "$VENV_DIR" ]; then
+    $PYTHON_EXEC -m src.database.importacao $@
+  else
+    echo "Virtual environment $VENV_DIR not found. Please run 'bookbridge build' first."
+  fi
+}
+
+sintetico (){
+  if [ -d "$VENV_DIR" ]; then
+    $PYTHON_EXEC -m src.database.sintetico $@
+  else
+    echo "Virtual environment $VENV_DIR not found. Please run 'bookbridge build' first."
+  fi
+}
+
+recomendacoes (){
+  if [ -d "$VENV_DIR" ]; then
+    $PYTHON_EXEC -m src.database.recomendacoes $@
+  else
+    echo "Virtual environment $VENV_DIR not found. Please run 'bookbridge build' first."
+  fi
+}
+
+duplicados (){
+  if [ -d "$VENV_DIR" ]; then
+    $PYTHON_EXEC -m src.database.duplicados $@
+  else
+    echo "Virtual environment $VENV_DIR not found. Please run 'bookbridge build' first."
+  fi
+}
+
+benchmark (){
+  if [ -d "$VENV_DIR" ]; then
+    $PYTHON_EXEC -m benchmarks.carga $@
+  else
+    echo "Virtual environment $VENV_DIR not found. Please run 'bookbridge build' first."
+  fi
+}
+
 command() {
   if [ -d "$VENV_DIR" ]; then
     $PYTHON_EXEC $@
@@ -103,5 +151,11 @@ case "$1" in
   gitflow) gitflow ;;
   clear) clear ;;
   flask) flask ;;
+  migrate) shift; migrate $@ ;;
+  importar) shift; importar $@ ;;
+  sintetico) shift; sintetico $@ ;;
+  recomendacoes) shift; recomendacoes $@ ;;
+  duplicados) shift; duplicados $@ ;;
+  benchmark) shift; benchmark $@ ;;
   *) shift; command $@ ;;  # Qualquer comando não identificado será passado para o ambiente virtual usando o Python da venv
 esac
@@ -10,14 +10,23 @@ from src.routes.clubs import clubs_bp
 from src.routes.user import users_bp
 from src.routes.user_club import user_club_bp
 
+# Utils
+from src.utils import etag, json_provider, logs, metrics
+
 # Database
 from src.database.models import db
+from src.database import search, ratings, migrations, engine, auditoria, recomendacoes, duplicados
 
-# Externals Libraries
-import logging
-
-def create_app():
+def create_app(config=None):
+    """
+    Cria a aplicação. As configurações abaixo são apenas valores padrão: podem
+    ser sobrescritas por variáveis de ambiente com prefixo BOOKBRIDGE_ (ex.:
+    BOOKBRIDGE_CACHE_TYPE) ou pelo dicionário `config`.
+    """
     app = Flask(__name__)
+    app.json = json_provider.JSONProvider(app)
+    app.config.from_prefixed_env('BOOKBRIDGE')
+    app.config.update(config or {})
     
     # Adicionando os BluePrints
     app.register_blueprint(books_bp)
@@ -26,6 +35,19 @@ def create_app():
     app.register_blueprint(users_bp)
     app.register_blueprint(user_club_bp)
     
+    # Métricas no formato do Prometheus em GET /metrics. Registrado antes do
+    # ETag para que o status final (ex.: 304) seja o contabilizado
+    app.config.setdefault('METRICAS_HABILITADAS', True)
+    metrics.registrar(app)
+    
+    # Auditoria das consultas SQL por requisição (desenvolvimento e testes)
+    app.config.setdefault('AUDITORIA_CONSULTAS', False)
+    app.config.setdefault('AUDITORIA_LIMITE_LENTO', auditoria.LIMITE_LENTO)
+    auditoria.registrar(app)
+    
+    # Respostas GET com ETag e suporte a If-None-Match (304)
+    etag.registrar(app)
+    
     # Configurando o Swagger
     
     app.config['SWAGGER'] = {
@@ -37,31 +59,91 @@ def create_app():
     Swagger(app)
     
     # Configuração do banco de dados    
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite:///app.db')
+    app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
+    # Perfil do SQLite (pragmas e pool): 'production', 'development' ou 'testing'
+    app.config.setdefault('DATABASE_PERFIL', engine.PERFIL_PADRAO)
+    # Réplica de leitura (opcional): GETs leem dela, exceto logo após uma escrita
+    # do mesmo usuário, que lê do primário por DATABASE_JANELA_ESCRITA segundos
+    app.config.setdefault('DATABASE_REPLICA_URI', None)
+    app.config.setdefault('DATABASE_ROTEAR_LEITURAS', bool(app.config['DATABASE_REPLICA_URI']))
+    app.config.setdefault('DATABASE_JANELA_ESCRITA', 5)
+    # Intervalo (s) de sincronização da réplica SQLite local; None = replicação externa
+    app.config.setdefault('DATABASE_REPLICA_INTERVALO', None)
+    engine.configurar(app)
     db.init_app(app)
+    with app.app_context():
+        engine.registrar_pragmas(app, db.engines)
 
     # Configurando a chave de decodificaçao JWT
-    app.config['SECRET_KEY'] = '936eb4f154867b74386f1bfc930ae0e7e8e4f9a759557dbfce0cb9f3a4a49edf'
+    if not app.config.get('SECRET_KEY'):
+        app.config['SECRET_KEY'] = '936eb4f154867b74386f1bfc930ae0e7e8e4f9a759557dbfce0cb9f3a4a49edf'
+    
+    # Cache por processo dos tokens verificados e dos usuários autenticados
+    app.config.setdefault('AUTH_CACHE_TAMANHO', 1024)
+    app.config.setdefault('AUTH_CACHE_TIMEOUT', 60)
     
-    # Configuração do Logger
-    file_handler = logging.FileHandler('./app.log')
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(logging.Formatter(f'%(asctime)s - %(levelname)-{6}s : %(message)s'))
-    app.logger.addHandler(file_handler)
-    app.logger.setLevel(logging.DEBUG)
-    app.logger.info(f"API BookBridge Iniciada")
+    # Configuração do Logger: gravação em uma thread separada (src/utils/logs.py),
+    # com rotação por tamanho e amostragem opcional por nível (ex.: {'INFO': 0.1})
+    app.config.setdefault('LOG_ARQUIVO', './app.log')
+    app.config.setdefault('LOG_NIVEL', 'DEBUG')
+    app.config.setdefault('LOG_TAMANHO_MAXIMO', 10 * 1024 * 1024)
+    app.config.setdefault('LOG_BACKUPS', 5)
+    app.config.setdefault('LOG_AMOSTRAGEM', {})
+    app.config.setdefault('LOG_CONSOLE', True)
+    app.config.setdefault('LOG_ASSINCRONO', True)
+    logs.configurar(app)
+    app.logger.info("API BookBridge Iniciada")
     
     # Configuração do Cache
-    app.config['CACHE_TYPE'] = 'SimpleCache'
-    app.config['CACHE_DEFAULT_TIMEOUT'] = 10
+    # 'SimpleCache' é por processo; com vários workers WSGI na mesma máquina use
+    # 'src.utils.shared_cache.SharedCache' (arquivo em CACHE_SHARED_PATH, limite em CACHE_THRESHOLD)
+    app.config.setdefault('CACHE_TYPE', 'SimpleCache')
+    app.config.setdefault('CACHE_THRESHOLD', 10000)
+    # As entradas são invalidadas explicitamente nas rotas de escrita (src/utils/cache.py),
+    # então o timeout serve apenas para liberar memória de chaves pouco acessadas
+    app.config.setdefault('CACHE_DEFAULT_TIMEOUT', 60 * 60)
+    # Tempo em que respostas 404 de livros, clubes e usuários ficam em cache
+    app.config.setdefault('CACHE_NEGATIVE_TIMEOUT', 30)
     cache = Cache(app)
     app.cache = cache
     
     app.logger.info("Sistema de Cache Inicializado")
     
+    # Configuração da paginação das listagens
+    app.config.setdefault('PAGINACAO_LIMITE_PADRAO', 50)
+    app.config.setdefault('PAGINACAO_LIMITE_MAXIMO', 200)
+    
+    # Linhas gravadas por lote (executemany/transação) na importação de livros
+    app.config.setdefault('IMPORTACAO_TAMANHO_LOTE', 5000)
+    # Quantidade máxima de avaliações por requisição em POST /livros/avaliar/lote
+    app.config.setdefault('AVALIACAO_LOTE_MAXIMO', 10000)
+    
+    # Recomendações de livros (src/database/recomendacoes.py): vizinhos guardados
+    # por livro e intervalo (s) da atualização em segundo plano. Com None (padrão),
+    # `python -m src.database.recomendacoes` deve ser agendado (ex.: cron)
+    app.config.setdefault('RECOMENDACOES_VIZINHOS', recomendacoes.K_VIZINHOS)
+    app.config.setdefault('RECOMENDACOES_INTERVALO', None)
+    
+    # Configuração da busca de livros ('fulltext' ou 'substring')
+    app.config.setdefault('LIVRO_BUSCA_MODO', search.MODO_FULLTEXT)
+    
+    # Livros quase duplicados em POST /livros: 'sinalizar' (cria e lista os
+    # parecidos na resposta) ou 'rejeitar' (409, exceto com "forcar": true)
+    app.config.setdefault('LIVRO_DUPLICADOS', duplicados.MODO_SINALIZAR)
+    app.config.setdefault('LIVRO_DUPLICADOS_LIMIAR', duplicados.LIMIAR)
+    
     with app.app_context():
         db.create_all()
+        if (indices := migrations.aplicar_indices(db.engine)):
+            app.logger.info("Índices criados no banco existente: %s", indices)
+        app.config['LIVRO_FTS'] = search.criar_indice_livros(db.engine)
+        app.logger.info("Índice FTS5 de livros disponível: %s", app.config['LIVRO_FTS'])
+        ratings.inicializar_resumos(db.engine)
+        duplicados.inicializar_indice(db.engine)
+
+    engine.registrar_roteamento(app)
+    recomendacoes.registrar(app)
 
     return app
 
@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from flask import current_app, g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Auditoria de consultas para desenvolvimento e testes: registra os comandos
+# SQL executados por requisição (ou dentro de `capturar`), com o tempo de cada
+# um, e aponta comandos idênticos repetidos (padrão N+1) e comandos lentos.
+# Ligada com AUDITORIA_CONSULTAS; não deve ser usada em produção.
+
+# Tempo (s) a partir do qual um comando é considerado lento
+LIMITE_LENTO = 0.1
+
+_local = threading.local()
+
+
+@dataclass
+class Comando:
+    sql: str
+    parametros: tuple
+    duracao: float
+
+
+@dataclass
+class Relatorio:
+    comandos: list = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return len(self.comandos)
+
+    @property
+    def tempo(self) -> float:
+        return sum(comando.duracao for comando in self.comandos)
+
+    def repetidos(self) -> dict:
+        """Comandos idênticos (mesmo SQL e parâmetros) executados mais de uma vez."""
+        contagem = Counter((comando.sql, comando.parametros) for comando in self.comandos)
+        return {chave: vezes for chave, vezes in contagem.items() if vezes > 1}
+
+    def lentos(self, limite: float = LIMITE_LENTO) -> list:
+        return [comando for comando in self.comandos if comando.duracao >= limite]
+
+    def resumo(self) -> str:
+        linhas = [f'{self.total} comandos SQL em {self.tempo * 1000:.1f} ms:']
+        linhas += [f'  {comando.duracao * 1000:7.2f} ms  {comando.sql} {comando.parametros}' for comando in self.comandos]
+        return '\n'.join(linhas)
+
+
+def _parametros(parameters) -> tuple:
+    if isinstance(parameters, dict):
+        return tuple(sorted(parameters.items()))
+    if isinstance(parameters, (list, tuple)):
+        return tuple(tuple(p) if isinstance(p, (list, tuple)) else p for p in parameters)
+    return (parameters,)
+
+
+def _relatorios() -> list:
+    relatorios = list(getattr(_local, 'capturas', ()))
+    if has_request_context() and (relatorio := g.get('auditoria')) is not None:
+        relatorios.append(relatorio)
+    return relatorios
+
+
+def _antes_do_comando(conn, cursor, statement, parameters, context, executemany):
+    conn.info['auditoria_inicio'] = time.perf_counter()
+
+
+def _depois_do_comando(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info.pop('auditoria_inicio', None)
+    if inicio is None or not (relatorios := _relatorios()):
+        return
+    comando = Comando(' '.join(statement.split()), _parametros(parameters), time.perf_counter() - inicio)
+    for relatorio in relatorios:
+        relatorio.comandos.append(comando)
+
+
+def _escutar():
+    if not event.contains(Engine, 'before_cursor_execute', _antes_do_comando):
+        event.listen(Engine, 'before_cursor_execute', _antes_do_comando)
+        event.listen(Engine, 'after_cursor_execute', _depois_do_comando)
+
+
+@contextmanager
+def capturar():
+    """Registra, no Relatorio retornado, os comandos SQL executados na thread atual."""
+    _escutar()
+    relatorio = Relatorio()
+    capturas = _local.__dict__.setdefault('capturas', [])
+    capturas.append(relatorio)
+    try:
+        yield relatorio
+    finally:
+        capturas.remove(relatorio)
+
+
+@contextmanager
+def orcamento(maximo: int, repetidos: bool = False):
+    """
+    Falha (AssertionError) se o bloco executar mais de `maximo` comandos SQL
+    ou, sem `repetidos`, se algum comando idêntico for executado mais de uma vez.
+
+        with auditoria.orcamento(2):
+            client.get('/livros/L001')
+    """
+    with capturar() as relatorio:
+        yield relatorio
+    assert relatorio.total <= maximo, f'Orçamento de {maximo} consultas excedido\n{relatorio.resumo()}'
+    assert repetidos or not relatorio.repetidos(), f'Consultas repetidas\n{relatorio.resumo()}'
+
+
+def registrar(app):
+    """
+    Liga a auditoria por requisição (AUDITORIA_CONSULTAS): a resposta recebe os
+    cabeçalhos X-Consultas-SQL e X-Tempo-SQL, e comandos repetidos ou mais lentos
+    que AUDITORIA_LIMITE_LENTO segundos geram um aviso no log.
+    """
+    if not app.config.get('AUDITORIA_CONSULTAS'):
+        return app
+    _escutar()
+
+    @app.before_request
+    def _iniciar_auditoria():
+        g.auditoria = Relatorio()
+
+    @app.after_request
+    def _relatar_auditoria(resposta):
+        if (relatorio := g.pop('auditoria', None)) is None:
+            return resposta
+
+        resposta.headers['X-Consultas-SQL'] = str(relatorio.total)
+        resposta.headers['X-Tempo-SQL'] = f'{relatorio.tempo * 1000:.2f}ms'
+        for (sql, parametros), vezes in relatorio.repetidos().items():
+            current_app.logger.warning('Consulta repetida %d vezes: %s %s', vezes, sql, parametros)
+        for comando in relatorio.lentos(current_app.config.get('AUDITORIA_LIMITE_LENTO', LIMITE_LENTO)):
+            current_app.logger.warning('Consulta lenta (%.1f ms): %s %s', comando.duracao * 1000, comando.sql, comando.parametros)
+        return resposta
+
+    return app
@@ -52,3 +52,64 @@ CREATE TABLE Avaliacao (
     FOREIGN KEY (avaliador_id) REFERENCES Usuario(id),
     FOREIGN KEY (livro_id) REFERENCES Livro(id)
 );
+
+CREATE TABLE AvaliacaoResumo (
+    livro_id VARCHAR2(10) PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    soma_estrelas INTEGER NOT NULL DEFAULT 0,
+    estrelas_0 INTEGER NOT NULL DEFAULT 0,
+    estrelas_1 INTEGER NOT NULL DEFAULT 0,
+    estrelas_2 INTEGER NOT NULL DEFAULT 0,
+    estrelas_3 INTEGER NOT NULL DEFAULT 0,
+    estrelas_4 INTEGER NOT NULL DEFAULT 0,
+    estrelas_5 INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (livro_id) REFERENCES Livro(id)
+);
+
+CREATE TABLE LivroSimilar (
+    livro_id VARCHAR2(10),
+    similar_id VARCHAR2(10),
+    similaridade FLOAT NOT NULL,
+    PRIMARY KEY (livro_id, similar_id),
+    FOREIGN KEY (livro_id) REFERENCES Livro(id),
+    FOREIGN KEY (similar_id) REFERENCES Livro(id)
+);
+
+CREATE TABLE LivroNorma (
+    livro_id VARCHAR2(10) PRIMARY KEY,
+    norma FLOAT NOT NULL,
+    FOREIGN KEY (livro_id) REFERENCES Livro(id)
+);
+
+CREATE TABLE RecomendacaoPendente (
+    usuario_id VARCHAR2(10),
+    livro_id VARCHAR2(10),
+    PRIMARY KEY (usuario_id, livro_id)
+);
+
+CREATE TABLE ClubeSimilar (
+    clube_id VARCHAR2(10),
+    similar_id VARCHAR2(10),
+    similaridade FLOAT NOT NULL,
+    PRIMARY KEY (clube_id, similar_id),
+    FOREIGN KEY (clube_id) REFERENCES Clube(id),
+    FOREIGN KEY (similar_id) REFERENCES Clube(id)
+);
+
+CREATE TABLE RecomendacaoClubePendente (
+    clube_id VARCHAR2(10) PRIMARY KEY
+);
+
+CREATE TABLE LivroAssinatura (
+    chave BIGINT,
+    livro_id VARCHAR2(10),
+    PRIMARY KEY (chave, livro_id),
+    FOREIGN KEY (livro_id) REFERENCES Livro(id)
+);
+
+CREATE INDEX ix_clube_criador ON Clube (criador);
+CREATE INDEX ix_participa_clube_id ON Participa (clube_id);
+CREATE INDEX ix_adiciona_clube_id_livro_id ON Adiciona (clube_id, livro_id);
+CREATE INDEX ix_adiciona_livro_id ON Adiciona (livro_id);
+CREATE INDEX ix_avaliacao_livro_id ON Avaliacao (livro_id);
+CREATE INDEX ix_livro_assinatura_livro_id ON LivroAssinatura (livro_id);
@@ -0,0 +1,349 @@
+import hashlib
+import random
+import re
+import struct
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from sqlalchemy import event, select, delete, update, func, inspect, bindparam
+from src.database.models import db, Livro, Adiciona, Avaliacao, AvaliacaoResumo, LivroAssinatura, LivroSimilar
+from src.database import ratings, recomendacoes
+from src.database.ratings import _lotes
+
+# Detecção de livros quase duplicados (ex.: "Dom Casmurro" de "Machado de Assis"
+# e "Dom Casmuro" de "Machado de Assís"). Título e autor são normalizados (sem
+# acentos, pontuação e caixa) e quebrados em trigramas de caracteres; a
+# semelhança entre dois livros é o índice de Jaccard desses trigramas.
+#
+# Para não comparar um livro com todo o catálogo, cada livro tem uma
+# assinatura MinHash dividida em NUM_BANDAS bandas (LSH): cada banda vira uma
+# chave em livro_assinatura, e só os livros que compartilham alguma chave são
+# comparados. A busca de candidatos é uma consulta pelo índice da chave.
+#
+# O índice é mantido por eventos do ORM (inclusão, alteração e remoção de
+# Livro) e pela importação em lotes; `agrupar` e `mesclar` (linha de comando)
+# juntam os duplicados já existentes.
+
+MODO_SINALIZAR = 'sinalizar'
+MODO_REJEITAR = 'rejeitar'
+
+# Bandas x linhas por banda da assinatura: pares com Jaccard 0,5 viram
+# candidatos com probabilidade ~88%, e com 0,7 com ~99,9%
+NUM_BANDAS = 16
+LINHAS_POR_BANDA = 3
+
+# Semelhança mínima (peso PESO_TITULO no título, o restante no autor) para um duplicado
+LIMIAR = 0.7
+PESO_TITULO = 0.7
+
+# Livros com a mesma chave acima deste total não são comparados entre si no
+# agrupamento (títulos genéricos demais para indicar duplicidade)
+MAXIMO_BALDE = 1000
+
+_PRIMO = (1 << 61) - 1
+_gerador = random.Random(2024)
+_PERMUTACOES = [
+    (_gerador.randrange(1, _PRIMO), _gerador.randrange(_PRIMO)) for _ in range(NUM_BANDAS * LINHAS_POR_BANDA)
+]
+
+assinaturas = LivroAssinatura.__table__
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sem acentos e com apenas letras e números (de qualquer alfabeto) separados por um espaço."""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).casefold()
+    return ' '.join(re.findall(r'[^\W_]+', texto))
+
+
+def trigramas(texto: str) -> frozenset:
+    texto = f' {normalizar(texto)} '
+    return frozenset(texto[i:i + 3] for i in range(len(texto) - 2))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _numeros(texto: str) -> frozenset:
+    return frozenset(re.findall(r'\d+', texto or ''))
+
+
+def similaridade(nome_a: str, autor_a: str, nome_b: str, autor_b: str) -> float:
+    """
+    Semelhança entre dois livros (0 a 1). Números diferentes no título (volumes,
+    edições, "1984" e "1985") indicam livros distintos e resultam em 0.
+    """
+    if _numeros(nome_a) != _numeros(nome_b):
+        return 0.0
+    return (PESO_TITULO * jaccard(trigramas(nome_a), trigramas(nome_b))
+            + (1 - PESO_TITULO) * jaccard(trigramas(autor_a), trigramas(autor_b)))
+
+
+@lru_cache(maxsize=8192)
+def _permutado(trigrama: str) -> tuple:
+    # Valor do trigrama em cada permutação; o vocabulário de trigramas é
+    # pequeno, então o cache evita quase todas as multiplicações
+    h = int.from_bytes(hashlib.blake2b(trigrama.encode(), digest_size=8).digest(), 'little')
+    return tuple((a * h + b) % _PRIMO for a, b in _PERMUTACOES)
+
+
+def chaves(nome: str, autor: str) -> list:
+    """
+    Chaves LSH (uma por banda, inteiros de 64 bits com sinal) da assinatura
+    MinHash do livro. Título e autor sem letras nem números não têm chaves.
+    """
+    valores = [_permutado('t' + t) for t in trigramas(nome)] + [_permutado('a' + t) for t in trigramas(autor)]
+    if not valores:
+        return []
+    minimos = [min(coluna) for coluna in zip(*valores)]
+    return [
+        int.from_bytes(hashlib.blake2b(
+            struct.pack(f'<{LINHAS_POR_BANDA + 1}Q', banda, *minimos[banda * LINHAS_POR_BANDA:(banda + 1) * LINHAS_POR_BANDA]),
+            digest_size=8
+        ).digest(), 'little', signed=True)
+        for banda in range(NUM_BANDAS)
+    ]
+
+
+def indexar(conn, livros):
+    """Grava as chaves de livros (id, nome, autor) no índice."""
+    linhas = [
+        {'chave': chave, 'livro_id': livro_id}
+        for livro_id, nome, autor in livros
+        for chave in set(chaves(nome, autor))
+    ]
+    for lote in _lotes(linhas, 5000):
+        conn.execute(assinaturas.insert().prefix_with('OR IGNORE'), lote)
+
+
+def remover_do_indice(conn, livro_ids):
+    for lote in _lotes(list(livro_ids)):
+        conn.execute(delete(assinaturas).where(assinaturas.c.livro_id.in_(lote)))
+
+
+def reconstruir_indice(conn, tamanho_lote: int = 5000) -> int:
+    """Recalcula as chaves de todos os livros. Retorna a quantidade de livros indexados."""
+    conn.execute(delete(assinaturas))
+    total, ultimo = 0, ''
+    while (livros := conn.execute(
+        select(Livro.id, Livro.nome, Livro.autor).where(Livro.id > ultimo).order_by(Livro.id).limit(tamanho_lote)
+    ).all()):
+        indexar(conn, livros)
+        total, ultimo = total + len(livros), livros[-1][0]
+    return total
+
+
+def inicializar_indice(engine):
+    """Preenche o índice na primeira execução sobre um banco que já possui livros."""
+    with engine.begin() as conn:
+        vazio = conn.execute(select(assinaturas.c.chave).limit(1)).first() is None
+        if vazio and conn.execute(select(Livro.id).limit(1)).first():
+            reconstruir_indice(conn)
+
+
+# Candidatos de uma busca: livros com alguma das chaves (comando montado uma vez)
+_CANDIDATOS = select(Livro.id, Livro.nome, Livro.autor).where(
+    Livro.id.in_(select(assinaturas.c.livro_id).where(assinaturas.c.chave.in_(bindparam('chaves', expanding=True))))
+)
+
+
+def procurar(conn, nome: str, autor: str, limiar: float = LIMIAR, excluir=None) -> list:
+    """
+    Livros parecidos com (nome, autor), do mais para o menos parecido.
+
+    Retorno:
+        Lista de (id, nome, autor, similaridade) com similaridade >= limiar.
+    """
+    titulo, escritor, numeros = trigramas(nome), trigramas(autor), _numeros(nome)
+    encontrados = []
+    for id, outro_nome, outro_autor in conn.execute(_CANDIDATOS, {'chaves': chaves(nome, autor)}):
+        if id == excluir or _numeros(outro_nome) != numeros:
+            continue
+        valor = PESO_TITULO * jaccard(titulo, trigramas(outro_nome)) + (1 - PESO_TITULO) * jaccard(escritor, trigramas(outro_autor))
+        if valor >= limiar:
+            encontrados.append((id, outro_nome, outro_autor, valor))
+    return sorted(encontrados, key=lambda item: (-item[3], item[0]))
+
+
+@dataclass
+class Grupo:
+    canonico: str
+    duplicados: list = field(default_factory=list)
+
+
+def agrupar(conn, limiar: float = LIMIAR) -> list:
+    """
+    Agrupa os livros duplicados do catálogo. Os pares candidatos saem dos livros
+    que compartilham chaves no índice; os pares confirmados (similaridade >=
+    limiar) são unidos transitivamente. Em cada grupo, o livro com mais
+    avaliações e adições aos clubes (e, no empate, o menor id) é o canônico.
+    """
+    baldes = {}
+    for chave, livro_id in conn.execute(select(assinaturas.c.chave, assinaturas.c.livro_id)):
+        baldes.setdefault(chave, []).append(livro_id)
+
+    pais = {}
+
+    def raiz(id):
+        while pais.get(id, id) != id:
+            pais[id] = pais.get(pais[id], pais[id])
+            id = pais[id]
+        return id
+
+    dados = {}
+    comparados = set()
+    for livros in baldes.values():
+        if not 1 < len(livros) <= MAXIMO_BALDE:
+            continue
+        faltantes = [id for id in livros if id not in dados]
+        for lote in _lotes(faltantes):
+            for id, nome, autor in conn.execute(select(Livro.id, Livro.nome, Livro.autor).where(Livro.id.in_(lote))):
+                dados[id] = (trigramas(nome), trigramas(autor), _numeros(nome))
+
+        # Só livros com os mesmos números no título podem ser duplicados
+        por_numeros = {}
+        for id in sorted(id for id in livros if id in dados):
+            por_numeros.setdefault(dados[id][2], []).append(id)
+
+        for ids in por_numeros.values():
+            for i, a in enumerate(ids):
+                for b in ids[i + 1:]:
+                    if (a, b) in comparados or raiz(a) == raiz(b):
+                        continue
+                    comparados.add((a, b))
+                    titulo_a, autor_a, _ = dados[a]
+                    titulo_b, autor_b, _ = dados[b]
+                    if PESO_TITULO * jaccard(titulo_a, titulo_b) + (1 - PESO_TITULO) * jaccard(autor_a, autor_b) >= limiar:
+                        pais[raiz(b)] = raiz(a)
+
+    membros = {}
+    for id in list(pais):
+        membros.setdefault(raiz(id), set()).add(id)
+    grupos = [ids | {r} for r, ids in membros.items() if len(ids | {r}) > 1]
+    if not grupos:
+        return []
+
+    todos = [id for ids in grupos for id in ids]
+    peso = {id: 0 for id in todos}
+    for lote in _lotes(todos):
+        for id, total in conn.execute(
+            select(AvaliacaoResumo.livro_id, AvaliacaoResumo.total).where(AvaliacaoResumo.livro_id.in_(lote))
+        ):
+            peso[id] += total
+        for id, total in conn.execute(
+            select(Adiciona.livro_id, func.count()).where(Adiciona.livro_id.in_(lote)).group_by(Adiciona.livro_id)
+        ):
+            peso[id] += total
+
+    resultado = []
+    for ids in grupos:
+        canonico = min(ids, key=lambda id: (-peso[id], id))
+        resultado.append(Grupo(canonico, sorted(ids - {canonico})))
+    return sorted(resultado, key=lambda grupo: grupo.canonico)
+
+
+@dataclass
+class Mesclagem:
+    livros_removidos: list = field(default_factory=list)
+    canonicos: list = field(default_factory=list)
+    avaliacoes_remapeadas: int = 0
+    adicoes_remapeadas: int = 0
+    clubes: set = field(default_factory=set)
+
+
+def mesclar(conn, grupos: list) -> Mesclagem:
+    """
+    Mescla cada grupo no livro canônico: avaliações e adições aos clubes dos
+    duplicados passam para o canônico (quando o usuário já avaliou ou adicionou
+    o canônico, a linha do duplicado é descartada) e os duplicados são removidos,
+    junto com o resumo das avaliações, as similaridades e as chaves do índice.
+    As recomendações dos livros e clubes afetados ficam pendentes.
+    """
+    mesclagem = Mesclagem()
+    for grupo in grupos:
+        duplicados = grupo.duplicados
+        avaliadores = conn.execute(
+            select(Avaliacao.avaliador_id, Avaliacao.livro_id).where(Avaliacao.livro_id.in_(duplicados))
+        ).all()
+        clubes = set(conn.execute(select(Adiciona.clube_id).where(Adiciona.livro_id.in_(duplicados))).scalars())
+
+        mesclagem.avaliacoes_remapeadas += conn.execute(
+            update(Avaliacao).prefix_with('OR IGNORE').where(Avaliacao.livro_id.in_(duplicados)).values(livro_id=grupo.canonico)
+        ).rowcount
+        conn.execute(delete(Avaliacao).where(Avaliacao.livro_id.in_(duplicados)))
+        mesclagem.adicoes_remapeadas += conn.execute(
+            update(Adiciona).prefix_with('OR IGNORE').where(Adiciona.livro_id.in_(duplicados)).values(livro_id=grupo.canonico)
+        ).rowcount
+        conn.execute(delete(Adiciona).where(Adiciona.livro_id.in_(duplicados)))
+
+        conn.execute(delete(LivroSimilar).where(
+            LivroSimilar.livro_id.in_(duplicados) | LivroSimilar.similar_id.in_(duplicados)
+        ))
+        remover_do_indice(conn, duplicados)
+        conn.execute(delete(Livro).where(Livro.id.in_(duplicados)))
+        ratings.reconstruir_resumos(conn, [grupo.canonico, *duplicados])
+
+        recomendacoes.marcar_pendentes(conn, [
+            par for avaliador, livro in avaliadores for par in ((avaliador, livro), (avaliador, grupo.canonico))
+        ])
+        recomendacoes.marcar_clubes_pendentes(conn, clubes)
+
+        mesclagem.livros_removidos += duplicados
+        mesclagem.canonicos.append(grupo.canonico)
+        mesclagem.clubes |= clubes
+    return mesclagem
+
+
+@event.listens_for(Livro, 'after_insert')
+def _livro_inserido(mapper, connection, target):
+    indexar(connection, [(target.id, target.nome, target.autor)])
+
+
+@event.listens_for(Livro, 'after_update')
+def _livro_atualizado(mapper, connection, target):
+    if inspect(target).attrs.nome.history.has_changes() or inspect(target).attrs.autor.history.has_changes():
+        remover_do_indice(connection, [target.id])
+        indexar(connection, [(target.id, target.nome, target.autor)])
+
+
+@event.listens_for(Livro, 'after_delete')
+def _livro_removido(mapper, connection, target):
+    remover_do_indice(connection, [target.id])
+
+
+if __name__ == '__main__':
+    # Uso: python -m src.database.duplicados [--mesclar] [--limiar 0.7] [--reindexar]
+    import argparse
+    import time
+    from src.app import create_app
+    from src.utils import cache
+
+    parser = argparse.ArgumentParser(description='Agrupa (e opcionalmente mescla) os livros duplicados do catálogo.')
+    parser.add_argument('--mesclar', action='store_true', help='mescla os grupos encontrados (padrão: apenas lista)')
+    parser.add_argument('--limiar', type=float, help='similaridade mínima (padrão: LIVRO_DUPLICADOS_LIMIAR)')
+    parser.add_argument('--reindexar', action='store_true', help='recalcula o índice antes de agrupar')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        inicio = time.perf_counter()
+        with db.engine.begin() as conn:
+            if args.reindexar:
+                print(f'{reconstruir_indice(conn)} livros indexados')
+            grupos = agrupar(conn, args.limiar or app.config['LIVRO_DUPLICADOS_LIMIAR'])
+            for grupo in grupos:
+                print(f'{grupo.canonico} <- {", ".join(grupo.duplicados)}')
+            print(f'{len(grupos)} grupos, {sum(len(grupo.duplicados) for grupo in grupos)} duplicados')
+
+            if args.mesclar and grupos:
+                mesclagem = mesclar(conn, grupos)
+                print(f'{len(mesclagem.livros_removidos)} livros removidos, {mesclagem.avaliacoes_remapeadas} avaliações '
+                      f'e {mesclagem.adicoes_remapeadas} adições remapeadas')
+
+        if args.mesclar and grupos:
+            # Efetivo quando o cache é compartilhado entre processos (SharedCache)
+            cache.invalidar(cache.LIVRO, *mesclagem.livros_removidos, *mesclagem.canonicos)
+            cache.invalidar(cache.LIVRO_SIMILARES, *mesclagem.livros_removidos, *mesclagem.canonicos)
+            cache.invalidar(cache.CLUBE_LIVROS, *mesclagem.clubes)
+        print(f'Concluído em {time.perf_counter() - inicio:.1f} s')
@@ -0,0 +1,190 @@
+import sqlite3
+import threading
+import time
+import jwt
+from flask import g, request, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from src.database.models import db
+from src.database.routing import BIND_LEITURA
+from src.database import model_validation as validator
+
+# Perfis de configuração do SQLite por ambiente. Os pragmas são executados em
+# cada nova conexão do pool; `pool` vai para SQLALCHEMY_ENGINE_OPTIONS.
+#
+#   - journal_mode=WAL: leitores não bloqueiam o escritor (e vice-versa)
+#   - synchronous=NORMAL: seguro em WAL, sem fsync a cada commit
+#   - cache_size negativo: tamanho do cache de páginas em KiB, por conexão
+#   - mmap_size: leitura das páginas via memória mapeada
+#   - busy_timeout: espera pela trava de escrita em vez de "database is locked"
+PERFIS = {
+    'production': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -64000,
+            'mmap_size': 256 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000,
+        },
+        'pool': {'pool_size': 10, 'max_overflow': 20, 'pool_timeout': 10, 'pool_recycle': 3600},
+    },
+    'development': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000,
+        },
+        'pool': {'pool_size': 5, 'max_overflow': 10},
+    },
+    'testing': {
+        'pragmas': {
+            'busy_timeout': 5000,
+        },
+        'pool': {},
+    },
+}
+
+PERFIL_PADRAO = 'development'
+
+
+def perfil(app) -> dict:
+    nome = app.config.get('DATABASE_PERFIL', PERFIL_PADRAO)
+    if nome not in PERFIS:
+        raise ValueError(f"Perfil de banco de dados desconhecido: {nome}")
+    return PERFIS[nome]
+
+
+def _arquivo(uri: str) -> bool:
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def configurar(app):
+    """
+    Preenche as opções de engine do Flask-SQLAlchemy conforme o perfil do app
+    (DATABASE_PERFIL). Deve ser chamado antes de db.init_app.
+
+    Para bancos SQLite em arquivo também registra o bind BIND_LEITURA, cujas
+    conexões são abertas com `query_only`, apontando para a réplica
+    (DATABASE_REPLICA_URI) ou, sem ela, para o mesmo arquivo do primário.
+    """
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if make_url(uri).get_backend_name() != 'sqlite':
+        return
+
+    opcoes = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    if _arquivo(uri):
+        for nome, valor in perfil(app)['pool'].items():
+            opcoes.setdefault(nome, valor)
+        opcoes.setdefault('connect_args', {}).setdefault('check_same_thread', False)
+
+    replica = app.config.get('DATABASE_REPLICA_URI') or uri
+    if _arquivo(replica):
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        binds.setdefault(BIND_LEITURA, {'url': replica, **opcoes})
+
+
+def aplicar_pragmas(engine, pragmas: dict, somente_leitura: bool = False):
+    """Executa os pragmas informados em cada nova conexão SQLite do engine."""
+
+    @event.listens_for(engine, 'connect')
+    def _ao_conectar(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nome}={valor}')
+        if somente_leitura:
+            cursor.execute('PRAGMA query_only=ON')
+        cursor.close()
+
+
+def registrar_pragmas(app, engines: dict):
+    """Registra os pragmas do perfil do app em todos os engines SQLite."""
+    pragmas = perfil(app)['pragmas']
+    for bind, engine in engines.items():
+        if engine.dialect.name == 'sqlite':
+            aplicar_pragmas(engine, pragmas, somente_leitura=bind == BIND_LEITURA)
+
+
+def engine_leitura():
+    """Engine do caminho somente leitura (o principal se o bind não existir)."""
+    return db.engines.get(BIND_LEITURA, db.engine)
+
+
+def sincronizar_replica() -> bool:
+    """
+    Copia o banco primário para a réplica SQLite local com a API de backup do
+    SQLite. Substitui a replicação real em desenvolvimento e nos testes.
+
+    Retorno:
+        False se não houver réplica separada do primário.
+    """
+    replica = engine_leitura()
+    if replica.url == db.engine.url:
+        return False
+
+    origem = db.engine.raw_connection()
+    destino = sqlite3.connect(replica.url.database, timeout=5)
+    try:
+        origem.driver_connection.backup(destino)
+    finally:
+        destino.close()
+        origem.close()
+    return True
+
+
+def _sincronizar_periodicamente(app, intervalo: float):
+    while True:
+        time.sleep(intervalo)
+        with app.app_context():
+            try:
+                sincronizar_replica()
+            except Exception as e:
+                app.logger.error("Erro ao sincronizar a réplica: %s", e)
+
+
+def _identidades() -> list:
+    """Identifica quem faz a requisição: o IP e, com token válido, o usuário."""
+    identidades = [f'ip:{request.remote_addr}']
+    token = request.headers.get('Authorization', '')
+    if token.startswith('Bearer '):
+        try:
+            identidades.append(f"usuario:{validator.decodificar_token(token.split(' ')[1])['user_id']}")
+        except (jwt.InvalidTokenError, KeyError):
+            pass
+    return identidades
+
+
+def registrar_roteamento(app):
+    """
+    Liga o roteamento de leituras (DATABASE_ROTEAR_LEITURAS): requisições GET/HEAD
+    leem da réplica, exceto quando o mesmo usuário (ou IP) escreveu no banco há
+    menos de DATABASE_JANELA_ESCRITA segundos (read-your-writes). As escritas
+    são registradas no cache da aplicação, compartilhado entre processos com o
+    SharedCache.
+
+    Com DATABASE_REPLICA_INTERVALO, a réplica local é sincronizada na inicialização
+    e depois a cada intervalo (em segundos), em uma thread separada.
+    """
+
+    @app.before_request
+    def _escolher_banco():
+        g.rotear_leitura = False
+        if not current_app.config.get('DATABASE_ROTEAR_LEITURAS') or request.method not in ('GET', 'HEAD'):
+            return
+        chaves = [f'escrita:{identidade}' for identidade in _identidades()]
+        g.rotear_leitura = not any(current_app.cache.get_many(*chaves))
+
+    @app.after_request
+    def _registrar_escrita(response):
+        if g.get('escrita_banco') and response.status_code < 400 and current_app.config.get('DATABASE_ROTEAR_LEITURAS'):
+            janela = current_app.config['DATABASE_JANELA_ESCRITA']
+            for identidade in _identidades():
+                current_app.cache.set(f'escrita:{identidade}', 1, timeout=janela)
+        return response
+
+    if app.config.get('DATABASE_ROTEAR_LEITURAS') and (intervalo := app.config.get('DATABASE_REPLICA_INTERVALO')):
+        with app.app_context():
+            sincronizar_replica()
+        threading.Thread(target=_sincronizar_periodicamente, args=(app, intervalo), daemon=True).start()
@@ -0,0 +1,145 @@
+import csv
+import json
+import secrets
+from dataclasses import dataclass, field
+from sqlalchemy import insert
+from src.database.models import db, Livro
+from src.database import duplicados
+
+# Importação de livros em massa a partir de NDJSON (um objeto JSON por linha)
+# ou CSV com cabeçalho. As linhas são lidas de forma incremental e gravadas em
+# lotes (executemany, uma transação por lote), então a memória usada depende
+# apenas do tamanho do lote, não do arquivo.
+
+FORMATO_NDJSON = 'ndjson'
+FORMATO_CSV = 'csv'
+
+TAMANHO_LOTE = 5000
+
+# Quantidade máxima de erros detalhados no relatório (os demais são só contados)
+ERROS_MAXIMOS = 1000
+
+# Campo -> tamanho máximo, conforme o modelo Livro
+CAMPOS = {'nome': 255, 'autor': 255, 'genero': 100, 'descricao': 1000}
+
+
+@dataclass
+class Relatorio:
+    importados: int = 0
+    total_erros: int = 0
+    erros: list = field(default_factory=list)
+
+    def erro(self, linha: int, mensagem: str):
+        self.total_erros += 1
+        if len(self.erros) < ERROS_MAXIMOS:
+            self.erros.append({'linha': linha, 'erro': mensagem})
+
+    def to_dict(self):
+        return {'importados': self.importados, 'total_erros': self.total_erros, 'erros': self.erros}
+
+
+def ler_ndjson(linhas):
+    """Gera (número da linha, registro) de um iterável de linhas NDJSON."""
+    for numero, linha in enumerate(linhas, start=1):
+        if not linha.strip():
+            continue
+        try:
+            yield numero, json.loads(linha)
+        except json.JSONDecodeError as e:
+            yield numero, ValueError(f"JSON inválido: {e.msg}")
+
+
+def ler_csv(linhas):
+    """Gera (número da linha, registro) de um iterável de linhas CSV com cabeçalho."""
+    leitor = csv.DictReader(linhas)
+    for registro in leitor:
+        yield leitor.line_num, registro
+
+
+LEITORES = {FORMATO_NDJSON: ler_ndjson, FORMATO_CSV: ler_csv}
+
+
+def validar(registro) -> dict:
+    """Retorna a linha a ser inserida ou levanta ValueError com o motivo."""
+    if isinstance(registro, Exception):
+        raise registro
+    if not isinstance(registro, dict):
+        raise ValueError("Registro deve ser um objeto")
+
+    livro = {'id': secrets.token_hex()}
+    for campo, tamanho in CAMPOS.items():
+        valor = registro.get(campo)
+        if not isinstance(valor, str) or not (valor := valor.strip()):
+            raise ValueError(f"O campo de {campo} não foi preenchido")
+        if len(valor) > tamanho:
+            raise ValueError(f"O campo de {campo} excede {tamanho} caracteres")
+        livro[campo] = valor
+    return livro
+
+
+def _gravar(lote: list, relatorio: Relatorio):
+    primeira, ultima = lote[0][0], lote[-1][0]
+    try:
+        db.session.execute(insert(Livro), [livro for _, livro in lote])
+        duplicados.indexar(db.session.connection(), [(livro['id'], livro['nome'], livro['autor']) for _, livro in lote])
+        db.session.commit()
+        relatorio.importados += len(lote)
+    except Exception as e:
+        db.session.rollback()
+        for numero, _ in lote:
+            relatorio.erro(numero, f"Falha ao gravar o lote das linhas {primeira}-{ultima}: {e}")
+
+
+def importar_livros(linhas, formato: str = FORMATO_NDJSON, tamanho_lote: int = TAMANHO_LOTE) -> Relatorio:
+    """
+    Importa os livros de um iterável de linhas de texto (arquivo, stream da requisição).
+
+    Parâmetros de Entrada:
+        - linhas : iterável de str
+        - formato : str (FORMATO_NDJSON ou FORMATO_CSV)
+        - tamanho_lote : int (linhas por executemany/transação)
+
+    Linhas inválidas são registradas no relatório sem interromper a importação.
+    """
+    if formato not in LEITORES:
+        raise ValueError(f"Formato de importação inválido: {formato}")
+
+    relatorio = Relatorio()
+    lote = []
+    for numero, registro in LEITORES[formato](linhas):
+        try:
+            lote.append((numero, validar(registro)))
+        except ValueError as e:
+            relatorio.erro(numero, str(e))
+            continue
+
+        if len(lote) >= tamanho_lote:
+            _gravar(lote, relatorio)
+            lote = []
+
+    if lote:
+        _gravar(lote, relatorio)
+    return relatorio
+
+
+if __name__ == '__main__':
+    # Uso: python -m src.database.importacao arquivo [--formato ndjson|csv] [--lote N]
+    import argparse
+    import sys
+    from src.app import create_app
+
+    parser = argparse.ArgumentParser(description='Importa livros em massa de um arquivo NDJSON ou CSV.')
+    parser.add_argument('arquivo', help="caminho do arquivo ('-' para a entrada padrão)")
+    parser.add_argument('--formato', choices=list(LEITORES), help='padrão: pela extensão do arquivo')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE)
+    args = parser.parse_args()
+
+    formato = args.formato or (FORMATO_CSV if args.arquivo.endswith('.csv') else FORMATO_NDJSON)
+    arquivo = sys.stdin if args.arquivo == '-' else open(args.arquivo, encoding='utf-8', newline='')
+
+    with arquivo, create_app().app_context():
+        relatorio = importar_livros(arquivo, formato, args.lote)
+
+    for erro in relatorio.erros:
+        print(f"linha {erro['linha']}: {erro['erro']}", file=sys.stderr)
+    print(f"Livros importados: {relatorio.importados}; linhas com erro: {relatorio.total_erros}")
@@ -0,0 +1,43 @@
+from sqlalchemy import inspect
+from src.database.models import db
+
+# O db.create_all() só cria tabelas que ainda não existem: índices adicionados
+# aos modelos depois que um app.db já foi criado precisam ser aplicados aqui.
+
+
+def indices_pendentes(engine) -> list:
+    """Lista os índices declarados nos modelos que ainda não existem no banco."""
+    inspector = inspect(engine)
+    pendentes = []
+    for tabela in db.metadata.sorted_tables:
+        if not inspector.has_table(tabela.name):
+            continue
+        existentes = {indice['name'] for indice in inspector.get_indexes(tabela.name)}
+        pendentes += [indice for indice in tabela.indexes if indice.name not in existentes]
+    return pendentes
+
+
+def aplicar_indices(engine) -> list:
+    """
+    Cria os índices pendentes e atualiza as estatísticas do planejador (ANALYZE).
+
+    Retorno:
+        Lista com o nome dos índices criados.
+    """
+    pendentes = indices_pendentes(engine)
+    with engine.begin() as conn:
+        for indice in pendentes:
+            indice.create(conn, checkfirst=True)
+        if pendentes and engine.dialect.name == 'sqlite':
+            conn.exec_driver_sql('ANALYZE')
+    return [indice.name for indice in pendentes]
+
+
+if __name__ == '__main__':
+    # Uso: python -m src.database.migrations [URL do banco]
+    import sys
+    from sqlalchemy import create_engine
+
+    url = sys.argv[1] if len(sys.argv) > 1 else 'sqlite:///instance/app.db'
+    criados = aplicar_indices(create_engine(url))
+    print(f"Índices criados: {', '.join(criados) or 'nenhum'}")
@@ -1,5 +1,9 @@
-from src.database.models import Usuario
+from src.database.models import db, Usuario
+from src.utils import cache
+from src.utils.lru import LRUCache
 from flask import jsonify
+from typing import Optional
+from sqlalchemy.orm import make_transient_to_detached
 import re
 import secrets
 import jwt
@@ -7,6 +11,63 @@ from functools import wraps
 from flask import request, jsonify, current_app
 from datetime import datetime, timedelta, timezone
 
+def _caches_autenticacao():
+    """
+    Caches por processo (e por app) usados na autenticação:
+        - tokens: token -> payload já verificado (válido até o `exp` do token)
+
+    Os usuários ficam no cache da aplicação (ver carregar_usuario), para que a
+    invalidação valha para todos os processos quando o cache é compartilhado.
+    """
+    caches = current_app.extensions.get('autenticacao')
+    if caches is None:
+        tamanho = current_app.config.get('AUTH_CACHE_TAMANHO', 1024)
+        caches = current_app.extensions['autenticacao'] = {
+            'tokens': LRUCache(tamanho),
+        }
+    return caches
+
+def decodificar_token(token: str) -> dict:
+    """
+    Verifica o token JWT, reaproveitando a verificação já feita para o mesmo
+    token enquanto ele não expira. Levanta as exceções do PyJWT.
+    """
+    tokens = _caches_autenticacao()['tokens']
+    agora = datetime.now(tz=timezone.utc).timestamp()
+    if (data := tokens.get(token)) is not None:
+        if data.get('exp', agora + 1) > agora:
+            return data
+        tokens.delete(token)
+    
+    data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    tokens.set(token, data, timeout=data['exp'] - agora if 'exp' in data else None)
+    return data
+
+def carregar_usuario(user_id: str) -> Optional[Usuario]:
+    """
+    Retorna o usuário autenticado. Com o usuário em cache, a instância é anexada
+    à sessão sem consulta ao banco (merge com load=False), podendo ser alterada
+    ou removida normalmente pelas rotas.
+
+    As colunas ficam no cache da aplicação (compartilhado entre os processos
+    quando configurado), em uma chave versionada por usuário. A senha não é
+    guardada: ela é carregada do banco apenas se a rota acessá-la.
+    """
+    chave = cache.chave(cache.AUTENTICACAO, user_id)
+    if (dados := cache.obter(chave)) is not None:
+        user = Usuario(**dados)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+    
+    if (user := Usuario.query.filter_by(id=user_id).first()):
+        dados = {coluna: valor for coluna, valor in user.to_dict().items() if coluna != 'senha'}
+        cache.salvar(chave, dados, timeout=current_app.config.get('AUTH_CACHE_TIMEOUT', 60))
+    return user
+
+def invalidar_usuario(user_id: str):
+    """Descarta o usuário do cache de autenticação (chamar após alterá-lo ou removê-lo)."""
+    cache.invalidar(cache.AUTENTICACAO, user_id)
+
 def check_jwt_token(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -16,16 +77,17 @@ def check_jwt_token(f):
             return jsonify({'message': 'Token de autenticação é necessário'}), 403
 
         try:
-            data = jwt.decode(token.split(' ')[1], current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            current_user = Usuario.query.filter_by(id=data['user_id']).first()
+            data = decodificar_token(token.split(' ')[1])
+            current_user = carregar_usuario(data['user_id'])
+            assert current_user
         except jwt.ExpiredSignatureError:
             current_app.logger.error('Token expirado')
             return jsonify({'message': 'Token expirado'}), 401
-        except jwt.InvalidTokenError:
+        except (jwt.InvalidTokenError, AssertionError):
             current_app.logger.error('Token invalido')
             return jsonify({'message': 'Token inválido'}), 401
 
-        current_app.logger.info(f"Usuário {current_user.id} logado com sucesso! ")
+        current_app.logger.info("Usuário %s logado com sucesso! ", current_user.id)
         return f(current_user, *args, **kwargs)
 
     return decorated
@@ -46,7 +108,7 @@ def valide_user(dados:dict)->Usuario:
         assert (sobrenome := dados.get('sobrenome'))
         
     except AssertionError as ae:
-        current_app.logger.error(f"Campo de {ae.args[0]} não foi preenchido")
+        current_app.logger.error("Campo de %s não foi preenchido", ae.args[0])
         return jsonify(
             {"error" : f"O campo de {ae.args[0]} não foi preenchido"}
         ), 403
@@ -1,11 +1,30 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, timezone
-db = SQLAlchemy()
+from operator import attrgetter
+from src.database.routing import SessaoRoteada
+db = SQLAlchemy(session_options={'class_': SessaoRoteada})
 
 class DatabaseModel(db.Model):
     __abstract__ = True
+    
+    # Serialização gerada uma vez por modelo em _gerar_serializadores (fim do
+    # módulo): os nomes das colunas e um attrgetter que lê todos os valores
+    # de uma vez, em vez de percorrer __table__.columns a cada chamada
+    nomes_colunas = ()
+    _valores = None
+    
     def to_dict(self):
-        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+        return dict(zip(self.nomes_colunas, self._valores(self)))
+    
+    @classmethod
+    def colunas(cls, nomes=None) -> list:
+        """Colunas do modelo (todas ou as de `nomes`), para consultas que não precisam carregar a entidade."""
+        return [cls.__table__.c[nome] for nome in (nomes or cls.nomes_colunas)]
+    
+    @classmethod
+    def linha_para_dict(cls, linha, nomes=None) -> dict:
+        """Mesmo formato de to_dict para uma linha de query(*Modelo.colunas(nomes))."""
+        return dict(zip(nomes or cls.nomes_colunas, linha))
 
 class Usuario(DatabaseModel):
     __tablename__ = 'usuario'
@@ -19,7 +38,7 @@ class Usuario(DatabaseModel):
 class Clube(DatabaseModel):
     __tablename__ = 'clube'
     id = db.Column(db.String(10), primary_key=True)
-    criador = db.Column(db.String(10), db.ForeignKey('usuario.id'), nullable=False)
+    criador = db.Column(db.String(10), db.ForeignKey('usuario.id'), nullable=False, index=True)
     nome = db.Column(db.String(255), nullable=False)
     descricao = db.Column(db.String(500))
 
@@ -34,10 +53,14 @@ class Livro(DatabaseModel):
 class Participa(DatabaseModel):
     __tablename__ = 'participa'
     usuario_id = db.Column(db.String(10), db.ForeignKey('usuario.id'), primary_key=True)
-    clube_id = db.Column(db.String(10), db.ForeignKey('clube.id'), primary_key=True)
+    clube_id = db.Column(db.String(10), db.ForeignKey('clube.id'), primary_key=True, index=True)
 
 class Adiciona(DatabaseModel):
     __tablename__ = 'adiciona'
+    __table_args__ = (
+        db.Index('ix_adiciona_clube_id_livro_id', 'clube_id', 'livro_id'),
+        db.Index('ix_adiciona_livro_id', 'livro_id'),
+    )
     usuario_id = db.Column(db.String(10), db.ForeignKey('usuario.id'), primary_key=True)
     clube_id = db.Column(db.String(10), db.ForeignKey('clube.id'), primary_key=True)
     livro_id = db.Column(db.String(10), db.ForeignKey('livro.id'), primary_key=True)
@@ -46,7 +69,74 @@ class Adiciona(DatabaseModel):
 class Avaliacao(DatabaseModel):
     __tablename__ = 'avaliacao'
     avaliador_id = db.Column(db.String(10), db.ForeignKey('usuario.id'), primary_key=True)
-    livro_id = db.Column(db.String(10), db.ForeignKey('livro.id'), primary_key=True)
+    livro_id = db.Column(db.String(10), db.ForeignKey('livro.id'), primary_key=True, index=True)
     descricao = db.Column(db.String(1000))
     estrelas = db.Column(db.Integer, nullable=False)
-    data_avaliacao = db.Column(db.DateTime, nullable=False, default=datetime.now(tz=timezone.utc))
\ No newline at end of file
+    data_avaliacao = db.Column(db.DateTime, nullable=False, default=datetime.now(tz=timezone.utc))
+
+class AvaliacaoResumo(DatabaseModel):
+    __tablename__ = 'avaliacao_resumo'
+    livro_id = db.Column(db.String(10), db.ForeignKey('livro.id'), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    soma_estrelas = db.Column(db.Integer, nullable=False, default=0)
+    estrelas_0 = db.Column(db.Integer, nullable=False, default=0)
+    estrelas_1 = db.Column(db.Integer, nullable=False, default=0)
+    estrelas_2 = db.Column(db.Integer, nullable=False, default=0)
+    estrelas_3 = db.Column(db.Integer, nullable=False, default=0)
+    estrelas_4 = db.Column(db.Integer, nullable=False, default=0)
+    estrelas_5 = db.Column(db.Integer, nullable=False, default=0)
+    
+    @property
+    def media(self):
+        return self.soma_estrelas / self.total if self.total else None
+    
+    @property
+    def histograma(self):
+        return [getattr(self, f'estrelas_{i}') for i in range(6)]
+
+# Vizinhos mais próximos de cada livro, calculados em src/database/recomendacoes.py
+class LivroSimilar(DatabaseModel):
+    __tablename__ = 'livro_similar'
+    livro_id = db.Column(db.String(10), db.ForeignKey('livro.id'), primary_key=True)
+    similar_id = db.Column(db.String(10), db.ForeignKey('livro.id'), primary_key=True)
+    similaridade = db.Column(db.Float, nullable=False)
+
+# Norma da coluna de cada livro na matriz de avaliações centradas, usada na atualização incremental das similaridades
+class LivroNorma(DatabaseModel):
+    __tablename__ = 'livro_norma'
+    livro_id = db.Column(db.String(10), db.ForeignKey('livro.id'), primary_key=True)
+    norma = db.Column(db.Float, nullable=False)
+
+# Avaliações incluídas, alteradas ou removidas desde a última atualização das similaridades
+class RecomendacaoPendente(DatabaseModel):
+    __tablename__ = 'recomendacao_pendente'
+    usuario_id = db.Column(db.String(10), primary_key=True)
+    livro_id = db.Column(db.String(10), primary_key=True)
+
+# Vizinhos mais próximos de cada clube (membros e livros em comum), calculados em src/database/recomendacoes.py
+class ClubeSimilar(DatabaseModel):
+    __tablename__ = 'clube_similar'
+    clube_id = db.Column(db.String(10), db.ForeignKey('clube.id'), primary_key=True)
+    similar_id = db.Column(db.String(10), db.ForeignKey('clube.id'), primary_key=True)
+    similaridade = db.Column(db.Float, nullable=False)
+
+# Clubes com membros ou livros alterados desde a última atualização das similaridades
+class RecomendacaoClubePendente(DatabaseModel):
+    __tablename__ = 'recomendacao_clube_pendente'
+    clube_id = db.Column(db.String(10), primary_key=True)
+
+# Chaves MinHash (LSH) do título e autor de cada livro, usadas na detecção de duplicados (src/database/duplicados.py)
+class LivroAssinatura(DatabaseModel):
+    __tablename__ = 'livro_assinatura'
+    chave = db.Column(db.BigInteger, primary_key=True)
+    livro_id = db.Column(db.String(10), db.ForeignKey('livro.id'), primary_key=True, index=True)
+
+
+def _gerar_serializadores():
+    for modelo in DatabaseModel.__subclasses__():
+        nomes = tuple(coluna.name for coluna in modelo.__table__.columns)
+        getter = attrgetter(*nomes)
+        modelo.nomes_colunas = nomes
+        modelo._valores = getter if len(nomes) > 1 else staticmethod(lambda obj, getter=getter: (getter(obj),))
+
+_gerar_serializadores()
@@ -0,0 +1,162 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from sqlalchemy import event, func, inspect, select, delete, case, tuple_
+from sqlalchemy.dialects.sqlite import insert
+from src.database.models import Avaliacao, AvaliacaoResumo, Livro
+
+# Resumo das avaliações por livro (quantidade, soma e histograma de estrelas),
+# mantido de forma incremental para que a média não precise ser recalculada
+# sobre todas as linhas de avaliacao a cada requisição.
+
+resumo = AvaliacaoResumo.__table__
+COLUNAS_HISTOGRAMA = [f'estrelas_{i}' for i in range(6)]
+
+MEDIA = (
+    AvaliacaoResumo.soma_estrelas * 1.0 / func.nullif(AvaliacaoResumo.total, 0)
+).label('media_avaliacoes')
+
+
+def aplicar_avaliacoes(conn, avaliacoes, sinal: int = 1):
+    """
+    Soma (sinal=1) ou subtrai (sinal=-1) um conjunto de avaliações do resumo.
+
+    Parâmetros de Entrada:
+        - conn : Connection do SQLAlchemy (a mesma transação da escrita)
+        - avaliacoes : iterável de pares (livro_id, estrelas)
+        - sinal : int (1 para inclusão, -1 para remoção)
+
+    As avaliações são agregadas por livro antes da escrita, então o custo é
+    uma linha de UPSERT por livro afetado, independente do tamanho do lote.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for livro_id, estrelas in avaliacoes:
+        delta = deltas[livro_id]
+        delta['total'] += sinal
+        delta['soma_estrelas'] += sinal * estrelas
+        delta[f'estrelas_{estrelas}'] += sinal
+
+    if not deltas:
+        return
+
+    colunas = ['total', 'soma_estrelas', *COLUNAS_HISTOGRAMA]
+    linhas = [
+        {'livro_id': livro_id, **{coluna: delta[coluna] for coluna in colunas}}
+        for livro_id, delta in deltas.items()
+    ]
+
+    stmt = insert(resumo)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[resumo.c.livro_id],
+        set_={coluna: resumo.c[coluna] + stmt.excluded[coluna] for coluna in colunas}
+    )
+    conn.execute(stmt, linhas)
+
+
+# Linhas por comando nas consultas/inserções em lote (limita as variáveis do SQLite)
+TAMANHO_LOTE = 500
+
+
+def _lotes(itens: list, tamanho: int = TAMANHO_LOTE):
+    for inicio in range(0, len(itens), tamanho):
+        yield itens[inicio:inicio + tamanho]
+
+
+def livros_inexistentes(conn, livro_ids) -> set:
+    """Retorna os ids que não existem em livro, com uma consulta IN por lote."""
+    livro_ids = list(set(livro_ids))
+    existentes = set()
+    for lote in _lotes(livro_ids):
+        existentes.update(conn.execute(select(Livro.id).where(Livro.id.in_(lote))).scalars())
+    return set(livro_ids) - existentes
+
+
+def avaliacoes_existentes(conn, pares) -> set:
+    """Retorna os pares (avaliador_id, livro_id) que já possuem avaliação."""
+    pares = list(set(pares))
+    existentes = set()
+    for lote in _lotes(pares):
+        existentes.update(
+            tuple(linha) for linha in conn.execute(
+                select(Avaliacao.avaliador_id, Avaliacao.livro_id)
+                .where(tuple_(Avaliacao.avaliador_id, Avaliacao.livro_id).in_(lote))
+            )
+        )
+    return existentes
+
+
+def inserir_avaliacoes(conn, avaliacoes: list, tamanho_lote: int = TAMANHO_LOTE):
+    """
+    Insere avaliações já validadas com um único INSERT multi-valores por lote
+    e atualiza o resumo uma vez para todas elas (os eventos do ORM não são
+    disparados em inserções Core).
+
+    Parâmetros de Entrada:
+        - conn : Connection do SQLAlchemy (a mesma transação da escrita)
+        - avaliacoes : lista de dicts com avaliador_id, livro_id, descricao e estrelas
+        - tamanho_lote : int (linhas por comando INSERT)
+    """
+    agora = datetime.now(tz=timezone.utc)
+    linhas = [{'descricao': None, **avaliacao, 'data_avaliacao': agora} for avaliacao in avaliacoes]
+    for lote in _lotes(linhas, tamanho_lote):
+        conn.execute(Avaliacao.__table__.insert().values(lote))
+    aplicar_avaliacoes(conn, [(linha['livro_id'], linha['estrelas']) for linha in linhas])
+
+
+def reconstruir_resumos(conn, livro_ids=None):
+    """
+    Recalcula o resumo a partir da tabela avaliacao (carga inicial/reparo):
+    todo o resumo ou apenas o dos livros de `livro_ids`.
+    """
+    if livro_ids is None:
+        conn.execute(delete(resumo))
+        _inserir_resumos(conn, select(Avaliacao.livro_id))
+        return
+
+    for lote in _lotes(list(livro_ids)):
+        conn.execute(delete(resumo).where(resumo.c.livro_id.in_(lote)))
+        _inserir_resumos(conn, select(Avaliacao.livro_id).where(Avaliacao.livro_id.in_(lote)))
+
+
+def _inserir_resumos(conn, consulta):
+    conn.execute(
+        resumo.insert().from_select(
+            ['livro_id', 'total', 'soma_estrelas', *COLUNAS_HISTOGRAMA],
+            consulta.add_columns(
+                func.count(),
+                func.sum(Avaliacao.estrelas),
+                *[func.sum(case((Avaliacao.estrelas == i, 1), else_=0)) for i in range(6)]
+            ).group_by(Avaliacao.livro_id)
+        )
+    )
+
+
+def inicializar_resumos(engine):
+    """Preenche o resumo na primeira execução sobre um banco que já possui avaliações."""
+    with engine.begin() as conn:
+        vazio = conn.execute(select(func.count()).select_from(resumo)).scalar() == 0
+        if vazio and conn.execute(select(Avaliacao.livro_id).limit(1)).first():
+            reconstruir_resumos(conn)
+
+
+@event.listens_for(Avaliacao, 'after_insert')
+def _avaliacao_inserida(mapper, connection, target):
+    aplicar_avaliacoes(connection, [(target.livro_id, target.estrelas)])
+
+
+@event.listens_for(Avaliacao, 'after_delete')
+def _avaliacao_removida(mapper, connection, target):
+    aplicar_avaliacoes(connection, [(target.livro_id, target.estrelas)], sinal=-1)
+
+
+@event.listens_for(Avaliacao, 'after_update')
+def _avaliacao_atualizada(mapper, connection, target):
+    estrelas = inspect(target).attrs.estrelas.history
+    livro = inspect(target).attrs.livro_id.history
+    if not (estrelas.has_changes() or livro.has_changes()):
+        return
+
+    estrelas_antes = estrelas.deleted[0] if estrelas.deleted else target.estrelas
+    livro_antes = livro.deleted[0] if livro.deleted else target.livro_id
+
+    aplicar_avaliacoes(connection, [(livro_antes, estrelas_antes)], sinal=-1)
+    aplicar_avaliacoes(connection, [(target.livro_id, target.estrelas)])
@@ -0,0 +1,594 @@
+import threading
+import time
+from sqlalchemy import event, select, delete, func, exists, inspect, tuple_, bindparam
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import aliased
+from src.database.models import (db, Avaliacao, Livro, LivroSimilar, LivroNorma, RecomendacaoPendente, Clube, Participa,
+                                 Adiciona, ClubeSimilar, RecomendacaoClubePendente)
+from src.database.ratings import _lotes
+from src.utils import cache
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # necessárias apenas para calcular as similaridades
+    np = sparse = None
+
+# Recomendações de livros por similaridade item-item ("quem gostou deste
+# também gostou"). A matriz esparsa usuário x livro é montada a partir de
+# avaliacao com as estrelas centradas na média de cada usuário (cosseno
+# ajustado); a similaridade entre dois livros é o cosseno entre as colunas.
+# Os K_VIZINHOS mais similares de cada livro ficam em livro_similar, e as
+# rotas leem apenas essa tabela.
+#
+# Novas avaliações são registradas em recomendacao_pendente e aplicadas por
+# `atualizar`: só as linhas dos livros afetados (os avaliados pelos usuários
+# pendentes) são recalculadas, e as listas dos demais livros recebem ou perdem
+# apenas esses vizinhos. A matriz usada nesse caso tem apenas os avaliadores
+# dos livros afetados; a norma da coluna dos demais livros não muda e é lida de
+# livro_norma. `reconstruir` recalcula tudo do zero.
+#
+# Os clubes seguem o mesmo esquema (clube_similar): cada clube é uma coluna
+# binária com os seus membros (participa) empilhados sobre os seus livros
+# (adiciona), cada parte normalizada e com o seu peso, de forma que o produto
+# seja PESO_MEMBROS * cosseno dos membros + PESO_LIVROS * cosseno dos livros.
+# Como a coluna de um clube não depende dos outros, só os clubes alterados
+# (recomendacao_clube_pendente) precisam ser recalculados.
+
+K_VIZINHOS = 20
+
+# Livros por bloco no produto esparso (limita a memória da matriz de similaridades)
+TAMANHO_BLOCO = 2000
+
+# Avaliações mais recentes do usuário consideradas nas recomendações
+MAXIMO_HISTORICO = 200
+
+# Centro usado quando todas as notas do usuário são iguais (média sem informação)
+CENTRO_NEUTRO = 2.5
+
+# Peso da semelhança de membros e de livros na similaridade entre clubes
+PESO_MEMBROS = 0.6
+PESO_LIVROS = 0.4
+
+similares = LivroSimilar.__table__
+normas_livros = LivroNorma.__table__
+pendentes = RecomendacaoPendente.__table__
+clubes_similares = ClubeSimilar.__table__
+clubes_pendentes = RecomendacaoClubePendente.__table__
+
+
+def _exigir_numpy():
+    if np is None:
+        raise RuntimeError('O cálculo das recomendações requer numpy e scipy')
+
+
+def _centrada(linhas):
+    """
+    Matriz esparsa usuário x livro com as estrelas centradas na média do usuário
+    (as linhas devem conter todas as avaliações de cada usuário).
+
+    Retorno:
+        (array com os ids dos livros, matriz CSC sem normalizar)
+    """
+    avaliadores, livros, estrelas = zip(*linhas)
+    usuarios, u = np.unique(np.array(avaliadores, dtype=object), return_inverse=True)
+    livros, l = np.unique(np.array(livros, dtype=object), return_inverse=True)
+    estrelas = np.array(estrelas, dtype=np.float64)
+
+    medias = np.bincount(u, weights=estrelas) / np.bincount(u)
+    matriz = sparse.csc_matrix((estrelas - medias[u], (u, l)), shape=(len(usuarios), len(livros)))
+    matriz.eliminate_zeros()
+    return livros, matriz
+
+
+def _normas(matriz):
+    return np.sqrt(np.asarray(matriz.multiply(matriz).sum(axis=0)).ravel())
+
+
+def _normalizar(matriz, peso: float = 1.0, normas=None):
+    """
+    Divide cada coluna pela sua norma (colunas vazias continuam vazias) e multiplica por sqrt(peso).
+    As normas podem ser informadas quando a matriz não tem todas as linhas de cada coluna.
+    """
+    normas = _normas(matriz) if normas is None else normas
+    inversas = np.divide(np.sqrt(peso), normas, out=np.zeros_like(normas), where=normas > 0)
+    return (matriz @ sparse.diags(inversas)).tocsc()
+
+
+def _matriz(conn):
+    """
+    Monta a matriz esparsa usuário x livro com as estrelas centradas na média do
+    usuário; com as colunas normalizadas (norma 1), R.T @ R é o cosseno.
+
+    Retorno:
+        (array com os ids dos livros, matriz CSC sem normalizar)
+    """
+    linhas = conn.execute(select(Avaliacao.avaliador_id, Avaliacao.livro_id, Avaliacao.estrelas)).all()
+    if not linhas:
+        return np.array([], dtype=object), sparse.csc_matrix((0, 0))
+    return _centrada(linhas)
+
+
+# Quadrado da norma da coluna de cada livro (todas as avaliações, centradas na
+# média de cada avaliador), calculado no banco. Usado apenas para os livros sem
+# linha em livro_norma (ex.: banco anterior à tabela)
+_outra = aliased(Avaliacao)
+_desvios = (
+    select(Avaliacao.livro_id, (Avaliacao.estrelas - (
+        select(func.avg(_outra.estrelas)).where(_outra.avaliador_id == Avaliacao.avaliador_id).scalar_subquery()
+    )).label('desvio'))
+    .where(Avaliacao.livro_id.in_(bindparam('livros', expanding=True)))
+    .subquery()
+)
+_NORMAS = select(_desvios.c.livro_id, func.sum(_desvios.c.desvio * _desvios.c.desvio)).group_by(_desvios.c.livro_id)
+
+
+def _matriz_afetados(conn, afetados: set):
+    """
+    Matriz restrita aos avaliadores dos livros afetados (com todas as avaliações
+    deles). Ela basta para os produtos das colunas afetadas, pois só esses
+    usuários têm nota nos livros afetados, e também dá as normas exatas dessas
+    colunas; as dos demais livros não mudaram e vêm de livro_norma.
+
+    Retorno:
+        (array com os ids dos livros, matriz CSC sem normalizar, array com as normas)
+    """
+    usuarios = set()
+    for lote in _lotes(list(afetados)):
+        usuarios.update(conn.execute(
+            select(Avaliacao.avaliador_id).where(Avaliacao.livro_id.in_(lote)).distinct()
+        ).scalars())
+
+    linhas = []
+    for lote in _lotes(list(usuarios)):
+        linhas += conn.execute(
+            select(Avaliacao.avaliador_id, Avaliacao.livro_id, Avaliacao.estrelas).where(Avaliacao.avaliador_id.in_(lote))
+        ).all()
+    if not linhas:
+        return np.array([], dtype=object), sparse.csc_matrix((0, 0)), np.zeros(0)
+
+    livros, matriz = _centrada(linhas)
+    normas = _normas(matriz)
+    posicoes = {id: i for i, id in enumerate(livros)}
+    outros = [id for id in livros if id not in afetados]
+    faltando = set(outros)
+    for lote in _lotes(outros):
+        for livro_id, norma in conn.execute(select(normas_livros).where(normas_livros.c.livro_id.in_(lote))):
+            normas[posicoes[livro_id]] = norma
+            faltando.discard(livro_id)
+    for lote in _lotes(list(faltando)):
+        for livro_id, quadrado in conn.execute(_NORMAS, {'livros': lote}):
+            normas[posicoes[livro_id]] = np.sqrt(max(quadrado, 0.0))
+    return livros, matriz, normas
+
+
+def _gravar_normas(conn, livros, normas, afetados=None):
+    """Substitui as normas dos livros afetados (todas, sem `afetados`)."""
+    if afetados is None:
+        conn.execute(delete(normas_livros))
+    else:
+        for lote in _lotes(list(afetados)):
+            conn.execute(delete(normas_livros).where(normas_livros.c.livro_id.in_(lote)))
+    _gravar(conn, normas_livros, [
+        {'livro_id': livro_id, 'norma': float(norma)}
+        for livro_id, norma in zip(livros, normas)
+        if norma > 0 and (afetados is None or livro_id in afetados)
+    ])
+
+
+# Membros e livros (sem repetição) dos clubes existentes
+_MEMBROS = select(Participa.usuario_id, Participa.clube_id).join(Clube, Clube.id == Participa.clube_id)
+_LIVROS_CLUBES = select(Adiciona.livro_id, Adiciona.clube_id).join(Clube, Clube.id == Adiciona.clube_id).distinct()
+
+
+def _montar_clubes(membros: list, livros: list):
+    """
+    Monta a matriz esparsa (usuários + livros) x clube: membros e livros de cada
+    clube como colunas binárias, cada parte normalizada e ponderada.
+
+    Retorno:
+        (array com os ids dos clubes, matriz CSC)
+    """
+    if not membros and not livros:
+        return np.array([], dtype=object), sparse.csc_matrix((0, 0))
+
+    clubes = np.unique(np.array([clube_id for _, clube_id in membros + livros], dtype=object))
+    partes = []
+    for linhas, peso in ((membros, PESO_MEMBROS), (livros, PESO_LIVROS)):
+        if not linhas:
+            continue
+        origem, destino = zip(*linhas)
+        ids, i = np.unique(np.array(origem, dtype=object), return_inverse=True)
+        c = np.searchsorted(clubes, np.array(destino, dtype=object))
+        binaria = sparse.csc_matrix((np.ones(len(linhas)), (i, c)), shape=(len(ids), len(clubes)))
+        partes.append(_normalizar(binaria, peso))
+    return clubes, sparse.vstack(partes).tocsc()
+
+
+def _matriz_clubes(conn):
+    """Matriz de todos os clubes (ver _montar_clubes)."""
+    return _montar_clubes(conn.execute(_MEMBROS).all(), conn.execute(_LIVROS_CLUBES).all())
+
+
+def _matriz_clubes_afetados(conn, afetados: set):
+    """
+    Matriz restrita aos clubes afetados e aos que têm algum membro ou livro em
+    comum com eles (com todos os membros e livros de cada um). Os demais clubes
+    têm similaridade zero com os afetados, e como cada coluna é normalizada
+    sozinha, as colunas carregadas são iguais às da matriz completa.
+
+    Retorno:
+        (array com os ids dos clubes, matriz CSC)
+    """
+    incluidos = set(afetados)
+    for lote in _lotes(list(afetados)):
+        membros = select(Participa.usuario_id).where(Participa.clube_id.in_(lote))
+        livros = select(Adiciona.livro_id).where(Adiciona.clube_id.in_(lote))
+        incluidos.update(conn.execute(
+            select(Participa.clube_id).where(Participa.usuario_id.in_(membros)).distinct()
+        ).scalars())
+        incluidos.update(conn.execute(
+            select(Adiciona.clube_id).where(Adiciona.livro_id.in_(livros)).distinct()
+        ).scalars())
+
+    membros, livros = [], []
+    for lote in _lotes(list(incluidos)):
+        membros += conn.execute(_MEMBROS.where(Participa.clube_id.in_(lote))).all()
+        livros += conn.execute(_LIVROS_CLUBES.where(Adiciona.clube_id.in_(lote))).all()
+    return _montar_clubes(membros, livros)
+
+
+def _similaridades(matriz, indices):
+    """
+    Gera (coluna, vizinhos, similaridades) para as colunas pedidas, com todos os
+    vizinhos de similaridade positiva. O produto é feito em blocos de colunas.
+    """
+    transposta = matriz.T.tocsr()
+    for inicio in range(0, len(indices), TAMANHO_BLOCO):
+        bloco = indices[inicio:inicio + TAMANHO_BLOCO]
+        produto = (transposta[bloco] @ matriz).tocsr()
+        for linha, coluna in enumerate(bloco):
+            ini, fim = produto.indptr[linha], produto.indptr[linha + 1]
+            vizinhos, valores = produto.indices[ini:fim], produto.data[ini:fim]
+            mascara = (vizinhos != coluna) & (valores > 1e-9)
+            yield coluna, vizinhos[mascara], valores[mascara]
+
+
+def _top(vizinhos, valores, k: int):
+    if len(valores) > k:
+        escolhidos = np.argpartition(-valores, k)[:k]
+        vizinhos, valores = vizinhos[escolhidos], valores[escolhidos]
+    return vizinhos, valores
+
+
+def _gravar(conn, tabela, linhas: list):
+    for lote in _lotes(linhas, 5000):
+        conn.execute(tabela.insert(), lote)
+
+
+def _linhas(tabela, origem, vizinhos, valores) -> list:
+    # Colunas de livro_similar e clube_similar: (origem, similar_id, similaridade)
+    chave = tabela.c[0].name
+    return [{chave: origem, 'similar_id': similar, 'similaridade': float(s)} for similar, s in zip(vizinhos, valores)]
+
+
+def _recalcular_tudo(conn, tabela, ids, matriz, k: int) -> int:
+    conn.execute(delete(tabela))
+    total, linhas = 0, []
+    for coluna, vizinhos, valores in _similaridades(matriz, np.arange(len(ids))):
+        vizinhos, valores = _top(vizinhos, valores, k)
+        linhas += _linhas(tabela, ids[coluna], ids[vizinhos], valores)
+        if len(linhas) >= 5000:
+            _gravar(conn, tabela, linhas)
+            total, linhas = total + len(linhas), []
+    _gravar(conn, tabela, linhas)
+    return total + len(linhas)
+
+
+def _recalcular_afetados(conn, tabela, ids, matriz, afetados: set, k: int) -> list:
+    """
+    Recalcula a lista dos ids afetados e, nos demais, insere, atualiza ou remove
+    apenas os pares com os afetados, mantendo os K mais similares.
+
+    Retorno:
+        Ids cuja lista de vizinhos mudou.
+    """
+    origem, similar = tabela.c[0], tabela.c.similar_id
+    posicoes = {id: i for i, id in enumerate(ids)}
+    indices = np.array(sorted(posicoes[id] for id in afetados if id in posicoes), dtype=np.int64)
+
+    # Novas listas dos afetados e candidatos (afetado como vizinho) para os demais
+    novas, candidatos = {}, {}
+    for coluna, vizinhos, valores in _similaridades(matriz, indices):
+        novas[ids[coluna]] = _top(vizinhos, valores, k)
+        for v, s in zip(vizinhos, valores):
+            if ids[v] not in afetados:
+                candidatos.setdefault(ids[v], {})[ids[coluna]] = float(s)
+
+    # Listas atuais dos demais que tinham algum afetado como vizinho
+    contendo = set()
+    for lote in _lotes(list(afetados)):
+        contendo.update(id for id in conn.execute(select(origem).where(similar.in_(lote)).distinct()).scalars()
+                        if id not in afetados)
+    for id in contendo:
+        candidatos.setdefault(id, {})
+
+    # Nas demais listas, só entram os candidatos acima do K-ésimo vizinho atual
+    for lote in _lotes([id for id in candidatos if id not in contendo]):
+        for id, total, menor in conn.execute(
+            select(origem, func.count(), func.min(tabela.c.similaridade)).where(origem.in_(lote)).group_by(origem)
+        ):
+            if total < k:
+                continue
+            if (acima := {afetado: s for afetado, s in candidatos[id].items() if s > menor}):
+                candidatos[id] = acima
+            else:
+                del candidatos[id]
+
+    alterados = list(afetados)
+    linhas = []
+    for lote in _lotes(list(candidatos)):
+        atuais = {}
+        for id, similar_id, similaridade in conn.execute(select(tabela).where(origem.in_(lote))):
+            if similar_id not in afetados:
+                atuais.setdefault(id, {})[similar_id] = similaridade
+
+        for id in lote:
+            vizinhos = sorted({**atuais.get(id, {}), **candidatos[id]}.items(), key=lambda item: -item[1])[:k]
+            linhas += _linhas(tabela, id, [v for v, _ in vizinhos], [s for _, s in vizinhos])
+        conn.execute(delete(tabela).where(origem.in_(lote)))
+        alterados += lote
+
+    for lote in _lotes(list(afetados)):
+        conn.execute(delete(tabela).where(origem.in_(lote)))
+    for id, (vizinhos, valores) in novas.items():
+        linhas += _linhas(tabela, id, ids[vizinhos], valores)
+    _gravar(conn, tabela, linhas)
+    return alterados
+
+
+def reconstruir(conn, k: int = K_VIZINHOS) -> int:
+    """
+    Recalcula os vizinhos de todos os livros e limpa as pendências.
+
+    Retorno:
+        Quantidade de pares gravados em livro_similar.
+    """
+    _exigir_numpy()
+    livros, matriz = _matriz(conn)
+    normas = _normas(matriz)
+    _gravar_normas(conn, livros, normas)
+    conn.execute(delete(pendentes))
+    return _recalcular_tudo(conn, similares, livros, _normalizar(matriz, normas=normas), k)
+
+
+def atualizar(conn, k: int = K_VIZINHOS) -> list:
+    """
+    Aplica as avaliações pendentes. Os livros afetados (avaliados pelos usuários
+    pendentes, incluindo avaliações removidas) têm a lista recalculada; nos
+    demais livros, apenas os pares com os afetados mudam. Um livro que perde
+    um vizinho fica com menos de K até a próxima reconstrução. Só as avaliações
+    dos avaliadores dos livros afetados são lidas.
+
+    Retorno:
+        Ids dos livros cuja lista de vizinhos mudou.
+    """
+    _exigir_numpy()
+    pendencias = [tuple(linha) for linha in conn.execute(select(pendentes.c.usuario_id, pendentes.c.livro_id))]
+    if not pendencias:
+        return []
+
+    afetados = {livro_id for _, livro_id in pendencias}
+    usuarios = list({usuario_id for usuario_id, _ in pendencias})
+    for lote in _lotes(usuarios):
+        afetados.update(conn.execute(
+            select(Avaliacao.livro_id).where(Avaliacao.avaliador_id.in_(lote)).distinct()
+        ).scalars())
+
+    livros, matriz, normas = _matriz_afetados(conn, afetados)
+    _gravar_normas(conn, livros, normas, afetados)
+    alterados = _recalcular_afetados(conn, similares, livros, _normalizar(matriz, normas=normas), afetados, k)
+
+    # Só as pendências lidas: avaliações gravadas durante o cálculo ficam para a próxima
+    for lote in _lotes(pendencias):
+        conn.execute(delete(pendentes).where(tuple_(pendentes.c.usuario_id, pendentes.c.livro_id).in_(lote)))
+    return alterados
+
+
+def reconstruir_clubes(conn, k: int = K_VIZINHOS) -> int:
+    """
+    Recalcula os vizinhos de todos os clubes e limpa as pendências.
+
+    Retorno:
+        Quantidade de pares gravados em clube_similar.
+    """
+    _exigir_numpy()
+    clubes, matriz = _matriz_clubes(conn)
+    conn.execute(delete(clubes_pendentes))
+    return _recalcular_tudo(conn, clubes_similares, clubes, matriz, k)
+
+
+def atualizar_clubes(conn, k: int = K_VIZINHOS) -> list:
+    """
+    Recalcula os clubes cujos membros ou livros mudaram (incluindo clubes
+    removidos, que saem das listas dos demais). Só os clubes que têm membros ou
+    livros em comum com os afetados são lidos.
+
+    Retorno:
+        Ids dos clubes cuja lista de vizinhos mudou.
+    """
+    _exigir_numpy()
+    afetados = set(conn.execute(select(clubes_pendentes.c.clube_id)).scalars())
+    if not afetados:
+        return []
+
+    clubes, matriz = _matriz_clubes_afetados(conn, afetados)
+    alterados = _recalcular_afetados(conn, clubes_similares, clubes, matriz, afetados, k)
+    for lote in _lotes(list(afetados)):
+        conn.execute(delete(clubes_pendentes).where(clubes_pendentes.c.clube_id.in_(lote)))
+    return alterados
+
+
+def marcar_pendentes(conn, pares):
+    """Registra pares (usuario_id, livro_id) cujas avaliações mudaram."""
+    linhas = [{'usuario_id': usuario_id, 'livro_id': livro_id} for usuario_id, livro_id in pares]
+    for lote in _lotes(linhas):
+        conn.execute(insert(pendentes).on_conflict_do_nothing(), lote)
+
+
+def marcar_clubes_pendentes(conn, clube_ids):
+    """Registra clubes cujos membros ou livros mudaram."""
+    linhas = [{'clube_id': clube_id} for clube_id in set(clube_ids)]
+    for lote in _lotes(linhas):
+        conn.execute(insert(clubes_pendentes).on_conflict_do_nothing(), lote)
+
+
+def similares_do_livro(livro_id: str, limite: int = 10):
+    """Vizinhos de um livro, do mais para o menos similar."""
+    return (
+        db.session.query(Livro.id, Livro.nome, Livro.autor, LivroSimilar.similaridade)
+        .join(LivroSimilar, LivroSimilar.similar_id == Livro.id)
+        .filter(LivroSimilar.livro_id == livro_id)
+        .order_by(LivroSimilar.similaridade.desc(), Livro.id)
+        .limit(limite)
+        .all()
+    )
+
+
+def recomendar_para_usuario(usuario_id: str, limite: int = 10):
+    """
+    Livros ainda não avaliados pelo usuário, ordenados pela soma das
+    similaridades com os livros que ele avaliou, ponderadas pela nota centrada
+    na média do usuário (notas abaixo da média afastam os vizinhos).
+    """
+    media, menor, maior = db.session.query(
+        func.avg(Avaliacao.estrelas), func.min(Avaliacao.estrelas), func.max(Avaliacao.estrelas)
+    ).filter(Avaliacao.avaliador_id == usuario_id).one()
+    if media is None:
+        return []
+    centro = media if maior > menor else CENTRO_NEUTRO
+
+    historico = (
+        select(Avaliacao.livro_id, Avaliacao.estrelas)
+        .where(Avaliacao.avaliador_id == usuario_id)
+        .order_by(Avaliacao.data_avaliacao.desc())
+        .limit(MAXIMO_HISTORICO)
+        .subquery()
+    )
+    pontuacao = func.sum(LivroSimilar.similaridade * (historico.c.estrelas - centro))
+    return (
+        db.session.query(Livro.id, Livro.nome, Livro.autor, pontuacao.label('pontuacao'))
+        .select_from(historico)
+        .join(LivroSimilar, LivroSimilar.livro_id == historico.c.livro_id)
+        .join(Livro, Livro.id == LivroSimilar.similar_id)
+        .filter(~exists().where(Avaliacao.avaliador_id == usuario_id, Avaliacao.livro_id == LivroSimilar.similar_id))
+        .group_by(Livro.id, Livro.nome, Livro.autor)
+        .having(pontuacao > 0)
+        .order_by(pontuacao.desc(), Livro.id)
+        .limit(limite)
+        .all()
+    )
+
+
+def recomendar_clubes(usuario_id: str, limite: int = 10):
+    """
+    Clubes dos quais o usuário ainda não participa, ordenados pela soma das
+    similaridades (membros e livros em comum) com os clubes dele.
+    """
+    meus = select(Participa.clube_id).where(Participa.usuario_id == usuario_id)
+    pontuacao = func.sum(ClubeSimilar.similaridade)
+    return (
+        db.session.query(Clube.id, Clube.nome, Clube.descricao, pontuacao.label('pontuacao'))
+        .select_from(ClubeSimilar)
+        .join(Clube, Clube.id == ClubeSimilar.similar_id)
+        .filter(ClubeSimilar.clube_id.in_(meus), ClubeSimilar.similar_id.not_in(meus))
+        .group_by(Clube.id, Clube.nome, Clube.descricao)
+        .order_by(pontuacao.desc(), Clube.id)
+        .limit(limite)
+        .all()
+    )
+
+
+@event.listens_for(Avaliacao, 'after_insert')
+@event.listens_for(Avaliacao, 'after_delete')
+def _avaliacao_alterada(mapper, connection, target):
+    marcar_pendentes(connection, [(target.avaliador_id, target.livro_id)])
+
+
+@event.listens_for(Avaliacao, 'after_update')
+def _avaliacao_atualizada(mapper, connection, target):
+    livro = inspect(target).attrs.livro_id.history
+    if not (inspect(target).attrs.estrelas.history.has_changes() or livro.has_changes()):
+        return
+    marcar_pendentes(connection, [(target.avaliador_id, livro_id) for livro_id in {target.livro_id, *livro.deleted}])
+
+
+@event.listens_for(Participa, 'after_insert')
+@event.listens_for(Participa, 'after_delete')
+@event.listens_for(Adiciona, 'after_insert')
+@event.listens_for(Adiciona, 'after_delete')
+def _clube_alterado(mapper, connection, target):
+    marcar_clubes_pendentes(connection, [target.clube_id])
+
+
+@event.listens_for(Clube, 'after_delete')
+def _clube_removido(mapper, connection, target):
+    marcar_clubes_pendentes(connection, [target.id])
+
+
+def _atualizar_periodicamente(app, intervalo: float):
+    while True:
+        time.sleep(intervalo)
+        with app.app_context():
+            try:
+                k = app.config['RECOMENDACOES_VIZINHOS']
+                with db.engine.begin() as conn:
+                    alterados = atualizar(conn, k)
+                if alterados:
+                    cache.invalidar(cache.LIVRO_SIMILARES, *alterados)
+                    app.logger.info("Similaridades atualizadas para %d livros", len(alterados))
+                with db.engine.begin() as conn:
+                    if (alterados := atualizar_clubes(conn, k)):
+                        app.logger.info("Similaridades atualizadas para %d clubes", len(alterados))
+            except Exception as e:
+                app.logger.error("Erro ao atualizar as recomendações: %s", e)
+
+
+def registrar(app):
+    """
+    Com RECOMENDACOES_INTERVALO (segundos), aplica as avaliações e os clubes
+    pendentes periodicamente em uma thread separada. Sem ele (padrão, já que
+    cada worker WSGI teria a sua thread), o comando `python -m
+    src.database.recomendacoes` deve ser agendado (ex.: cron).
+    """
+    if (intervalo := app.config.get('RECOMENDACOES_INTERVALO')):
+        threading.Thread(target=_atualizar_periodicamente, args=(app, intervalo), daemon=True).start()
+    return app
+
+
+if __name__ == '__main__':
+    # Uso: python -m src.database.recomendacoes [--completo] [--k 20]
+    import argparse
+    from src.app import create_app
+
+    parser = argparse.ArgumentParser(description='Calcula as similaridades entre livros (avaliações) e entre clubes (membros e livros).')
+    parser.add_argument('--completo', action='store_true', help='recalcula todos os livros e clubes (padrão: apenas os pendentes)')
+    parser.add_argument('--k', type=int, help='vizinhos por livro e por clube (padrão: RECOMENDACOES_VIZINHOS)')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        k = args.k or app.config['RECOMENDACOES_VIZINHOS']
+        for nome, completo, incremental in (('livros', reconstruir, atualizar), ('clubes', reconstruir_clubes, atualizar_clubes)):
+            inicio = time.perf_counter()
+            alterados = []
+            with db.engine.begin() as conn:
+                if args.completo:
+                    print(f'{nome}: {completo(conn, k)} pares gravados', end='')
+                else:
+                    alterados = incremental(conn, k)
+                    print(f'{nome}: {len(alterados)} atualizados', end='')
+            print(f' em {time.perf_counter() - inicio:.1f} s')
+            if nome == 'livros' and alterados:
+                # Efetivo quando o cache é compartilhado entre processos (SharedCache)
+                cache.invalidar(cache.LIVRO_SIMILARES, *alterados)
@@ -0,0 +1,46 @@
+from flask import g, has_request_context
+from flask_sqlalchemy.session import Session
+
+# Roteamento de leituras para a réplica. A decisão de cada requisição fica em
+# `g.rotear_leitura` (definida em engine.registrar_roteamento); aqui a sessão
+# apenas escolhe o engine de cada comando.
+
+# Bind usado pelo caminho somente leitura (db.engines[BIND_LEITURA])
+BIND_LEITURA = 'leitura'
+
+
+def usar_primario():
+    """Força as próximas leituras da requisição atual a irem para o banco primário."""
+    if has_request_context():
+        g.rotear_leitura = False
+
+
+def marcar_escrita():
+    """
+    Registra que a requisição escreveu no banco; as leituras seguintes vão para
+    o primário. A sessão chama sozinha; as rotas só precisam chamar ao escrever
+    por comandos do Core direto na conexão, que não passam pelo get_bind.
+    """
+    if has_request_context():
+        g.escrita_banco = True
+        g.rotear_leitura = False
+
+
+class SessaoRoteada(Session):
+    """
+    Sessão que envia os SELECTs para o bind BIND_LEITURA quando a requisição
+    permite; escritas (flush) e demais comandos vão sempre para o primário.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if self._flushing or getattr(clause, 'is_dml', False):
+            marcar_escrita()
+        elif (
+            bind is None
+            and getattr(clause, 'is_select', False)
+            and has_request_context()
+            and g.get('rotear_leitura')
+            and BIND_LEITURA in self._db.engines
+        ):
+            return self._db.engines[BIND_LEITURA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,138 @@
+import re
+from sqlalchemy import event, text, table, column, literal_column, Float
+from src.database.models import Livro
+
+# Tabela virtual FTS5 espelhando as colunas textuais de Livro. O conteúdo fica
+# apenas na tabela livro (external content), o índice guarda somente os tokens.
+FTS_TABLE = 'livro_fts'
+FTS_COLUMNS = ('nome', 'autor', 'genero', 'descricao')
+
+# Relevância BM25 (menor é mais relevante), usada na ordenação dos resultados
+RANK = literal_column(f'bm25({FTS_TABLE})', Float)
+
+MODO_FULLTEXT = 'fulltext'
+MODO_SUBSTRING = 'substring'
+
+_CREATE_FTS = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    {', '.join(FTS_COLUMNS)},
+    content='livro',
+    content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+_new_values = ', '.join(f'new.{c}' for c in FTS_COLUMNS)
+_old_values = ', '.join(f'old.{c}' for c in FTS_COLUMNS)
+_columns = ', '.join(FTS_COLUMNS)
+
+_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON livro BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.rowid, {_new_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON livro BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.rowid, {_old_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON livro BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.rowid, {_old_values});
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.rowid, {_new_values});
+    END
+    """,
+)
+
+
+def fts_disponivel(engine) -> bool:
+    """Indica se o banco suporta FTS5 (apenas SQLite compilado com a extensão)."""
+    if engine.dialect.name != 'sqlite':
+        return False
+    with engine.connect() as conn:
+        options = conn.execute(text('PRAGMA compile_options')).scalars().all()
+    return 'ENABLE_FTS5' in options
+
+
+def criar_indice_livros(engine) -> bool:
+    """
+    Cria (se necessário) a tabela FTS5 de livros e os triggers que a mantêm
+    sincronizada em INSERT/UPDATE/DELETE. Quando a tabela é criada sobre um
+    banco já existente, o índice é reconstruído a partir da tabela livro.
+
+    Retorno:
+        True se o índice está disponível, False caso o banco não suporte FTS5.
+    """
+    if not fts_disponivel(engine):
+        return False
+
+    with engine.begin() as conn:
+        existia = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"),
+            {'nome': FTS_TABLE}
+        ).first() is not None
+
+        conn.execute(text(_CREATE_FTS))
+        for trigger in _TRIGGERS:
+            conn.execute(text(trigger))
+
+        if not existia:
+            reconstruir_indice_livros(conn)
+
+    return True
+
+
+def reconstruir_indice_livros(conn):
+    """
+    Reconstrói todo o índice a partir da tabela livro. Necessário após um
+    VACUUM, que pode renumerar os rowids da tabela livro.
+    """
+    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def montar_consulta_fts(termos: dict) -> str:
+    """
+    Monta a expressão MATCH do FTS5 a partir de um dicionário coluna -> texto.
+
+    Cada palavra do texto vira um token entre aspas com busca por prefixo,
+    todas obrigatórias dentro da coluna; colunas diferentes são combinadas
+    com OR, como na busca por substring. A correspondência é por início de
+    palavra, não por trecho: `genero=a` encontra "Aventura", mas não "Romance".
+    Textos sem nenhuma palavra (só pontuação) não geram cláusula.
+    """
+    clausulas = []
+    for coluna, valor in termos.items():
+        if not valor:
+            continue
+        tokens = re.findall(r'\w+', valor)
+        if not tokens:
+            continue
+        frase = ' '.join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+        clausulas.append(f'{coluna} : ({frase})')
+    return ' OR '.join(clausulas)
+
+
+def buscar_livros_fts(termos: dict):
+    """
+    Retorna a query de Livro filtrada pelo índice FTS5, ordenada pelo BM25
+    (mais relevantes primeiro), ou None se nenhum termo pesquisável foi dado.
+    """
+    expressao = montar_consulta_fts(termos)
+    if not expressao:
+        return None
+
+    fts = table(FTS_TABLE, column('rowid'))
+
+    return (
+        Livro.query
+        .join(fts, fts.c.rowid == literal_column('livro.rowid'))
+        .filter(text(f'{FTS_TABLE} MATCH :expressao').bindparams(expressao=expressao))
+        .order_by(RANK)
+    )
+
+
+@event.listens_for(Livro.__table__, 'before_drop')
+def _drop_livro_fts(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text(f'DROP TABLE IF EXISTS {FTS_TABLE}'))
@@ -0,0 +1,286 @@
+import heapq
+import math
+import random
+import time
+from bisect import bisect
+from dataclasses import dataclass, fields
+from itertools import accumulate
+from sqlalchemy import insert
+from src.database.models import db, Usuario, Clube, Livro, Participa, Adiciona, Avaliacao
+from src.database import ratings, duplicados
+
+# Gerador determinístico de dados sintéticos em escala de produção. A mesma
+# semente (e escala) gera sempre as mesmas linhas; cada tabela usa um gerador
+# aleatório próprio, derivado da semente, então mudar a quantidade de
+# avaliações não altera os clubes, por exemplo.
+#
+# A assimetria segue uma distribuição de Zipf (o k-ésimo item tem peso 1/k^s):
+# poucos clubes muito grandes e muitos pequenos, poucos livros muito populares
+# (mais adicionados e avaliados), poucos autores com muitos livros e poucos
+# usuários muito ativos. As linhas são geradas sob demanda e gravadas em lotes
+# (executemany, uma transação por lote), como na importação.
+
+TAMANHO_LOTE = 10000
+
+# Senha de todos os usuários gerados (permite exercitar o login)
+SENHA = 'Senha@123'
+
+GENEROS = ['Romance', 'Fantasia', 'Ficção Científica', 'Suspense', 'Poesia', 'Biografia', 'História', 'Terror',
+           'Aventura', 'Drama', 'Policial', 'Filosofia']
+PALAVRAS = ['Jardim', 'Silêncio', 'Cidade', 'Mar', 'Sombra', 'Memória', 'Viagem', 'Noite', 'Casa', 'Rio',
+            'Tempo', 'Segredo', 'Estrela', 'Montanha', 'Carta', 'Herança', 'Ilha', 'Guerra', 'Caminho', 'Sonho']
+ADJETIVOS = ['Perdido', 'Antigo', 'Secreto', 'Eterno', 'Distante', 'Esquecido', 'Último', 'Invisível',
+             'Profundo', 'Dourado']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Costa', 'Almeida', 'Ferreira', 'Rocha']
+
+# Peso de cada nota (0 a 5) nas avaliações
+PESOS_ESTRELAS = [2, 3, 8, 20, 35, 32]
+
+# Limite de avaliações do usuário mais ativo (o excesso vai para os demais usuários)
+MAXIMO_AVALIACOES_USUARIO = 2000
+
+
+@dataclass
+class Escala:
+    usuarios: int = 10000
+    clubes: int = 1000
+    livros: int = 50000
+    membros_por_clube: float = 15        # média de participações por clube
+    livros_por_membro: float = 1.5       # média de livros adicionados por membro
+    avaliacoes_por_usuario: float = 20   # média de avaliações por usuário
+    livros_por_autor: float = 20
+    expoente: float = 1.1                # expoente s da distribuição de Zipf
+    semente: int = 42
+
+    @classmethod
+    def pequena(cls, **kwargs):
+        """Escala dos testes: gera alguns milhares de linhas em menos de um segundo."""
+        return cls(**{'usuarios': 300, 'clubes': 40, 'livros': 1000, **kwargs})
+
+    @property
+    def autores(self) -> int:
+        return max(1, round(self.livros / self.livros_por_autor))
+
+
+class Zipf:
+    """Sorteia índices 0..n-1 com peso 1/(k+1)^s, por busca binária nos pesos acumulados."""
+
+    def __init__(self, n: int, expoente: float):
+        self.pesos = [1 / (k + 1) ** expoente for k in range(n)]
+        self.acumulado = list(accumulate(self.pesos))
+        self.total = self.acumulado[-1]
+
+    def sortear(self, aleatorio: random.Random) -> int:
+        return bisect(self.acumulado, aleatorio.random() * self.total)
+
+    def distintos(self, aleatorio: random.Random, quantidade: int) -> list:
+        """`quantidade` índices distintos (limitada a n), preservando a assimetria."""
+        n = len(self.pesos)
+        quantidade = min(quantidade, n)
+        if quantidade > n // 4:
+            # Perto de n o sorteio com rejeição quase não encontra itens novos:
+            # amostragem ponderada sem reposição (chave log(u)/peso, Efraimidis-Spirakis)
+            return sorted(heapq.nlargest(
+                quantidade, range(n), key=lambda k: math.log(1 - aleatorio.random()) / self.pesos[k]
+            ))
+        escolhidos = set()
+        while len(escolhidos) < quantidade:
+            escolhidos.add(self.sortear(aleatorio))
+        return sorted(escolhidos)
+
+    def tamanhos(self, total: int, maximo: int) -> list:
+        """
+        Divide `total` entre os n itens proporcionalmente aos pesos (mínimo 1,
+        máximo `maximo`). O excesso dos itens limitados em `maximo` é repartido
+        entre os demais, também proporcionalmente, de forma que a soma fique
+        perto de `total` (só fica abaixo se n * maximo < total).
+        """
+        # Os pesos são decrescentes: os itens limitados são sempre os primeiros
+        tamanhos, restante, peso_livre = [], total, self.total
+        for peso in self.pesos:
+            if peso_livre <= 0 or restante * peso / peso_livre < maximo:
+                break
+            tamanhos.append(maximo)
+            restante, peso_livre = restante - maximo, peso_livre - peso
+        return tamanhos + [
+            min(maximo, max(1, round(restante * peso / peso_livre))) for peso in self.pesos[len(tamanhos):]
+        ]
+
+
+def usuario_id(i: int) -> str:
+    return f'U{i:07d}'
+
+
+def clube_id(i: int) -> str:
+    return f'C{i:07d}'
+
+
+def livro_id(i: int) -> str:
+    return f'L{i:07d}'
+
+
+def _aleatorio(escala: Escala, tabela: str) -> random.Random:
+    return random.Random(f'{escala.semente}:{tabela}')
+
+
+def usuarios(escala: Escala):
+    aleatorio = _aleatorio(escala, 'usuario')
+    for i in range(escala.usuarios):
+        yield {
+            'id': usuario_id(i),
+            'email': f'u{i}@bookbridge.com',
+            'senha': SENHA,
+            'nickname': f'u{i}',
+            'nome': f'Usuário {i}',
+            'sobrenome': aleatorio.choice(SOBRENOMES),
+        }
+
+
+def livros(escala: Escala):
+    aleatorio = _aleatorio(escala, 'livro')
+    autores = Zipf(escala.autores, escala.expoente)
+    for i in range(escala.livros):
+        palavra, adjetivo = aleatorio.choice(PALAVRAS), aleatorio.choice(ADJETIVOS)
+        genero = aleatorio.choice(GENEROS)
+        yield {
+            'id': livro_id(i),
+            'nome': f'O {palavra} {adjetivo} {i}',
+            'autor': f'Autor {autores.sortear(aleatorio)}',
+            'genero': genero,
+            'descricao': f'{genero}: a história de um(a) {palavra.lower()} {adjetivo.lower()}.',
+        }
+
+
+def clubes(escala: Escala):
+    aleatorio = _aleatorio(escala, 'clube')
+    for i in range(escala.clubes):
+        yield {
+            'id': clube_id(i),
+            'criador': usuario_id(aleatorio.randrange(escala.usuarios)),
+            'nome': f'Clube {aleatorio.choice(PALAVRAS)} {i}',
+            'descricao': f'Clube de leitura de {aleatorio.choice(GENEROS)}',
+        }
+
+
+def membros(escala: Escala):
+    """Gera (clube, lista de membros); o tamanho dos clubes segue Zipf e o criador sempre participa."""
+    aleatorio = _aleatorio(escala, 'participa')
+    criadores = [clube['criador'] for clube in clubes(escala)]
+    tamanhos = Zipf(escala.clubes, escala.expoente).tamanhos(
+        round(escala.clubes * escala.membros_por_clube), escala.usuarios
+    )
+    for i, tamanho in enumerate(tamanhos):
+        sorteados = {usuario_id(u) for u in aleatorio.sample(range(escala.usuarios), tamanho)}
+        sorteados.discard(criadores[i])
+        yield clube_id(i), [criadores[i], *sorted(sorteados)][:tamanho]
+
+
+def participacoes(escala: Escala):
+    for clube, lista in membros(escala):
+        for usuario in lista:
+            yield {'usuario_id': usuario, 'clube_id': clube}
+
+
+def adicoes(escala: Escala):
+    """Livros de cada clube: quantidade proporcional aos membros, livros sorteados pela popularidade."""
+    aleatorio = _aleatorio(escala, 'adiciona')
+    popularidade = Zipf(escala.livros, escala.expoente)
+    for clube, lista in membros(escala):
+        quantidade = max(1, round(len(lista) * escala.livros_por_membro))
+        for livro in popularidade.distintos(aleatorio, quantidade):
+            yield {'usuario_id': aleatorio.choice(lista), 'clube_id': clube, 'livro_id': livro_id(livro)}
+
+
+def avaliacoes(escala: Escala):
+    """Avaliações de cada usuário: atividade e popularidade dos livros seguem Zipf."""
+    aleatorio = _aleatorio(escala, 'avaliacao')
+    popularidade = Zipf(escala.livros, escala.expoente)
+    atividade = Zipf(escala.usuarios, escala.expoente).tamanhos(
+        round(escala.usuarios * escala.avaliacoes_por_usuario), min(escala.livros, MAXIMO_AVALIACOES_USUARIO)
+    )
+    # A atividade não acompanha o id: o usuário mais ativo é sorteado
+    ordem = list(range(escala.usuarios))
+    aleatorio.shuffle(ordem)
+    for usuario, quantidade in zip(ordem, atividade):
+        for livro in popularidade.distintos(aleatorio, quantidade):
+            yield {
+                'avaliador_id': usuario_id(usuario),
+                'livro_id': livro_id(livro),
+                'estrelas': aleatorio.choices(range(6), PESOS_ESTRELAS)[0],
+                'descricao': 'Avaliação gerada',
+            }
+
+
+# Tabelas na ordem de gravação (chaves estrangeiras primeiro)
+TABELAS = (
+    (Usuario, usuarios),
+    (Livro, livros),
+    (Clube, clubes),
+    (Participa, participacoes),
+    (Adiciona, adicoes),
+    (Avaliacao, avaliacoes),
+)
+
+
+def _gravar(modelo, linhas, tamanho_lote: int) -> int:
+    total, lote = 0, []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= tamanho_lote:
+            db.session.execute(insert(modelo), lote)
+            db.session.commit()
+            total, lote = total + len(lote), []
+    if lote:
+        db.session.execute(insert(modelo), lote)
+        db.session.commit()
+        total += len(lote)
+    return total
+
+
+def gerar(escala: Escala, tamanho_lote: int = TAMANHO_LOTE, progresso=None) -> dict:
+    """
+    Grava os dados sintéticos no banco do app atual (que deve estar vazio) e
+    reconstrói o resumo das avaliações e o índice de duplicados.
+
+    Parâmetros de Entrada:
+        - escala : Escala (quantidades, assimetria e semente)
+        - tamanho_lote : int (linhas por executemany/transação)
+        - progresso : Optional[callable] (chamado com (tabela, linhas, segundos))
+
+    Retorno:
+        Quantidade de linhas gravadas por tabela.
+    """
+    totais = {}
+    for modelo, gerador in TABELAS:
+        inicio = time.perf_counter()
+        totais[modelo.__tablename__] = _gravar(modelo, gerador(escala), tamanho_lote)
+        if progresso:
+            progresso(modelo.__tablename__, totais[modelo.__tablename__], time.perf_counter() - inicio)
+
+    ratings.reconstruir_resumos(db.session.connection())
+    duplicados.reconstruir_indice(db.session.connection())
+    db.session.commit()
+    return totais
+
+
+if __name__ == '__main__':
+    # Uso: python -m src.database.sintetico [--usuarios N] [--livros N] ... [--url sqlite:///sintetico.db]
+    import argparse
+    from src.app import create_app
+
+    padrao = Escala()
+    parser = argparse.ArgumentParser(description='Gera dados sintéticos (com assimetria de Zipf) em um banco vazio.')
+    for campo in fields(Escala):
+        parser.add_argument(f"--{campo.name.replace('_', '-')}", type=type(getattr(padrao, campo.name)),
+                            default=getattr(padrao, campo.name))
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE)
+    parser.add_argument('--url', help='banco de destino (padrão: SQLALCHEMY_DATABASE_URI do app)')
+    args = parser.parse_args()
+
+    escala = Escala(**{campo.name: getattr(args, campo.name) for campo in fields(Escala)})
+    app = create_app({'SQLALCHEMY_DATABASE_URI': args.url} if args.url else None)
+    with app.app_context():
+        totais = gerar(escala, args.lote, lambda tabela, linhas, segundos: print(
+            f'{tabela:12} {linhas:>12,} linhas em {segundos:6.1f} s'
+        ))
+    print(f'Total: {sum(totais.values()):,} linhas')
@@ -1,7 +1,12 @@
 from flask import Blueprint, request, jsonify, current_app
-from src.database.models import db, Livro, Avaliacao
+from src.database.models import db, Livro, Avaliacao, Adiciona
 from src.database import model_validation as validator
+from src.database import search, importacao, ratings, recomendacoes, duplicados, routing
+from src.utils import pagination, cache, streaming, fields
 import secrets
+import io
+from collections import Counter
+from functools import partial
 from sqlalchemy import or_
 
 books_bp = Blueprint('livros', __name__)
@@ -42,23 +47,29 @@ def post_livro(current_user):
             descricao:
               type: string
               example: "Um clássico da literatura brasileira."
+            forcar:
+              type: boolean
+              example: false
+              description: Cria o livro mesmo com duplicados (LIVRO_DUPLICADOS='rejeitar').
 
     responses:
       201:
-        description: Livro criado com sucesso.
+        description: Livro criado com sucesso (livros parecidos, se houver, em `duplicados`).
       400:
         description: Campo de entrada não preenchido.
       401:
         description: Token de autenticação expirado.
       403:
         description: Token de autenticação inválido.
+      409:
+        description: Livro possivelmente duplicado (apenas com LIVRO_DUPLICADOS='rejeitar'; listados em `duplicados`).
       500:
         description: Erro ao criar o livro.
     """
 
     data = request.json
 
-    current_app.logger.info(f"Requisição de POST de livro recebida: {data}")
+    current_app.logger.info("Requisição de POST de livro recebida: %s", data)
     
     try:
         assert (nome := data.get('nome')), ("nome",)
@@ -67,15 +78,29 @@ def post_livro(current_user):
         assert (descricao := data.get('descricao')), ("descricao", )
     
     except AssertionError as e:
-        current_app.logger.error(f"O campo de {e.args[0]} não foi preenchido")
+        current_app.logger.error("O campo de %s não foi preenchido", e.args[0])
         return jsonify({'error': f"O campo de {e.args[0]} não foi preenchido"}), 400
 
     try:
+        parecidos = [
+            {'id': id, 'nome': outro_nome, 'autor': outro_autor, 'similaridade': round(valor, 4)}
+            for id, outro_nome, outro_autor, valor in duplicados.procurar(
+                db.session.connection(), nome, autor, current_app.config['LIVRO_DUPLICADOS_LIMIAR']
+            )
+        ]
+        if parecidos and current_app.config['LIVRO_DUPLICADOS'] == duplicados.MODO_REJEITAR and not data.get('forcar'):
+            current_app.logger.error("Livro possivelmente duplicado: %s", [item['id'] for item in parecidos])
+            return jsonify({'error': 'Livro possivelmente duplicado', 'duplicados': parecidos}), 409
+
         livro = Livro(id=secrets.token_hex(), autor=autor,
                       nome=nome, genero=genero, descricao=descricao)
         db.session.add(livro)
         db.session.commit()
+        cache.invalidar(cache.LIVRO, livro.id)
         current_app.logger.info("Livro criado com sucesso")
+        if parecidos:
+            current_app.logger.warning("Livro %s possivelmente duplicado: %s", livro.id, [item['id'] for item in parecidos])
+            return jsonify({'message': 'Livro criado com sucesso', 'duplicados': parecidos}), 201
         return jsonify({'message': 'Livro criado com sucesso'}), 201
 
     except Exception as e:
@@ -83,7 +108,91 @@ def post_livro(current_user):
         current_app.logger.exception(e)
         return jsonify({"error": str(e)}), 500
 
+@books_bp.route('/livros/importar', methods=['POST'])
+@validator.check_jwt_token
+def importar_livros(current_user):
+    """
+    Endpoint para importação de livros em massa.
+
+    O corpo é lido de forma incremental e gravado em lotes, então arquivos
+    grandes podem ser enviados diretamente (ex.: curl --data-binary @livros.ndjson).
+    Linhas inválidas não interrompem a importação e são listadas no relatório.
+
+    ---
+    tags:
+      - Livros
+    consumes:
+      - application/x-ndjson
+      - text/csv
+    parameters:
+      - name: Authorization
+        in: header
+        required: true
+        description: Token de autenticação do usuário.
+        schema:
+          type: string
+      - name: formato
+        in: query
+        required: false
+        description: Formato do corpo, 'ndjson' ou 'csv' (padrão pelo Content-Type; CSV com cabeçalho nome,autor,genero,descricao).
+        schema:
+          type: string
+          enum: [ndjson, csv]
+      - name: body
+        in: body
+        required: true
+        description: Um livro por linha, com os campos nome, autor, genero e descricao.
+        schema:
+          type: string
+          example: '{"nome": "Dom Casmurro", "autor": "Machado de Assis", "genero": "Romance", "descricao": "Um clássico da literatura brasileira."}'
+
+    responses:
+      201:
+        description: Importação concluída, com ao menos um livro importado.
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                importados:
+                  type: integer
+                total_erros:
+                  type: integer
+                erros:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      linha:
+                        type: integer
+                      erro:
+                        type: string
+      400:
+        description: Formato inválido ou nenhum livro válido no corpo.
+      401:
+        description: Token de autenticação expirado.
+      403:
+        description: Token de autenticação inválido.
+    """
+
+    formato = request.args.get('formato')
+    if formato is None:
+        formato = importacao.FORMATO_CSV if request.mimetype == 'text/csv' else importacao.FORMATO_NDJSON
+    if formato not in importacao.LEITORES:
+        current_app.logger.error("Formato de importação inválido: %s", formato)
+        return jsonify({'error': 'Formato de importação inválido'}), 400
+
+    current_app.logger.info("Importação de livros (%s) iniciada por %s", formato, current_user.id)
+
+    linhas = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    tamanho_lote = current_app.config.get('IMPORTACAO_TAMANHO_LOTE', importacao.TAMANHO_LOTE)
+    relatorio = importacao.importar_livros(linhas, formato, tamanho_lote)
+
+    current_app.logger.info("Importação concluída: %s livros, %s erros", relatorio.importados, relatorio.total_erros)
+    return jsonify(relatorio.to_dict()), 201 if relatorio.importados else 400
+
 @books_bp.route('/livros/<livro_id>', methods=['GET'])
+@cache.cacheado(cache.LIVRO, 'livro_id', variantes=('fields',), negativo=True)
 def get_livro(livro_id):
     """
     Endpoint para busca de um livro específico pelo seu ID.
@@ -98,36 +207,99 @@ def get_livro(livro_id):
         description: ID do livro.
         schema:
           type: string
+      - name: fields
+        in: query
+        required: false
+        description: Campos retornados, separados por vírgula (ex.: id,nome). Padrão todos.
+        schema:
+          type: string
 
     responses:
       200:
         description: Dados do livro retornados com sucesso.
+      400:
+        description: Campos inválidos em fields.
       404:
         description: Livro não encontrado.
       500:
         description: Erro durante a busca do livro.
     """
     
-    cache_key = f"livro_{livro_id}"
-    
-    cache = current_app.cache
-    livro = cache.get(cache_key)
+    current_app.logger.info("Requisição para busca do livro de id %s", livro_id)
     
-    if livro:
-      current_app.logger.info(f"Cache hit para livro com id {livro_id}")
-      return jsonify({"livro": livro}), 200
-    
-    current_app.logger.info(f"Requisição para busca do livro de id {livro_id}")
+    try:
+        campos = fields.ler_campos(Livro.nomes_colunas)
+    except ValueError as e:
+        current_app.logger.error(str(e))
+        return jsonify({'error': str(e)}), 400
     
-    if (livro := Livro.query.get(livro_id)):
-        livro_dict = livro.to_dict()
-        current_app.logger.info(f"Livro encontrado com sucesso: {livro_dict}")
-        cache.set(cache_key, livro_dict, timeout=10)
+    if (livro := db.session.query(*Livro.colunas(campos)).filter(Livro.id == livro_id).first()):
+        livro_dict = Livro.linha_para_dict(livro, campos)
+        current_app.logger.info("Livro encontrado com sucesso: %s", livro_dict)
         return jsonify({"livro" : livro_dict}), 200
     
     current_app.logger.error("Livro não encontrado")
     return jsonify({"error" : "Livro não encontrado"}), 404
 
+@books_bp.route('/livros/<livro_id>/similares', methods=['GET'])
+@cache.cacheado(cache.LIVRO_SIMILARES, 'livro_id', variantes=('limit',), timeout=5 * 60, negativo=True)
+def get_livros_similares(livro_id):
+    """
+    Endpoint para busca dos livros mais parecidos com um livro, segundo as
+    avaliações dos usuários (quem gostou deste também gostou).
+
+    As similaridades são calculadas fora das requisições (src/database/recomendacoes.py);
+    a resposta fica em cache por 5 minutos.
+
+    ---
+    tags:
+      - Livros
+    parameters:
+      - name: livro_id
+        in: path
+        required: true
+        description: ID do livro.
+        schema:
+          type: string
+      - name: limit
+        in: query
+        required: false
+        description: Quantidade de livros retornados (padrão 10, máximo RECOMENDACOES_VIZINHOS).
+        schema:
+          type: integer
+
+    responses:
+      200:
+        description: Livros similares, do mais para o menos parecido.
+      400:
+        description: Parâmetro limit inválido.
+      404:
+        description: Livro não encontrado.
+    """
+
+    current_app.logger.info("Requisição de livros similares ao livro %s", livro_id)
+
+    try:
+        limite = int(request.args.get('limit', 10))
+        assert 0 < limite <= current_app.config['RECOMENDACOES_VIZINHOS']
+    except (ValueError, AssertionError):
+        current_app.logger.error("Parâmetro limit inválido")
+        return jsonify({'error': f"O parâmetro limit deve estar entre 1 e {current_app.config['RECOMENDACOES_VIZINHOS']}"}), 400
+
+    similares = recomendacoes.similares_do_livro(livro_id, limite)
+    if not similares and not db.session.query(Livro.id).filter(Livro.id == livro_id).first():
+        current_app.logger.error("Livro não encontrado")
+        return jsonify({"error": "Livro não encontrado"}), 404
+
+    current_app.logger.info("%d livros similares a %s", len(similares), livro_id)
+    return jsonify({
+        'livro_id': livro_id,
+        'similares': [
+            {'id': id, 'nome': nome, 'autor': autor, 'similaridade': round(similaridade, 4)}
+            for id, nome, autor, similaridade in similares
+        ]
+    }), 200
+
 @books_bp.route('/livros/buscar', methods=['GET'])
 def get_livros():
     """
@@ -155,6 +327,31 @@ def get_livros():
         description: Gênero do livro.
         schema:
           type: string
+      - name: modo
+        in: query
+        required: false
+        description: Modo de busca, 'fulltext' (índice FTS5 por início de palavra, ordenado por relevância, padrão) ou 'substring' (busca por trecho do texto).
+        schema:
+          type: string
+          enum: [fulltext, substring]
+      - name: limit
+        in: query
+        required: false
+        description: Quantidade máxima de itens por página (limitada pelo máximo do servidor).
+        schema:
+          type: integer
+      - name: cursor
+        in: query
+        required: false
+        description: Cursor retornado em next_cursor pela página anterior.
+        schema:
+          type: string
+      - name: fields
+        in: query
+        required: false
+        description: Campos de cada livro, separados por vírgula (ex.: id,nome). Padrão todos.
+        schema:
+          type: string
 
     responses:
       200:
@@ -177,13 +374,16 @@ def get_livros():
                         type: string
                       genero:
                         type: string
+                next_cursor:
+                  type: string
+                  nullable: true
       400:
-        description: Parâmetros de busca inválidos.
+        description: Parâmetros de busca ou de paginação inválidos.
       500:
         description: Erro durante a busca dos livros.
     """
 
-    current_app.logger.info(f"Requisição de POST de busca de livros recebida: {request.args}")
+    current_app.logger.info("Requisição de POST de busca de livros recebida: %s", request.args)
     
     nome = request.args.get('nome')
     autor = request.args.get('autor')
@@ -193,30 +393,63 @@ def get_livros():
         current_app.logger.error("Parâmetros de busca inválidos")
         return jsonify({'error': 'Parâmetros de busca inválidos'}), 400
 
+    modo = request.args.get('modo', current_app.config.get('LIVRO_BUSCA_MODO', search.MODO_FULLTEXT))
+    if modo not in (search.MODO_FULLTEXT, search.MODO_SUBSTRING):
+        current_app.logger.error("Modo de busca inválido: %s", modo)
+        return jsonify({'error': 'Modo de busca inválido'}), 400
+
     try:
-        query = Livro.query
-        filters = []
+        limit, cursor = pagination.ler_parametros()
+        campos = fields.ler_campos(Livro.nomes_colunas)
+    except ValueError as e:
+        current_app.logger.error(str(e))
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        query = None
+        chaves = [Livro.id]
+        
+        if modo == search.MODO_FULLTEXT and current_app.config.get('LIVRO_FTS'):
+            query = search.buscar_livros_fts({'nome': nome, 'autor': autor, 'genero': genero})
+            if query is not None:
+                chaves = [search.RANK, Livro.id]
 
-        if nome:
-            filters.append(Livro.nome.contains(nome))
-        if autor:
-            filters.append(Livro.autor.contains(autor))
-        if genero:
-            filters.append(Livro.genero.contains(genero))
+        if query is None:
+            query = Livro.query
+            filters = []
 
-        if filters:
-            query = query.filter(or_(*filters))
+            if nome:
+                filters.append(Livro.nome.contains(nome))
+            if autor:
+                filters.append(Livro.autor.contains(autor))
+            if genero:
+                filters.append(Livro.genero.contains(genero))
 
-        livros = query.all()
+            if filters:
+                query = query.filter(or_(*filters))
+
+        # Apenas as colunas pedidas: as linhas são serializadas sem montar as entidades do ORM
+        query = query.with_entities(*Livro.colunas(campos))
+        serializar = partial(Livro.linha_para_dict, nomes=campos)
+
+        if streaming.pedido_ndjson():
+            current_app.logger.info("Livros enviados em NDJSON")
+            return streaming.responder_ndjson(query, chaves, serializar, cursor, streaming.ler_limite())
+
+        pagina = pagination.paginar(query, chaves, limit, cursor)
         
-        if len(livros) == 0:
+        if len(pagina.itens) == 0:
             current_app.logger.info("Nenhum livro encontrado com os dados fornecidos")
-            return jsonify(livros=[]), 200
-        current_app.logger.info(f"Livros encontrados com sucesso")
-        return jsonify(livros=[livro.to_dict() for livro in livros]), 200
+            return jsonify(livros=[], next_cursor=None), 200
+        current_app.logger.info("Livros encontrados com sucesso")
+        return jsonify(livros=[serializar(livro) for livro in pagina.itens], next_cursor=pagina.next_cursor), 200
     
+    except ValueError as e:
+        current_app.logger.error(str(e))
+        return jsonify({'error': str(e)}), 400
+
     except Exception as e:
-        current_app.logger.exception(f"Erro durante a busca de livros: {e}")
+        current_app.logger.exception("Erro durante a busca de livros: %s", e)
         return jsonify({'error': 'Erro interno no servidor'}), 500
 
 @books_bp.route('/livros/avaliar', methods=['POST'])
@@ -268,7 +501,7 @@ def post_avaliacao(current_user):
     """
 
     data = request.json
-    current_app.logger.info(f"Requisição de Post de Avaliação, {data}")
+    current_app.logger.info("Requisição de Post de Avaliação, %s", data)
     
     try:
         assert (livro_id := data.get('livro_id')), ("livro_id",)
@@ -276,7 +509,7 @@ def post_avaliacao(current_user):
         assert (estrelas := int(data.get('estrelas'))), ("estrelas",)
         assert 0 <= estrelas <= 5, ("estrelas",)
     except AssertionError as e:
-        current_app.logger.error(f"O campo de {e.args[0]} não foi preenchido ou foi preenchido incorretamente")
+        current_app.logger.error("O campo de %s não foi preenchido ou foi preenchido incorretamente", e.args[0])
         return jsonify({'error': f"O campo de {e.args[0]} não foi preenchido ou foi preenchido incorretamente"}), 400
 
     try:
@@ -295,10 +528,131 @@ def post_avaliacao(current_user):
 
         db.session.add(avaliacao)
         db.session.commit()
+        
+        # A média do livro mudou em todos os clubes que o possuem
+        clubes = [clube_id for (clube_id,) in db.session.query(Adiciona.clube_id).filter(Adiciona.livro_id == livro_id).distinct()]
+        cache.invalidar(cache.CLUBE_LIVROS, *clubes)
         current_app.logger.info('Avaliação realizada com sucesso')
         return jsonify({'message': 'Avaliação realizada com sucesso'}), 201
 
     except Exception as e:
         db.session.rollback()
         current_app.logger.exception(str(e))
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+@books_bp.route('/livros/avaliar/lote', methods=['POST'])
+@validator.check_jwt_token
+def post_avaliacoes_lote(current_user):
+    """
+    Endpoint para criação de várias avaliações do usuário em uma requisição.
+
+    O lote é gravado por inteiro ou rejeitado: a existência dos livros e as
+    avaliações já existentes são verificadas com consultas por conjunto antes
+    de qualquer inserção.
+
+    ---
+    tags:
+      - Livros
+    parameters:
+      - name: Authorization
+        in: header
+        required: true
+        description: Token de autenticação do usuário.
+        schema:
+          type: string
+      - name: body
+        in: body
+        required: true
+        description: Lista de avaliações.
+        schema:
+          type: object
+          properties:
+            avaliacoes:
+              type: array
+              items:
+                type: object
+                properties:
+                  livro_id:
+                    type: string
+                    example: "12345"
+                  descricao:
+                    type: string
+                    example: "Excelente livro!"
+                  estrelas:
+                    type: integer
+                    example: 5
+
+    responses:
+      201:
+        description: Avaliações criadas com sucesso.
+      400:
+        description: Lote vazio, grande demais, com campos incorretos ou com livros repetidos.
+      401:
+        description: Token de autenticação expirado.
+      403:
+        description: Token de autenticação inválido.
+      404:
+        description: Um ou mais livros não encontrados (listados em `livros`).
+      409:
+        description: O usuário já avaliou um ou mais livros do lote (listados em `livros`).
+      500:
+        description: Erro ao criar as avaliações.
+    """
+
+    data = request.json
+    avaliacoes = data.get('avaliacoes') if isinstance(data, dict) else None
+    current_app.logger.info("Requisição de Post de Avaliações em lote de %s", current_user.id)
+
+    maximo = current_app.config.get('AVALIACAO_LOTE_MAXIMO', 10000)
+    if not isinstance(avaliacoes, list) or not 0 < len(avaliacoes) <= maximo:
+        current_app.logger.error("Lote de avaliações vazio ou inválido")
+        return jsonify({'error': f"O campo avaliacoes deve ser uma lista com 1 a {maximo} avaliações"}), 400
+
+    linhas = []
+    for indice, item in enumerate(avaliacoes):
+        try:
+            assert isinstance(item, dict), ("avaliacao",)
+            assert (livro_id := item.get('livro_id')) and isinstance(livro_id, str), ("livro_id",)
+            assert (descricao := item.get('descricao')), ("descricao",)
+            # bool é subclasse de int: true/false não são estrelas válidas
+            assert isinstance(estrelas := item.get('estrelas'), int) and not isinstance(estrelas, bool), ("estrelas",)
+            assert 0 <= estrelas <= 5, ("estrelas",)
+        except AssertionError as e:
+            current_app.logger.error("Avaliação %s: o campo de %s não foi preenchido ou foi preenchido incorretamente", indice, e.args[0])
+            return jsonify({'error': f"Avaliação {indice}: o campo de {e.args[0]} não foi preenchido ou foi preenchido incorretamente"}), 400
+        linhas.append({'avaliador_id': current_user.id, 'livro_id': livro_id, 'descricao': descricao, 'estrelas': estrelas})
+
+    livro_ids = [linha['livro_id'] for linha in linhas]
+    if (repetidos := sorted(livro_id for livro_id, total in Counter(livro_ids).items() if total > 1)):
+        current_app.logger.error("Livros repetidos no lote: %s", repetidos)
+        return jsonify({'error': 'Livros repetidos no lote', 'livros': repetidos}), 400
+
+    try:
+        conn = db.session.connection()
+
+        if (inexistentes := ratings.livros_inexistentes(conn, livro_ids)):
+            current_app.logger.error("Livros não encontrados: %s", sorted(inexistentes))
+            return jsonify({'error': 'Livro não encontrado', 'livros': sorted(inexistentes)}), 404
+
+        if (existentes := ratings.avaliacoes_existentes(conn, [(current_user.id, livro_id) for livro_id in livro_ids])):
+            avaliados = sorted(livro_id for _, livro_id in existentes)
+            current_app.logger.error("Livros já avaliados por %s: %s", current_user.id, avaliados)
+            return jsonify({'error': 'Já existe uma avaliação do usuário para o livro', 'livros': avaliados}), 409
+
+        # Os comandos do Core na conexão não passam pelo get_bind da sessão:
+        # a escrita é registrada aqui para abrir a janela de read-your-writes
+        routing.marcar_escrita()
+        ratings.inserir_avaliacoes(conn, linhas)
+        recomendacoes.marcar_pendentes(conn, [(current_user.id, livro_id) for livro_id in livro_ids])
+        db.session.commit()
+
+        # A média dos livros mudou em todos os clubes que os possuem
+        clubes = {clube_id for (clube_id,) in db.session.query(Adiciona.clube_id).filter(Adiciona.livro_id.in_(livro_ids))}
+        cache.invalidar(cache.CLUBE_LIVROS, *clubes)
+        current_app.logger.info("%s avaliações realizadas com sucesso", len(linhas))
+        return jsonify({'message': 'Avaliações realizadas com sucesso', 'total': len(linhas)}), 201
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception(str(e))
+        return jsonify({"error": str(e)}), 500
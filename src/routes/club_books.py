@@ -1,10 +1,14 @@
 from flask import Blueprint, request, jsonify, current_app
-from src.database.models import db, Usuario, Livro, Avaliacao, Clube, Participa, Adiciona
+from src.database.models import db, Usuario, Livro, Clube, Participa, Adiciona, AvaliacaoResumo
 from src.database import model_validation as validator
-from sqlalchemy.sql import func
+from src.database import ratings
+from src.utils import pagination, cache, streaming, fields
 
 club_books_bp = Blueprint('clube/livros', __name__)
 
+# Campos disponíveis na listagem de livros de um clube (parâmetro fields)
+CAMPOS_LIVRO = {'id': Livro.id, 'nome': Livro.nome, 'autor': Livro.autor, 'media_avaliacoes': ratings.MEDIA}
+
 def validacao_books_club(data, user_id):
     """Validações para adicionar/editar um livro ao grupo de um usuário"""
     try:
@@ -12,19 +16,19 @@ def validacao_books_club(data, user_id):
         assert (clube_id := data.get('clube_id')), ("clube_id",)
     
     except AssertionError as e:
-        current_app.logger.error(f"O campo de {e.args[0]} não foi preenchido")
+        current_app.logger.error("O campo de %s não foi preenchido", e.args[0])
         return jsonify({'error': f"O campo de {e.args[0]} não foi preenchido"}), 400
     
     if not (Clube.query.get(clube_id)):
-        current_app.logger.error(f'Clube {data["clube_id"]} não encontrado')
+        current_app.logger.error('Clube %s não encontrado', data["clube_id"])
         return jsonify({'error': 'Clube não encontrado'}), 404
     
     if not (Livro.query.get(book_id)):
-        current_app.logger.error(f'Livro {data["livro_id"]} não encontrado')
+        current_app.logger.error('Livro %s não encontrado', data["livro_id"])
         return jsonify({'error': 'Livro não encontrado'}), 404
     
     if not (Participa.query.get((user_id, clube_id))):
-        current_app.logger.error(f'Não existe um registro de participação para o user {user_id} no clube {clube_id}')
+        current_app.logger.error('Não existe um registro de participação para o user %s no clube %s', user_id, clube_id)
         return jsonify({'error': 'Não é possível adicionar um livro em um clube que o usuário não participa'}), 403
     
     return (book_id, clube_id, 200)
@@ -73,9 +77,11 @@ def post_club_books(current_user):
     """
     data = request.get_json()
 
-    current_app.logger.info(f"Solicitaçao de Adição de Livro a um Grupo recebida, valores: {data}")
+    current_app.logger.info("Solicitaçao de Adição de Livro a um Grupo recebida, valores: %s", data)
     
-    validacao = validacao_books_club(data, current_user.id)
+    # O id é lido antes do commit, que expira o usuário carregado na sessão
+    user_id = current_user.id
+    validacao = validacao_books_club(data, user_id)
     
     if validacao[-1] != 200:
         return validacao
@@ -83,18 +89,20 @@ def post_club_books(current_user):
     book_id, clube_id, _ = validacao
     
     try:
-        adiciona = Adiciona(usuario_id = current_user.id, livro_id=book_id, clube_id=clube_id)
+        adiciona = Adiciona(usuario_id = user_id, livro_id=book_id, clube_id=clube_id)
         db.session.add(adiciona)
         db.session.commit()
-        current_app.logger.info(f'Livro adicionado com sucesso ao grupo {clube_id} pelo user {current_user.id} do livro {book_id}')
+        cache.invalidar(cache.CLUBE_LIVROS, clube_id)
+        current_app.logger.info('Livro adicionado com sucesso ao grupo %s pelo user %s do livro %s', clube_id, user_id, book_id)
         return jsonify({'message': 'Livro adicionado com sucesso ao grupo'}), 200
     
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f'Erro ao adicionar o livro ao grupo: {e}')
+        current_app.logger.error('Erro ao adicionar o livro ao grupo: %s', e)
         return jsonify({'error': 'Erro ao adicionar o livro ao grupo'}), 500
 
 @club_books_bp.route('/clube/<clube_id>/livros', methods=['GET'])
+@cache.cacheado(cache.CLUBE_LIVROS, 'clube_id', variantes=('limit', 'cursor', 'fields'), stale=5 * 60)
 def list_club_books(clube_id):
     """
     Endpoint para listar os livros adicionados ao grupo de um usuário.
@@ -109,6 +117,24 @@ def list_club_books(clube_id):
         description: Identificação do Clube.
         schema:
           type: string
+      - name: limit
+        in: query
+        required: false
+        description: Quantidade máxima de itens por página (limitada pelo máximo do servidor).
+        schema:
+          type: integer
+      - name: cursor
+        in: query
+        required: false
+        description: Cursor retornado em next_cursor pela página anterior.
+        schema:
+          type: string
+      - name: fields
+        in: query
+        required: false
+        description: Campos de cada livro, separados por vírgula (id, nome, autor, media_avaliacoes). Padrão todos.
+        schema:
+          type: string
 
     responses:
       200:
@@ -132,58 +158,64 @@ def list_club_books(clube_id):
                       media_avaliacoes:
                         type: number
                         example: 4.5
+                next_cursor:
+                  type: string
+                  nullable: true
+      400:
+        description: Parâmetros de paginação ou campos inválidos.
       404:
         description: Clube não encontrado.
       500:
         description: Erro ao buscar livros do clube.
     """
     
-    cache_key = f"/clube/{clube_id}/livros"
-    
-    cache = current_app.cache
-    livros = cache.get(cache_key)
-    
-    if livros:
-      current_app.logger.info(f"Cache hit para livros do grupo {clube_id}")
-      return jsonify({"livros": livros}), 200
+    try:
+        limit, cursor = pagination.ler_parametros()
+        campos = fields.ler_campos(list(CAMPOS_LIVRO)) or list(CAMPOS_LIVRO)
+    except ValueError as e:
+        current_app.logger.error(str(e))
+        return jsonify({'error': str(e)}), 400
     
-    current_app.logger.info(f"Requisição para listar os livros do grupo {clube_id} recebida")
+    current_app.logger.info("Requisição para listar os livros do grupo %s recebida", clube_id)
     
     clube = Clube.query.get(clube_id)
     if not clube:
-        current_app.logger.error(f'Clube {clube_id} não encontrado')
+        current_app.logger.error('Clube %s não encontrado', clube_id)
         return jsonify({'error': 'Clube não encontrado'}), 404
     
     try:
-        books_with_avg_rating = (
-            db.session.query(
-                Livro.id,
-                Livro.nome,
-                Livro.autor,
-                func.coalesce(func.avg(Avaliacao.estrelas), None).label('media_avaliacoes')
-            )
+        query = (
+            db.session.query(*[CAMPOS_LIVRO[campo] for campo in campos])
+            .select_from(Livro)
             .join(Adiciona, Adiciona.livro_id == Livro.id)
-            .outerjoin(Avaliacao, Avaliacao.livro_id == Livro.id)
             .filter(Adiciona.clube_id == clube_id)
-            .group_by(Livro.id, Livro.nome, Livro.autor)
-        ).all()
-
-        books_list = [
-            {
-                'id': book.id,
-                'nome': book.nome,
-                'autor': book.autor,
-                'media_avaliacoes': book.media_avaliacoes
-            }
-            for book in books_with_avg_rating
-        ]
-
-        current_app.logger.info(f'Livros encontrados no clube {clube_id}: {books_list}')
-        cache.set(cache_key, books_list, timeout=10)
-        return jsonify(livros=books_list), 200
+            # Um livro por linha (adicionado por vários membros) mesmo quando o id não está entre os campos
+            .group_by(Livro.id)
+        )
+        # O resumo das avaliações só é lido quando a média foi pedida
+        if 'media_avaliacoes' in campos:
+            query = query.outerjoin(AvaliacaoResumo, AvaliacaoResumo.livro_id == Livro.id)
+
+        def serializar(book):
+            return dict(zip(campos, book))
+
+        if streaming.pedido_ndjson():
+            current_app.logger.info('Livros do clube %s enviados em NDJSON', clube_id)
+            return streaming.responder_ndjson(query, [Livro.id], serializar, cursor, streaming.ler_limite())
+
+        books_with_avg_rating = pagination.paginar(query, [Livro.id], limit, cursor)
+        books_list = [serializar(book) for book in books_with_avg_rating.itens]
+        pagina = {'livros': books_list, 'next_cursor': books_with_avg_rating.next_cursor}
+
+        current_app.logger.info('%d livros encontrados no clube %s', len(books_list), clube_id)
+        return jsonify(pagina), 200
+
+    except ValueError as e:
+        current_app.logger.error(str(e))
+        return jsonify({'error': str(e)}), 400
 
     except Exception as e:
-        current_app.logger.exception(f'Erro ao buscar livros do clube {clube_id}: {e}')
+        current_app.logger.exception('Erro ao buscar livros do clube %s: %s', clube_id, e)
         return jsonify({'error': 'Erro interno no servidor'}), 500
 
 @club_books_bp.route('/clube/livros', methods=['DELETE'])
@@ -230,9 +262,11 @@ def delete_club_books(current_user):
     """
     data = request.get_json()
 
-    current_app.logger.info(f"Solicitaçao de Adição de Livro a um Grupo recebida, valores: {data}")
+    current_app.logger.info("Solicitaçao de Adição de Livro a um Grupo recebida, valores: %s", data)
     
-    validacao = validacao_books_club(data, current_user.id)
+    # O id é lido antes do commit, que expira o usuário carregado na sessão
+    user_id = current_user.id
+    validacao = validacao_books_club(data, user_id)
     
     if validacao[-1] != 200:
         return validacao
@@ -240,13 +274,14 @@ def delete_club_books(current_user):
     book_id, clube_id, _ = validacao
     
     try:
-        adiciona = Adiciona.query.filter_by(usuario_id=current_user.id, livro_id=book_id, clube_id=clube_id).first()
+        adiciona = Adiciona.query.filter_by(usuario_id=user_id, livro_id=book_id, clube_id=clube_id).first()
         db.session.delete(adiciona)
         db.session.commit()
-        current_app.logger.info(f'Livro removido com sucesso do grupo {clube_id} pelo user {current_user.id} do livro {book_id}')
+        cache.invalidar(cache.CLUBE_LIVROS, clube_id)
+        current_app.logger.info('Livro removido com sucesso do grupo %s pelo user %s do livro %s', clube_id, user_id, book_id)
         return jsonify({'message': 'Livro removido com sucesso do grupo'}), 200
     
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f'Erro ao remover o livro do grupo: {e}')
+        current_app.logger.error('Erro ao remover o livro do grupo: %s', e)
         return jsonify({'error': 'Erro ao remover o livro do grupo'}), 500
\ No newline at end of file
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify, current_app
 from src.database.models import db, Clube, Participa
 from src.database import model_validation as validator
+from src.utils import pagination, cache, streaming, fields
 import secrets
+from functools import partial
 from datetime import datetime, timezone
 
 clubs_bp = Blueprint('clubes', __name__)
@@ -64,13 +66,13 @@ def post_club(current_user):
     """
     
     data = request.json
-    current_app.logger.info(f"Requisição de POST de clube recebida: {data}")
+    current_app.logger.info("Requisição de POST de clube recebida: %s", data)
     
     try:
         assert (nome := data.get('nome')), ("nome",)
         assert (description := data.get('descricao')), ("descricao",)
     except AssertionError as e:
-        current_app.logger.error(f"O campo de {e.args[0]} não foi preenchido")
+        current_app.logger.error("O campo de %s não foi preenchido", e.args[0])
         return jsonify({'error': f"O campo de {e.args[0]} não foi preenchido"}), 400
     
     try:
@@ -85,9 +87,8 @@ def post_club(current_user):
             descricao=description,
             criador=current_user.id
         )
+        # Clube e participação do criador gravados na mesma transação
         db.session.add(club)
-        db.session.commit()
-        
         db.session.add(
             Participa(
                 usuario_id=current_user.id,
@@ -95,13 +96,15 @@ def post_club(current_user):
             )
         )
         db.session.commit()
+        cache.invalidar(cache.CLUBE, club_id)
         
         return jsonify({"message": "Clube de Livros Criado com Sucesso!",}), 200
     except Exception as e:
-        current_app.logger.error(f"Erro ao tentar salvar o clube: {e}")
+        current_app.logger.error("Erro ao tentar salvar o clube: %s", e)
         return jsonify({'error': 'Erro ao tentar salvar o clube'}), 500
     
 @clubs_bp.route('/clubes/<club_id>', methods=['GET'])
+@cache.cacheado(cache.CLUBE, 'club_id', variantes=('fields',), negativo=True)
 def get_club(club_id):
     """
     Endpoint para busca de um clube específico pelo seu ID.
@@ -116,6 +119,12 @@ def get_club(club_id):
         description: ID do clube a ser buscado.
         schema:
           type: string
+      - name: fields
+        in: query
+        required: false
+        description: Campos retornados, separados por vírgula (ex.: id,nome). Padrão todos.
+        schema:
+          type: string
 
     responses:
       200:
@@ -131,34 +140,26 @@ def get_club(club_id):
                   type: string
                 description:
                   type: string
+      400:
+        description: Campos inválidos em fields.
       404:
         description: Clube não encontrado.
       500:
         description: Erro interno ao buscar clube.
     """
-    cache_key = f"/clubes/{club_id}"
-    cache = current_app.cache
-    clube = cache.get(cache_key)
-    
-    if clube:
-      current_app.logger.info(f"Clube encontrado no cache: {clube}")
-      return jsonify(clube), 200
-    
     try:
-        assert (club := request.json.get('club_id'))
-        
-    except AssertionError:
-        current_app.logger.error(f"O campo de club_id não foi preenchido")
-        return jsonify({'error': 'O campo de club_id não foi preenchido'}), 400
+        campos = fields.ler_campos(Clube.nomes_colunas)
+    except ValueError as e:
+        current_app.logger.error(str(e))
+        return jsonify({'error': str(e)}), 400
     
-    club = Clube.query.get(club)
+    club = db.session.query(*Clube.colunas(campos)).filter(Clube.id == club_id).first()
     
     if not club:
         current_app.logger.error("Clube não encontrado")
         return jsonify({'error': 'Clube não encontrado'}), 404
-    club_dict = club.to_dict()
-    current_app.logger.info(f"Clube encontrado com sucesso: {club_dict}")
-    cache.set(cache_key, club_dict, timeout=10)
+    club_dict = Clube.linha_para_dict(club, campos)
+    current_app.logger.info("Clube encontrado com sucesso: %s", club_dict)
     return jsonify(club_dict), 200
     
 @clubs_bp.route('/clubes/buscar', methods=['GET'])
@@ -176,6 +177,24 @@ def find_clubs():
         description: Nome do clube a ser buscado.
         schema:
           type: string
+      - name: limit
+        in: query
+        required: false
+        description: Quantidade máxima de itens por página (limitada pelo máximo do servidor).
+        schema:
+          type: integer
+      - name: cursor
+        in: query
+        required: false
+        description: Cursor retornado em next_cursor pela página anterior.
+        schema:
+          type: string
+      - name: fields
+        in: query
+        required: false
+        description: Campos de cada clube, separados por vírgula (ex.: id,nome). Padrão todos.
+        schema:
+          type: string
 
     responses:
       200:
@@ -196,10 +215,13 @@ def find_clubs():
                         type: string
                       description:
                         type: string
+                next_cursor:
+                  type: string
+                  nullable: true
       404:
         description: Nenhum clube encontrado.
       400:
-        description: Campo de nome não preenchido.
+        description: Campo de nome não preenchido ou parâmetros de paginação inválidos.
       500:
         description: Erro ao buscar clubes.
     """
@@ -209,20 +231,34 @@ def find_clubs():
     if not nome:
         current_app.logger.error("O campo de nome não foi preenchido")
         return jsonify({'error': 'O campo de nome não foi preenchido'}), 400
-    current_app.logger.info(f"Buscando clubes com nome: {nome}")
+    current_app.logger.info("Buscando clubes com nome: %s", nome)
 
     try:
-        clubs = list(map(lambda x : x.to_dict(), Clube.query.filter(Clube.nome.contains(nome)).all()))
+        limit, cursor = pagination.ler_parametros()
+        campos = fields.ler_campos(Clube.nomes_colunas)
+        query = Clube.query.filter(Clube.nome.contains(nome)).with_entities(*Clube.colunas(campos))
+        serializar = partial(Clube.linha_para_dict, nomes=campos)
+        
+        if streaming.pedido_ndjson():
+            current_app.logger.info("Clubes enviados em NDJSON")
+            return streaming.responder_ndjson(query, [Clube.id], serializar, cursor, streaming.ler_limite())
         
-        if not clubs:
+        pagina = pagination.paginar(query, [Clube.id], limit, cursor)
+        clubs = list(map(serializar, pagina.itens))
+        
+        if not clubs and not cursor:
             current_app.logger.info("Nenhum clube encontrado")
             return jsonify({'error': 'Nenhum clube encontrado'}), 404
         
-        current_app.logger.info(f"Clubes encontados: {clubs}")
-        return jsonify({'clubes' : clubs}), 200
+        current_app.logger.info("%d clubes encontrados", len(clubs))
+        return jsonify({'clubes' : clubs, 'next_cursor': pagina.next_cursor}), 200
+    
+    except ValueError as e:
+        current_app.logger.error(str(e))
+        return jsonify({'error': str(e)}), 400
         
     except Exception as e:
-        current_app.logger.error(f"Erro ao buscar clubes: {e}")
+        current_app.logger.error("Erro ao buscar clubes: %s", e)
         return jsonify({'error': 'Erro ao buscar clubes'}), 500
 
 @clubs_bp.route('/clubes/<club_id>', methods=['PUT'])
@@ -273,12 +309,12 @@ def update_club(current_user, club_id):
     """
     
     current_app.logger.info(
-        f'Requisição de PUT do clube {club_id} feito pelo user {current_user.id}'
+        'Requisição de PUT do clube %s feito pelo user %s', club_id, current_user.id
     )
     
     
     if not (club := Clube.query.get(club_id)):
-        current_app.logger.error(f'Clube {club_id} não encontrado')
+        current_app.logger.error('Clube %s não encontrado', club_id)
         return jsonify({'error': 'Clube não encontrado'}), 404
 
     data = request.json
@@ -292,10 +328,11 @@ def update_club(current_user, club_id):
     
     try:
         db.session.commit()
-        current_app.logger.info(f'Clube {club_id} atualizado com sucesso')
+        cache.invalidar(cache.CLUBE, club_id)
+        current_app.logger.info('Clube %s atualizado com sucesso', club_id)
         return jsonify({'message': 'Clube atualizado com sucesso'}), 200
     except Exception as e:
-        current_app.logger.error(f'Erro ao tentar atualizar o clube {club_id}: {e}')
+        current_app.logger.error('Erro ao tentar atualizar o clube %s: %s', club_id, e)
         return jsonify({'error': 'Erro ao tentar atualizar o clube'}), 500
 
 @clubs_bp.route('/clubes/<club_id>', methods=['DELETE'])
@@ -333,11 +370,11 @@ def delete_club(current_user, club_id):
     """
     
     current_app.logger.info(
-        f'Requisição de DELETE do clube {club_id} feito pelo user {current_user.id}'
+        'Requisição de DELETE do clube %s feito pelo user %s', club_id, current_user.id
     )
     
     if not (club := Clube.query.get(club_id)):
-        current_app.logger.error(f'Clube {club_id} não encontrado')
+        current_app.logger.error('Clube %s não encontrado', club_id)
         return jsonify({'error': 'Clube não encontrado'}), 404
     
     if club.criador != current_user.id:
@@ -347,9 +384,11 @@ def delete_club(current_user, club_id):
     try:
         db.session.delete(club)
         db.session.commit()
-        current_app.logger.info(f'Clube {club_id} deletado com sucesso')
+        for namespace in (cache.CLUBE, cache.CLUBE_LIVROS, cache.CLUBE_USUARIOS):
+            cache.invalidar(namespace, club_id)
+        current_app.logger.info('Clube %s deletado com sucesso', club_id)
         return jsonify({'message': 'Clube deletado com sucesso'}), 200
     
     except Exception as e:
-        current_app.logger.error(f'Erro ao tentar deletar o clube {club_id}: {e}')
+        current_app.logger.error('Erro ao tentar deletar o clube %s: %s', club_id, e)
         return jsonify({'error': 'Erro ao tentar deletar o clube'}), 500
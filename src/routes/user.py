@@ -1,11 +1,17 @@
 from flask import Blueprint, request, jsonify, current_app
-from src.database.models import db, Usuario
+from src.database.models import db, Usuario, Participa
 from src.database import model_validation as validator
+from src.database import recomendacoes
+from src.utils import cache, fields
 from sqlalchemy import or_
 import re
 
 users_bp = Blueprint('usuarios', __name__)
 
+def clubes_do_usuario(user_id):
+    """Ids dos clubes dos quais o usuário participa"""
+    return [clube_id for (clube_id,) in db.session.query(Participa.clube_id).filter(Participa.usuario_id == user_id)]
+
 
 @users_bp.route('/usuarios', methods=['POST'])
 def post_user():
@@ -49,7 +55,7 @@ def post_user():
     """
 
     current_app.logger.info(
-        f"Requisição de POST de usuário recebida, conteudo: {request.json}")
+        "Requisição de POST de usuário recebida, conteudo: %s", request.json)
 
     # Validação dos campos do Usuário
     user = validator.valide_user(request.json)
@@ -60,8 +66,9 @@ def post_user():
         # Salva o novo usuário no banco de dados
         db.session.add(user)
         db.session.commit()
+        cache.invalidar(cache.USUARIO, user.nickname)
         token = validator.get_token(user.id)
-        current_app.logger.info(f"Usuário criado com sucesso, token: {token}")
+        current_app.logger.info("Usuário criado com sucesso, token: %s", token)
         return jsonify({'token': token}), 200
 
     except Exception as e:
@@ -110,7 +117,7 @@ def login_user():
     """
 
     current_app.logger.info(
-        f"Requisição de LOGIN/GET de usuário recebida, dados recebidos: {request.json}")
+        "Requisição de LOGIN/GET de usuário recebida, dados recebidos: %s", request.json)
 
     dados = request.json
     nickname, email = None, None
@@ -120,7 +127,7 @@ def login_user():
             nickname := dados.get('nickname')), ('email ou nickname')
 
     except AssertionError as ae:
-        current_app.logger.error(f"O campo de {ae.args[0]} não foi preenchido")
+        current_app.logger.error("O campo de %s não foi preenchido", ae.args[0])
 
         return jsonify(
             {"error": f"O campo de {ae.args[0]} não foi preenchido"}
@@ -141,7 +148,7 @@ def login_user():
         ), 401
 
     except Exception as e:
-        current_app.logger.exception(f'Erro durante o login {e}')
+        current_app.logger.exception('Erro durante o login %s', e)
         return jsonify({"error": "Ocorreu um erro durante o login"}), 500
 
     try:
@@ -152,7 +159,7 @@ def login_user():
         return jsonify({'token': token}), 200
     except Exception as e:
         db.session.rollback()
-        current_app.logger.exception(f'Erro durante o login {e}')
+        current_app.logger.exception('Erro durante o login %s', e)
         return jsonify({"error": "Ocorreu um erro durante o login"}), 500
 
 
@@ -184,13 +191,13 @@ def get_user(current_user):
     """
 
     current_app.logger.info(
-        f"Requisição de GET do usuário {current_user.id} recebida"
+        "Requisição de GET do usuário %s recebida", current_user.id
     )
 
     try:
         user_dict = current_user.to_dict()
         current_app.logger.info(
-            f"Usuário {current_user.id} retornado com sucesso")
+            "Usuário %s retornado com sucesso", current_user.id)
         return jsonify(user_dict), 200
 
     except Exception as e:
@@ -261,7 +268,7 @@ def update_user(current_user):
     """
 
     current_app.logger.info(
-        f"Requisição de PUT do usário {current_user.id} recebida com os parametros : {request.json}"
+        "Requisição de PUT do usário %s recebida com os parametros : %s", current_user.id, request.json
     )
 
     dados = request.json
@@ -271,6 +278,7 @@ def update_user(current_user):
 
     updated = []
     errors = []
+    nickname_anterior = current_user.nickname
 
     for field in to_update:
         try:
@@ -295,17 +303,25 @@ def update_user(current_user):
             updated.append(field)
         except:
             db.session.rollback()
-            current_app.logger.error(f"Erro ao tentar atualizar o campo {field}, {dados.get(field)}")
+            current_app.logger.error("Erro ao tentar atualizar o campo %s, %s", field, dados.get(field))
             errors.append(field)
 
     if len(updated) == 0 and errors > 1:
         current_app.logger.error(
-            f"Não foi possível atualizar todos os campos: {', '.join(errors)}")
+            "Não foi possível atualizar todos os campos: %s", ', '.join(errors))
         return jsonify(
             {"error": f"Não foi possível atualizar todos os campos: {', '.join(errors)}"}
         ), 400
     
-    current_app.logger.info(f"Usuário atualizado com sucesso, atualizados: {updated}, erros: {errors}")
+    if updated:
+        validator.invalidar_usuario(current_user.id)
+        cache.invalidar(cache.USUARIO, *{nickname_anterior, current_user.nickname})
+    
+    if {'nome', 'sobrenome'} & set(updated):
+        # Nome e sobrenome aparecem na listagem de usuários dos clubes
+        cache.invalidar(cache.CLUBE_USUARIOS, *clubes_do_usuario(current_user.id))
+    
+    current_app.logger.info("Usuário atualizado com sucesso, atualizados: %s, erros: %s", updated, errors)
     
     return jsonify(
         {"message": "Usuário atualizado com sucesso",
@@ -337,18 +353,138 @@ def delete_user(current_user):
       500:
         description: Erro durante a exclusão do usuário
     """
-    current_app.logger.info(f"Requisição DELETE do usuário {current_user.id}")
+    current_app.logger.info("Requisição DELETE do usuário %s", current_user.id)
     try:
+        user_id, nickname = current_user.id, current_user.nickname
+        clubes = clubes_do_usuario(user_id)
         db.session.delete(current_user)
         db.session.commit()
+        validator.invalidar_usuario(user_id)
+        cache.invalidar(cache.CLUBE_USUARIOS, *clubes)
+        cache.invalidar(cache.USUARIO, nickname)
         return jsonify({'message': 'Usuário excluído com sucesso'}), 200
     except:
         db.session.rollback()
         return jsonify({"error": "Não foi possível excluir o usuário"}), 500
 
 
+@users_bp.route('/usuarios/recomendacoes/livros', methods=['GET'])
+@validator.check_jwt_token
+def get_recomendacoes_livros(current_user):
+    """
+    Recomenda livros ao usuário logado a partir das suas avaliações e dos
+    livros similares aos que ele avaliou
+    ---
+    tags:
+      - Usuário
+    parameters:
+      - in: header
+        name: Authorization
+        required: true
+        description: Token de autenticação (formato Bearer token)
+        type: string
+      - in: query
+        name: limit
+        required: false
+        description: Quantidade de livros recomendados (padrão 10, máximo 50)
+        type: integer
+    responses:
+      200:
+        description: Livros recomendados, do mais para o menos indicado (vazio sem avaliações)
+        schema:
+          type: object
+      400:
+        description: Parâmetro limit inválido
+      401:
+        description: Token expirado
+      403:
+        description: Token de autenticação inválido
+      500:
+        description: Erro durante o cálculo das recomendações
+    """
+
+    current_app.logger.info("Requisição de recomendações de livros para %s", current_user.id)
+
+    try:
+        limite = int(request.args.get('limit', 10))
+        assert 0 < limite <= 50
+    except (ValueError, AssertionError):
+        current_app.logger.error("Parâmetro limit inválido")
+        return jsonify({'error': "O parâmetro limit deve estar entre 1 e 50"}), 400
+
+    try:
+        livros = recomendacoes.recomendar_para_usuario(current_user.id, limite)
+        current_app.logger.info("%d livros recomendados para %s", len(livros), current_user.id)
+        return jsonify({'livros': [
+            {'id': id, 'nome': nome, 'autor': autor, 'pontuacao': round(pontuacao, 4)}
+            for id, nome, autor, pontuacao in livros
+        ]}), 200
+
+    except Exception as e:
+        current_app.logger.exception(e)
+        return jsonify({"error": "Ocorreu um erro durante o cálculo das recomendações"}), 500
+
+
+@users_bp.route('/usuarios/recomendacoes/clubes', methods=['GET'])
+@validator.check_jwt_token
+def get_recomendacoes_clubes(current_user):
+    """
+    Recomenda clubes ao usuário logado pelos membros e livros em comum com os
+    clubes dos quais ele participa
+    ---
+    tags:
+      - Usuário
+    parameters:
+      - in: header
+        name: Authorization
+        required: true
+        description: Token de autenticação (formato Bearer token)
+        type: string
+      - in: query
+        name: limit
+        required: false
+        description: Quantidade de clubes recomendados (padrão 10, máximo 50)
+        type: integer
+    responses:
+      200:
+        description: Clubes recomendados, do mais para o menos indicado (vazio sem participações)
+        schema:
+          type: object
+      400:
+        description: Parâmetro limit inválido
+      401:
+        description: Token expirado
+      403:
+        description: Token de autenticação inválido
+      500:
+        description: Erro durante o cálculo das recomendações
+    """
+
+    current_app.logger.info("Requisição de recomendações de clubes para %s", current_user.id)
+
+    try:
+        limite = int(request.args.get('limit', 10))
+        assert 0 < limite <= 50
+    except (ValueError, AssertionError):
+        current_app.logger.error("Parâmetro limit inválido")
+        return jsonify({'error': "O parâmetro limit deve estar entre 1 e 50"}), 400
+
+    try:
+        clubes = recomendacoes.recomendar_clubes(current_user.id, limite)
+        current_app.logger.info("%d clubes recomendados para %s", len(clubes), current_user.id)
+        return jsonify({'clubes': [
+            {'id': id, 'nome': nome, 'descricao': descricao, 'pontuacao': round(pontuacao, 4)}
+            for id, nome, descricao, pontuacao in clubes
+        ]}), 200
+
+    except Exception as e:
+        current_app.logger.exception(e)
+        return jsonify({"error": "Ocorreu um erro durante o cálculo das recomendações"}), 500
+
+
 @users_bp.route('/usuarios/<nickname>', methods=['GET'])
 @validator.check_jwt_token
+@cache.cacheado(cache.USUARIO, 'nickname', variantes=('fields',), negativo=True)
 def get_user_by_nickname(current_user, nickname):
     """
     Busca um usuário pelo nickname
@@ -366,11 +502,18 @@ def get_user_by_nickname(current_user, nickname):
         required: true
         description: Nickname do usuário
         type: string
+      - in: query
+        name: fields
+        required: false
+        description: Campos retornados, separados por vírgula (ex.: id,nickname). Padrão todos.
+        type: string
     responses:
       200:
         description: Usuário encontrado com sucesso
         schema:
           type: object
+      400:
+        description: Campos inválidos em fields
       401:
         description: Token expirado
       403:
@@ -381,13 +524,19 @@ def get_user_by_nickname(current_user, nickname):
         description: Erro durante a busca do usuário
     """
 
-    current_app.logger.info(f"Buscando o nickname: {nickname}")
+    current_app.logger.info("Buscando o nickname: %s", nickname)
+    
+    try:
+        campos = fields.ler_campos(Usuario.nomes_colunas)
+    except ValueError as e:
+        current_app.logger.error(str(e))
+        return jsonify({'error': str(e)}), 400
     
-    user = Usuario.query.filter_by(nickname=nickname).first()
+    user = db.session.query(*Usuario.colunas(campos)).filter(Usuario.nickname == nickname).first()
 
     if not user:
-        current_app.logger.error(f"Usuário {nickname} não encontrado")
+        current_app.logger.error("Usuário %s não encontrado", nickname)
         return jsonify({"error": "Usuário não encontrado"}), 404
 
-    current_app.logger.info(f"Usuário {nickname} encontrado com sucesso")
-    return jsonify(user.to_dict()), 200
+    current_app.logger.info("Usuário %s encontrado com sucesso", nickname)
+    return jsonify(Usuario.linha_para_dict(user, campos)), 200
@@ -1,9 +1,13 @@
 from flask import Blueprint, jsonify, current_app
 from src.database.models import db, Usuario, Clube, Participa
 from src.database import model_validation as validator
+from src.utils import pagination, cache, fields
 
 user_club_bp = Blueprint('/usuarios/clube', __name__)
 
+# Campos disponíveis na listagem de usuários de um clube (parâmetro fields)
+CAMPOS_USUARIO = {'id': Usuario.id, 'nome': Usuario.nome, 'sobrenome': Usuario.sobrenome}
+
 @user_club_bp.route('/usuarios/clube/<clube_id>', methods=['POST'])
 @validator.check_jwt_token
 def post_user_clubs(current_user, clube_id):
@@ -70,14 +74,14 @@ def post_user_clubs(current_user, clube_id):
                   example: "Erro ao salvar participação"
     """
     
-    current_app.logger.info(f"Requisição para adicionar o user {current_user.id} ao grupo {clube_id} recebida")
+    current_app.logger.info("Requisição para adicionar o user %s ao grupo %s recebida", current_user.id, clube_id)
     
     if not (clube := Clube.query.get(clube_id)):
-        current_app.logger.error(f'Clube {clube_id} não encontrado')
+        current_app.logger.error('Clube %s não encontrado', clube_id)
         return jsonify({'error': 'Clube não encontrado'}), 404
 
     if (participa := Participa.query.get((current_user.id, clube_id))):
-        current_app.logger.error(f'Já existe um registro de participação para o user {current_user.id} no clube {clube_id}')
+        current_app.logger.error('Já existe um registro de participação para o user %s no clube %s', current_user.id, clube_id)
         return jsonify({'error': 'Já existe um registro de participação'}), 409
     
     try:
@@ -87,7 +91,8 @@ def post_user_clubs(current_user, clube_id):
         )
         db.session.add(participa)
         db.session.commit()
-        current_app.logger.info(f'Participação adicionada com sucesso para o user {current_user.id} no clube {clube_id}')
+        cache.invalidar(cache.CLUBE_USUARIOS, clube_id)
+        current_app.logger.info('Participação adicionada com sucesso para o user %s no clube %s', current_user.id, clube_id)
         return jsonify({'message': 'Participação adicionada com sucesso'}), 201
 
     except:
@@ -97,6 +102,7 @@ def post_user_clubs(current_user, clube_id):
 
 
 @user_club_bp.route('/usuarios/clube/<clube_id>', methods=['GET'])
+@cache.cacheado(cache.CLUBE_USUARIOS, 'clube_id', variantes=('limit', 'cursor', 'fields'))
 def get_users_club(clube_id):
     """
     Lista os usuários de um clube específico.
@@ -111,6 +117,24 @@ def get_users_club(clube_id):
         description: Identificação do Clube.
         schema:
           type: string
+      - name: limit
+        in: query
+        required: false
+        description: Quantidade máxima de itens por página (limitada pelo máximo do servidor).
+        schema:
+          type: integer
+      - name: cursor
+        in: query
+        required: false
+        description: Cursor retornado em next_cursor pela página anterior.
+        schema:
+          type: string
+      - name: fields
+        in: query
+        required: false
+        description: Campos de cada usuário, separados por vírgula (id, nome, sobrenome). Padrão todos.
+        schema:
+          type: string
 
     responses:
       200:
@@ -131,6 +155,11 @@ def get_users_club(clube_id):
                         type: string
                       sobrenome:
                         type: string
+                next_cursor:
+                  type: string
+                  nullable: true
+      400:
+        description: Parâmetros de paginação ou campos inválidos.
       404:
         description: Clube não encontrado.
         content:
@@ -152,33 +181,43 @@ def get_users_club(clube_id):
                   type: string
                   example: "Erro interno no servidor"
     """
-    cache = current_app.cache
-    cache_key = f'/usuarios/clube/{clube_id}'
-    
-    if (users_list := cache.get(cache_key)):
-      current_app.logger.info(f"Usuários encontrados no cache: {users_list}")
-      return jsonify(users=users_list), 200
+    try:
+        limit, cursor = pagination.ler_parametros()
+        campos = fields.ler_campos(list(CAMPOS_USUARIO)) or list(CAMPOS_USUARIO)
+    except ValueError as e:
+        current_app.logger.error(str(e))
+        return jsonify({'error': str(e)}), 400
     
-    current_app.logger.info(f"Requisição para listar os users do grupo {clube_id} recebida")
+    current_app.logger.info("Requisição para listar os users do grupo %s recebida", clube_id)
     
     if not (clube := Clube.query.get(clube_id)):
-        current_app.logger.error(f'Clube {clube_id} não encontrado')
+        current_app.logger.error('Clube %s não encontrado', clube_id)
         return jsonify({'error': 'Clube não encontrado'}), 404
     
     try:
-        users = db.session.query(Usuario).join(Participa).filter(Participa.clube_id == clube_id).all()
+        query = (
+            db.session.query(*[CAMPOS_USUARIO[campo] for campo in campos])
+            .select_from(Usuario)
+            .join(Participa)
+            .filter(Participa.clube_id == clube_id)
+        )
+        users = pagination.paginar(query, [Usuario.id], limit, cursor)
         
-        if not users:
-            current_app.logger.info(f'Nenhum usuário encontrado no clube {clube_id}')
+        if not users.itens and not cursor:
+            current_app.logger.info('Nenhum usuário encontrado no clube %s', clube_id)
             return jsonify({'message': 'Nenhum usuário encontrado'}), 200
     
-        users_list = [{'id': user.id, 'nome': user.nome, 'sobrenome': user.sobrenome} for user in users]
-        current_app.logger.info(f'Usuários encontrados no clube {clube_id}: {users_list}')
+        users_list = [dict(zip(campos, user)) for user in users.itens]
+        current_app.logger.info('%d usuários encontrados no clube %s', len(users_list), clube_id)
+
+        return jsonify(users=users_list, next_cursor=users.next_cursor), 200
 
-        return jsonify(users=users_list), 200
+    except ValueError as e:
+        current_app.logger.error(str(e))
+        return jsonify({'error': str(e)}), 400
 
     except Exception as e:
-        current_app.logger.exception(f'Erro ao buscar usuários do clube {clube_id}: {e}')
+        current_app.logger.exception('Erro ao buscar usuários do clube %s: %s', clube_id, e)
         return jsonify({'error': 'Erro interno no servidor'}), 500
 
 @user_club_bp.route('/usuarios/clube/<clube_id>', methods=['DELETE'])
@@ -236,20 +275,21 @@ def delete_user_clubs(current_user, clube_id):
                   type: string
                   example: "Erro ao tentar remover participação"
     """
-    current_app.logger.info(f"Requisição para remover o user {current_user.id} do grupo {clube_id} recebida")
+    current_app.logger.info("Requisição para remover o user %s do grupo %s recebida", current_user.id, clube_id)
     
     if not (clube := Clube.query.get(clube_id)):
-        current_app.logger.error(f'Clube {clube_id} não encontrado')
+        current_app.logger.error('Clube %s não encontrado', clube_id)
         return jsonify({'error': 'Clube não encontrado'}), 404
     
     if not (participa := Participa.query.get((current_user.id, clube_id))):
-        current_app.logger.error(f'Não existe um registro de participação para o user {current_user.id} no clube {clube_id}')
+        current_app.logger.error('Não existe um registro de participação para o user %s no clube %s', current_user.id, clube_id)
         return jsonify({'error': 'Não existe um registro de participação'}), 404
     
     try:
         db.session.delete(participa)
         db.session.commit()
-        current_app.logger.info(f'Participação removida com sucesso para o user {current_user.id} no clube {clube_id}')
+        cache.invalidar(cache.CLUBE_USUARIOS, clube_id)
+        current_app.logger.info('Participação removida com sucesso para o user %s no clube %s', current_user.id, clube_id)
         return jsonify({'message': 'Participação removida com sucesso'}), 200
     except:
         db.session.rollback()
@@ -0,0 +1,257 @@
+import hashlib
+import secrets
+import threading
+import time
+from functools import wraps
+from flask import current_app, request, make_response
+from src.database.routing import usar_primario
+from src.utils import metrics, streaming
+
+# Namespaces das entradas de cache. Cada namespace+id tem uma versão própria
+# que faz parte da chave; invalidar troca a versão, descartando de uma vez
+# todas as variantes (ex.: páginas diferentes da mesma listagem).
+LIVRO = 'livro'
+CLUBE = 'clube'
+USUARIO = 'usuario'
+CLUBE_LIVROS = 'clube_livros'
+CLUBE_USUARIOS = 'clube_usuarios'
+LIVRO_SIMILARES = 'livro_similares'
+AUTENTICACAO = 'autenticacao'
+
+
+def _chave_versao(namespace: str, id: str) -> str:
+    return f'versao:{namespace}:{id}'
+
+
+def _versao(namespace: str, id: str) -> str:
+    """
+    Retorna a versão atual do namespace+id, criando uma se não existir.
+
+    As versões são aleatórias (e não contadores), então mesmo que a chave de
+    versão seja descartada pelo backend nunca se volta a uma versão antiga.
+    """
+    cache = current_app.cache
+    chave = _chave_versao(namespace, id)
+    if (versao := cache.get(chave)) is None:
+        versao = secrets.token_hex(4)
+        if not cache.add(chave, versao, timeout=0):
+            versao = cache.get(chave) or versao
+    return versao
+
+
+def chave(namespace: str, id: str, *partes) -> str:
+    """
+    Monta a chave versionada de uma entrada.
+
+    A chave deve ser calculada uma única vez, antes da leitura no banco: se uma
+    escrita invalidar o namespace no meio da requisição, o valor (possivelmente
+    antigo) é gravado na versão anterior e nunca mais é lido.
+    """
+    sufixo = ':'.join(str(parte) for parte in partes)
+    return f'{namespace}:{id}:{_versao(namespace, id)}:{sufixo}'
+
+
+def obter(chave: str):
+    return current_app.cache.get(chave)
+
+
+def salvar(chave: str, valor, timeout=None):
+    """Grava a entrada com o timeout informado ou o padrão (CACHE_DEFAULT_TIMEOUT)."""
+    current_app.cache.set(chave, valor, timeout=timeout)
+
+
+def invalidar(namespace: str, *ids):
+    """Descarta todas as entradas dos ids informados no namespace."""
+    cache = current_app.cache
+    for id in ids:
+        cache.set(_chave_versao(namespace, id), secrets.token_hex(4), timeout=0)
+    current_app.logger.info("Cache invalidado: %s %s", namespace, list(ids))
+
+
+class _Voo:
+    """Cálculo em andamento de uma chave, aguardado pelas requisições seguidoras."""
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+_voos = {}
+_voos_lock = threading.Lock()
+
+# Tempo máximo (s) que uma requisição espera pelo cálculo de outra
+ESPERA_MAXIMA = 5.0
+
+
+def _entrar_no_voo(chave: str):
+    """Retorna (voo, lider): lider=True se esta requisição deve calcular a chave."""
+    with _voos_lock:
+        if (voo := _voos.get(chave)) is not None:
+            return voo, False
+        voo = _voos[chave] = _Voo()
+        return voo, True
+
+
+def _sair_do_voo(chave: str, voo: _Voo):
+    with _voos_lock:
+        _voos.pop(chave, None)
+    voo.evento.set()
+
+
+def _trava_entre_processos(chave: str) -> bool:
+    """Trava no próprio backend, útil quando ele é compartilhado (SharedCache)."""
+    return current_app.cache.add(f'trava:{chave}', 1, timeout=int(ESPERA_MAXIMA) + 1)
+
+
+def _liberar_trava(chave: str):
+    current_app.cache.delete(f'trava:{chave}')
+
+
+def single_flight(chave: str, calcular, carregar=None):
+    """
+    Executa `calcular()` uma única vez para requisições simultâneas da mesma chave.
+
+    Dentro do processo, as demais requisições aguardam o resultado do líder.
+    Entre processos, o líder segura uma trava no backend de cache e os outros
+    consultam `carregar()` (a leitura do cache) até o valor aparecer. Se a
+    espera passar de ESPERA_MAXIMA, a requisição calcula por conta própria.
+    """
+    voo, lider = _entrar_no_voo(chave)
+
+    if not lider:
+        if voo.evento.wait(ESPERA_MAXIMA) and voo.erro is None:
+            return voo.resultado
+        return calcular()
+
+    try:
+        if carregar is not None and not _trava_entre_processos(chave):
+            limite = time.monotonic() + ESPERA_MAXIMA
+            while time.monotonic() < limite:
+                if (valor := carregar()) is not None:
+                    voo.resultado = valor
+                    return valor
+                time.sleep(0.01)
+            voo.resultado = calcular()
+            return voo.resultado
+
+        try:
+            voo.resultado = calcular()
+            return voo.resultado
+        finally:
+            if carregar is not None:
+                _liberar_trava(chave)
+
+    except Exception as e:
+        voo.erro = e
+        raise
+
+    finally:
+        _sair_do_voo(chave, voo)
+
+
+def _entrada(resposta, atual_ate: float = 0) -> dict:
+    """Representação gravada em cache: corpo já serializado, ETag e data de geração."""
+    dados = resposta.get_data()
+    return {
+        'dados': dados,
+        'status': resposta.status_code,
+        'mimetype': resposta.mimetype,
+        'etag': hashlib.sha1(dados).hexdigest(),
+        'modificado': int(time.time()),
+        'atual_ate': atual_ate,
+    }
+
+
+def responder(entrada: dict):
+    """
+    Monta a resposta a partir de uma entrada do cache, sem serializar nada.
+
+    Com `If-None-Match`/`If-Modified-Since` batendo com a entrada, a resposta
+    é um 304 sem corpo.
+    """
+    resposta = current_app.response_class(entrada['dados'], status=entrada['status'], mimetype=entrada['mimetype'])
+    resposta.set_etag(entrada['etag'])
+    resposta.last_modified = entrada['modificado']
+    return resposta.make_conditional(request)
+
+
+def cacheado(namespace: str, id_arg: str, variantes=(), timeout=None, stale=0, negativo=False):
+    """
+    Decorator de cache para rotas GET com proteção contra stampede.
+
+    Parâmetros de Entrada:
+        - namespace : str (namespace usado na invalidação, ex.: CLUBE_LIVROS)
+        - id_arg : str (argumento da rota que identifica o recurso)
+        - variantes : tuple (parâmetros da query string que fazem parte da chave)
+        - timeout : Optional[int] (tempo em que a entrada é considerada atual;
+          padrão CACHE_DEFAULT_TIMEOUT)
+        - stale : int (segundos adicionais em que a entrada vencida ainda é
+          servida enquanto uma única requisição a recalcula)
+        - negativo : bool (grava também respostas 404 por CACHE_NEGATIVE_TIMEOUT
+          segundos; a rota de criação do recurso deve invalidar o id)
+
+    Somente respostas JSON 200 (e 404, com `negativo`) são gravadas, já
+    serializadas e com ETag/Last-Modified. Em uma ausência, apenas uma
+    requisição executa a rota e as simultâneas recebem o mesmo corpo
+    (single-flight). Requisições condicionais recebem 304.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            # Respostas em streaming (NDJSON) são geradas a cada requisição
+            if streaming.pedido_ndjson():
+                return f(*args, **kwargs)
+
+            ttl = timeout or current_app.config['CACHE_DEFAULT_TIMEOUT']
+            cache_key = chave(namespace, kwargs[id_arg], *[request.args.get(v, '') for v in variantes])
+
+            def calcular():
+                metrics.registrar_cache(namespace, 'miss')
+                # A entrada gravada vale para todos os usuários, então não pode
+                # vir de uma réplica atrasada: a ausência é calculada no primário
+                usar_primario()
+                resposta = make_response(f(*args, **kwargs))
+                if not resposta.is_json:
+                    return _entrada(resposta)
+                if resposta.status_code == 200:
+                    entrada = _entrada(resposta, time.time() + ttl)
+                    salvar(cache_key, entrada, timeout=ttl + stale)
+                elif resposta.status_code == 404 and negativo:
+                    ttl_negativo = current_app.config.get('CACHE_NEGATIVE_TIMEOUT', 30)
+                    entrada = _entrada(resposta, time.time() + ttl_negativo)
+                    salvar(cache_key, entrada, timeout=ttl_negativo)
+                else:
+                    entrada = _entrada(resposta)
+                return entrada
+
+            entrada = obter(cache_key)
+            if entrada is not None:
+                if entrada['atual_ate'] > time.time():
+                    current_app.logger.info("Cache hit para %s", cache_key)
+                    metrics.registrar_cache(namespace, 'hit')
+                    return responder(entrada)
+
+                # Entrada vencida: se outra requisição já está recalculando, serve a antiga
+                voo, lider = _entrar_no_voo(cache_key)
+                if not lider or not _trava_entre_processos(cache_key):
+                    if lider:
+                        _sair_do_voo(cache_key, voo)
+                    current_app.logger.info("Cache stale servido para %s", cache_key)
+                    metrics.registrar_cache(namespace, 'stale')
+                    return responder(entrada)
+
+                try:
+                    voo.resultado = calcular()
+                except Exception as e:
+                    voo.erro = e
+                    raise
+                finally:
+                    _liberar_trava(cache_key)
+                    _sair_do_voo(cache_key, voo)
+                return responder(voo.resultado)
+
+            return responder(single_flight(cache_key, calcular, lambda: obter(cache_key)))
+
+        return decorated
+
+    return decorator
@@ -0,0 +1,25 @@
+from flask import request
+
+# As rotas com cache (cache.cacheado) já respondem com ETag/Last-Modified
+# guardados junto da entrada. Para as demais respostas GET o ETag é o hash do
+# corpo: a serialização continua acontecendo, mas o cliente que já possui a
+# versão recebe um 304 sem corpo.
+
+
+def registrar(app):
+    """Registra o tratamento de GET condicional (If-None-Match) em todas as rotas."""
+
+    @app.after_request
+    def resposta_condicional(resposta):
+        if (
+            request.method in ('GET', 'HEAD')
+            and resposta.status_code == 200
+            and not resposta.is_streamed
+            and not resposta.direct_passthrough
+            and 'ETag' not in resposta.headers
+        ):
+            resposta.add_etag()
+            resposta = resposta.make_conditional(request)
+        return resposta
+
+    return app
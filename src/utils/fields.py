@@ -0,0 +1,27 @@
+from typing import Optional
+from flask import request
+
+# Projeção de campos (sparse fieldsets): `?fields=id,nome` restringe as colunas
+# selecionadas no banco e serializadas na resposta.
+
+
+def ler_campos(permitidos) -> Optional[list]:
+    """
+    Lê o parâmetro `fields` (nomes separados por vírgula) da requisição atual.
+
+    Retorno:
+        None sem o parâmetro; senão os campos pedidos, na ordem de `permitidos`.
+
+    Levanta ValueError se a lista estiver vazia ou tiver campos desconhecidos.
+    """
+    valor = request.args.get('fields')
+    if valor is None:
+        return None
+
+    pedidos = {campo.strip() for campo in valor.split(',') if campo.strip()}
+    if not pedidos:
+        raise ValueError('Parâmetro fields inválido')
+    if (desconhecidos := pedidos - set(permitidos)):
+        raise ValueError(f"Campos inválidos: {', '.join(sorted(desconhecidos))}")
+
+    return [campo for campo in permitidos if campo in pedidos]
@@ -0,0 +1,44 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependência opcional: sem ela, usa o json da biblioteca padrão
+    orjson = None
+
+
+class JSONProvider(DefaultJSONProvider):
+    """
+    Provider JSON do Flask que serializa com o orjson quando disponível.
+
+    Mantém o comportamento do provider padrão: chaves ordenadas (sort_keys),
+    datas no formato HTTP e os mesmos tipos extras, tratados por `default`.
+    A diferença é que textos não ASCII saem em UTF-8, sem escapes \\uXXXX.
+    Chamadas com argumentos específicos do `json` (ex.: `cls`) usam o provider padrão.
+    """
+
+    def _opcoes(self) -> int:
+        opcoes = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        return opcoes
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._opcoes()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        opcoes = self._opcoes() | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            opcoes |= orjson.OPT_INDENT_2
+
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=opcoes), mimetype=self.mimetype)
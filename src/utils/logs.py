@@ -0,0 +1,102 @@
+import atexit
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from flask.logging import default_handler
+
+# Log assíncrono: as rotas apenas enfileiram os registros (QueueHandler) e uma
+# thread separada (QueueListener) formata e grava no arquivo com rotação por
+# tamanho. Use formatação lazy (`logger.info('Livro %s', livro_id)`): a
+# mensagem só é montada na thread de escrita, e nunca para registros
+# descartados pelo nível ou pela amostragem.
+
+FORMATO = '%(asctime)s - %(levelname)-6s : %(message)s'
+
+
+class Amostragem(logging.Filter):
+    """
+    Mantém apenas uma fração dos registros de cada nível, conforme `taxas`
+    (ex.: {'INFO': 0.1} grava ~10% dos INFO). Níveis ausentes são sempre gravados.
+    """
+
+    def __init__(self, taxas: dict):
+        super().__init__()
+        self.taxas = {logging.getLevelName(nivel) if isinstance(nivel, str) else nivel: taxa
+                      for nivel, taxa in taxas.items()}
+
+    def filter(self, record):
+        taxa = self.taxas.get(record.levelno)
+        return taxa is None or random.random() < taxa
+
+
+class FilaHandler(QueueHandler):
+    """
+    QueueHandler que enfileira o registro sem formatá-lo. A fila é local ao
+    processo, então a formatação (e a cópia do registro feita pelo
+    QueueHandler padrão) fica para a thread de escrita.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def _parar(listener: QueueListener):
+    """Grava os registros pendentes e encerra a thread (se ainda estiver ativa)."""
+    if listener._thread is not None:
+        listener.stop()
+
+
+def configurar(app):
+    """
+    Substitui os handlers do logger do app pela fila assíncrona. Configurações:
+
+        - LOG_ARQUIVO: caminho do arquivo de log
+        - LOG_NIVEL: nível mínimo registrado
+        - LOG_TAMANHO_MAXIMO / LOG_BACKUPS: rotação por tamanho (bytes) e arquivos mantidos
+        - LOG_AMOSTRAGEM: fração gravada por nível, ex.: {'INFO': 0.1}
+        - LOG_CONSOLE: também escreve no stderr (handler padrão do Flask)
+        - LOG_ASSINCRONO: False grava direto, na thread da requisição
+
+    Retorno:
+        O QueueListener iniciado (None no modo síncrono).
+    """
+    logger = app.logger
+
+    # O logger é compartilhado entre instâncias do app no mesmo processo
+    for handler in list(logger.handlers):
+        if (listener := getattr(handler, 'listener', None)):
+            _parar(listener)
+        if isinstance(handler, (FilaHandler, RotatingFileHandler)):
+            logger.removeHandler(handler)
+            handler.close()
+    for filtro in [f for f in logger.filters if isinstance(f, Amostragem)]:
+        logger.removeFilter(filtro)
+    logger.removeHandler(default_handler)
+
+    arquivo = RotatingFileHandler(
+        app.config['LOG_ARQUIVO'],
+        maxBytes=app.config['LOG_TAMANHO_MAXIMO'],
+        backupCount=app.config['LOG_BACKUPS'],
+        encoding='utf-8',
+        delay=True
+    )
+    arquivo.setFormatter(logging.Formatter(FORMATO))
+    destinos = [arquivo, default_handler] if app.config['LOG_CONSOLE'] else [arquivo]
+
+    logger.setLevel(app.config['LOG_NIVEL'])
+    # A amostragem fica no logger: o registro descartado nem chega aos handlers
+    if (taxas := app.config.get('LOG_AMOSTRAGEM')):
+        logger.addFilter(Amostragem(taxas))
+
+    if not app.config['LOG_ASSINCRONO']:
+        for destino in destinos:
+            logger.addHandler(destino)
+        return None
+
+    handler = FilaHandler(queue.SimpleQueue())
+    handler.listener = QueueListener(handler.queue, *destinos, respect_handler_level=True)
+    handler.listener.start()
+    atexit.register(_parar, handler.listener)
+    logger.addHandler(handler)
+    return handler.listener
@@ -0,0 +1,51 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Cache em memória do processo, limitado por quantidade de itens (LRU) e com
+    expiração opcional por item. Seguro para uso entre threads.
+
+    :param tamanho: quantidade máxima de itens.
+    :param timeout: tempo padrão de vida dos itens em segundos (None = sem expiração).
+    """
+
+    def __init__(self, tamanho: int = 1024, timeout=None):
+        self.tamanho = tamanho
+        self.timeout = timeout
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave, padrao=None):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return padrao
+            valor, expira = item
+            if expira is not None and expira <= time.monotonic():
+                del self._itens[chave]
+                return padrao
+            self._itens.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        expira = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._itens[chave] = (valor, expira)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+
+    def delete(self, chave):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def clear(self):
+        with self._lock:
+            self._itens.clear()
+
+    def __len__(self):
+        return len(self._itens)
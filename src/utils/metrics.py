@@ -0,0 +1,182 @@
+import threading
+import time
+from collections import defaultdict
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Métricas da aplicação no formato de texto do Prometheus (GET /metrics):
+# requisições e latência por endpoint, consultas ao banco e acessos ao cache.
+# Os valores ficam em memória, por processo: com vários workers WSGI cada um
+# expõe os seus, e o Prometheus soma as séries.
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Limites (em segundos) dos buckets do histograma de latência
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histograma:
+    __slots__ = ('contagens', 'soma', 'total')
+
+    def __init__(self):
+        self.contagens = [0] * len(BUCKETS)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        for indice, limite in enumerate(BUCKETS):
+            if valor <= limite:
+                self.contagens[indice] += 1
+                break
+        self.soma += valor
+        self.total += 1
+
+
+class Registro:
+    """Contadores e histogramas, protegidos por uma única trava."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.limpar()
+
+    def limpar(self):
+        self.requisicoes = defaultdict(int)          # (endpoint, método, status) -> total
+        self.latencias = defaultdict(Histograma)     # (endpoint, método) -> histograma
+        self.consultas = defaultdict(int)            # endpoint -> consultas ao banco
+        self.tempo_banco = defaultdict(float)        # endpoint -> segundos no banco
+        self.cache = defaultdict(int)                # (namespace, resultado) -> total
+
+    def registrar_requisicao(self, endpoint, metodo, status, duracao, consultas, tempo_banco):
+        with self._trava:
+            self.requisicoes[endpoint, metodo, status] += 1
+            self.latencias[endpoint, metodo].observar(duracao)
+            self.consultas[endpoint] += consultas
+            self.tempo_banco[endpoint] += tempo_banco
+
+    def registrar_cache(self, namespace, resultado):
+        with self._trava:
+            self.cache[namespace, resultado] += 1
+
+    def exportar(self) -> str:
+        """Serializa as métricas no formato de texto do Prometheus."""
+        with self._trava:
+            requisicoes = sorted(self.requisicoes.items())
+            latencias = sorted(
+                (chave, (list(h.contagens), h.soma, h.total)) for chave, h in self.latencias.items()
+            )
+            consultas = sorted(self.consultas.items())
+            tempo_banco = sorted(self.tempo_banco.items())
+            cache = sorted(self.cache.items())
+
+        linhas = [
+            '# HELP bookbridge_requisicoes_total Requisições HTTP por endpoint, método e status.',
+            '# TYPE bookbridge_requisicoes_total counter',
+        ]
+        for (endpoint, metodo, status), total in requisicoes:
+            linhas.append(
+                f'bookbridge_requisicoes_total{{endpoint="{endpoint}",metodo="{metodo}",status="{status}"}} {total}'
+            )
+
+        linhas += [
+            '# HELP bookbridge_requisicao_duracao_segundos Latência das requisições por endpoint e método.',
+            '# TYPE bookbridge_requisicao_duracao_segundos histogram',
+        ]
+        for (endpoint, metodo), (contagens, soma, total) in latencias:
+            rotulos = f'endpoint="{endpoint}",metodo="{metodo}"'
+            acumulado = 0
+            for limite, contagem in zip(BUCKETS, contagens):
+                acumulado += contagem
+                linhas.append(f'bookbridge_requisicao_duracao_segundos_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+            linhas.append(f'bookbridge_requisicao_duracao_segundos_bucket{{{rotulos},le="+Inf"}} {total}')
+            linhas.append(f'bookbridge_requisicao_duracao_segundos_sum{{{rotulos}}} {soma}')
+            linhas.append(f'bookbridge_requisicao_duracao_segundos_count{{{rotulos}}} {total}')
+
+        linhas += [
+            '# HELP bookbridge_consultas_banco_total Comandos SQL executados por endpoint.',
+            '# TYPE bookbridge_consultas_banco_total counter',
+        ]
+        linhas += [f'bookbridge_consultas_banco_total{{endpoint="{endpoint}"}} {total}' for endpoint, total in consultas]
+
+        linhas += [
+            '# HELP bookbridge_consultas_banco_segundos_total Tempo gasto em comandos SQL por endpoint.',
+            '# TYPE bookbridge_consultas_banco_segundos_total counter',
+        ]
+        linhas += [f'bookbridge_consultas_banco_segundos_total{{endpoint="{endpoint}"}} {total}' for endpoint, total in tempo_banco]
+
+        linhas += [
+            '# HELP bookbridge_cache_total Acessos ao cache de respostas por namespace e resultado (hit, stale, miss).',
+            '# TYPE bookbridge_cache_total counter',
+        ]
+        linhas += [
+            f'bookbridge_cache_total{{namespace="{namespace}",resultado="{resultado}"}} {total}'
+            for (namespace, resultado), total in cache
+        ]
+        return '\n'.join(linhas) + '\n'
+
+
+registro = Registro()
+
+
+def registrar_cache(namespace: str, resultado: str):
+    """Conta um acesso ao cache de respostas ('hit', 'stale' ou 'miss')."""
+    if has_request_context() and g.get('metricas_inicio') is not None:
+        registro.registrar_cache(namespace, resultado)
+
+
+def _antes_do_comando(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and g.get('metricas_inicio') is not None:
+        conn.info['metricas_comando'] = time.perf_counter()
+
+
+def _depois_do_comando(conn, cursor, statement, parameters, context, executemany):
+    if (inicio := conn.info.pop('metricas_comando', None)) is not None and has_request_context():
+        g.metricas_consultas = g.get('metricas_consultas', 0) + 1
+        g.metricas_tempo_banco = g.get('metricas_tempo_banco', 0.0) + time.perf_counter() - inicio
+
+
+def registrar(app):
+    """
+    Liga a coleta (METRICAS_HABILITADAS) e a rota GET /metrics. Os comandos SQL
+    são contados por eventos de todos os engines e atribuídos ao endpoint da
+    requisição em andamento. Em respostas em streaming a latência vai até o
+    início do envio.
+    """
+    if not app.config.get('METRICAS_HABILITADAS'):
+        return app
+
+    if not event.contains(Engine, 'before_cursor_execute', _antes_do_comando):
+        event.listen(Engine, 'before_cursor_execute', _antes_do_comando)
+        event.listen(Engine, 'after_cursor_execute', _depois_do_comando)
+
+    @app.before_request
+    def _iniciar_medicao():
+        g.metricas_inicio = time.perf_counter()
+
+    @app.after_request
+    def _registrar_medicao(resposta):
+        if (inicio := g.get('metricas_inicio')) is not None and request.endpoint != 'metricas':
+            registro.registrar_requisicao(
+                request.endpoint or 'desconhecido',
+                request.method,
+                resposta.status_code,
+                time.perf_counter() - inicio,
+                g.get('metricas_consultas', 0),
+                g.get('metricas_tempo_banco', 0.0)
+            )
+        return resposta
+
+    @app.get('/metrics', endpoint='metricas')
+    def metricas():
+        """
+        Métricas da aplicação no formato de texto do Prometheus.
+        ---
+        tags:
+          - Métricas
+        responses:
+          200:
+            description: Requisições, latência, consultas ao banco e cache, por endpoint.
+        """
+        return Response(registro.exportar(), content_type=CONTENT_TYPE)
+
+    return app
@@ -0,0 +1,125 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, Optional
+from flask import request, current_app
+from sqlalchemy import tuple_
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 200
+
+
+@dataclass
+class Pagina:
+    """Resultado de uma consulta paginada: os itens e o cursor da próxima página."""
+    itens: list
+    next_cursor: Optional[str]
+
+
+def codificar_cursor(valores: list) -> str:
+    """Transforma os valores da chave do último item em um cursor opaco."""
+    payload = json.dumps(valores, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def _tipo(chave) -> Optional[type]:
+    """Tipo Python da coluna da chave, ou None quando a expressão não tem tipo."""
+    try:
+        return chave.type.python_type
+    except (AttributeError, NotImplementedError):
+        return None
+
+
+def _compativel(valor, tipo: Optional[type]) -> bool:
+    if tipo is None:
+        return True
+    if isinstance(valor, bool):
+        return tipo is bool
+    if tipo is float:
+        return isinstance(valor, (int, float))
+    return isinstance(valor, tipo)
+
+
+def decodificar_cursor(cursor: str, tamanho: int, tipos: Optional[list] = None) -> list:
+    """
+    Recupera os valores da chave a partir do cursor.
+
+    Levanta ValueError se o cursor estiver malformado, não corresponder à
+    quantidade de colunas da chave de ordenação ou, com `tipos` (tipo Python
+    de cada coluna, None para não verificar), tiver um valor de outro tipo.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        valores = json.loads(payload)
+    except (ValueError, TypeError):
+        raise ValueError('Cursor inválido')
+
+    if not isinstance(valores, list) or len(valores) != tamanho:
+        raise ValueError('Cursor inválido')
+    if tipos and not all(_compativel(valor, tipo) for valor, tipo in zip(valores, tipos)):
+        raise ValueError('Cursor inválido')
+    return valores
+
+
+def ler_parametros() -> tuple:
+    """
+    Lê os parâmetros `limit` e `cursor` da query string da requisição atual.
+
+    O limite é truncado no máximo configurado em `PAGINACAO_LIMITE_MAXIMO`.
+    Levanta ValueError se `limit` não for um inteiro positivo.
+    """
+    maximo = current_app.config.get('PAGINACAO_LIMITE_MAXIMO', LIMITE_MAXIMO)
+    padrao = current_app.config.get('PAGINACAO_LIMITE_PADRAO', LIMITE_PADRAO)
+
+    try:
+        limit = int(request.args.get('limit', padrao))
+        assert limit > 0
+    except (ValueError, AssertionError):
+        raise ValueError('Parâmetro limit inválido')
+
+    return min(limit, maximo), request.args.get('cursor') or None
+
+
+def ordenar(query, chaves: list, cursor: Optional[str] = None):
+    """
+    Ordena a query pela chave e, com cursor, mantém apenas os itens posteriores
+    ao último já entregue. Levanta ValueError se o cursor for inválido.
+    """
+    if cursor:
+        valores = decodificar_cursor(cursor, len(chaves), [_tipo(chave) for chave in chaves])
+        query = query.filter(tuple_(*chaves) > tuple_(*valores))
+    return query.order_by(None).order_by(*chaves)
+
+
+def paginar(query, chaves: list, limit: int, cursor: Optional[str] = None) -> Pagina:
+    """
+    Aplica paginação por chave (keyset) a uma query.
+
+    Parâmetros de Entrada:
+        - query : Query do SQLAlchemy com as entidades/colunas a retornar
+        - chaves : list (expressões que definem uma ordem total e única, ex.: [Livro.id])
+        - limit : int (tamanho da página)
+        - cursor : Optional[str] (cursor devolvido pela página anterior)
+
+    Retorno:
+        Objeto Pagina com os itens no formato da query original (entidade, ou
+        linha acessível pelos nomes das colunas, mesmo com uma única coluna) e o `next_cursor`, None na
+        última página.
+    """
+    largura = len(query.column_descriptions)
+    entidade = largura == 1 and query.column_descriptions[0]['expr'] is query.column_descriptions[0]['entity']
+
+    linhas = (
+        ordenar(query, chaves, cursor)
+        .add_columns(*[chave.label(f'_chave_{i}') for i, chave in enumerate(chaves)])
+        .limit(limit + 1)
+        .all()
+    )
+
+    proximo = None
+    if len(linhas) > limit:
+        linhas = linhas[:limit]
+        proximo = codificar_cursor(list(linhas[-1][largura:]))
+
+    itens: list[Any] = [linha[0] if entidade else linha for linha in linhas]
+    return Pagina(itens=itens, next_cursor=proximo)
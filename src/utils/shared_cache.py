@@ -0,0 +1,233 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from flask_caching.backends.base import BaseCache
+
+# Backend de cache compartilhado entre os processos (workers WSGI) de uma mesma
+# máquina. As entradas ficam em um arquivo SQLite em modo WAL com mmap, então
+# as leituras de todos os processos usam as mesmas páginas do page cache do
+# sistema operacional. Para usar: CACHE_TYPE = 'src.utils.shared_cache.SharedCache'.
+#
+# Os valores são desserializados com pickle: quem consegue escrever no arquivo
+# executa código nos workers. Por isso o arquivo fica, por padrão, na pasta
+# instance da aplicação, é criado com permissão 0600 e é recusado se pertencer
+# a outro usuário ou puder ser escrito pelo grupo ou por outros usuários.
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS cache (
+        chave TEXT PRIMARY KEY,
+        valor BLOB NOT NULL,
+        expira REAL NOT NULL,
+        acesso REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS cache_acesso ON cache(acesso)",
+    """
+    CREATE TABLE IF NOT EXISTS cache_estatisticas (
+        nome TEXT PRIMARY KEY,
+        valor INTEGER NOT NULL
+    )
+    """,
+)
+
+# Intervalo mínimo (s) entre atualizações do instante de acesso de uma chave;
+# evita uma escrita a cada leitura mantendo uma aproximação de LRU.
+_RESOLUCAO_ACESSO = 1.0
+
+# Quantidade de operações locais acumuladas antes de gravar os contadores
+_DESCARGA_ESTATISTICAS = 100
+
+# Quantidade de sets entre verificações do limite de tamanho
+_VERIFICAR_LIMITE_A_CADA = 32
+
+
+def _verificar_arquivo(path: str):
+    """
+    Cria o arquivo do cache com permissão 0600, se ainda não existir, e recusa
+    (PermissionError) um arquivo de outro usuário ou com escrita liberada ao
+    grupo ou a outros usuários.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+    try:
+        info = os.fstat(fd)
+    finally:
+        os.close(fd)
+
+    if hasattr(os, 'geteuid') and info.st_uid != os.geteuid():
+        raise PermissionError(f'Arquivo de cache {path} pertence a outro usuário')
+    if info.st_mode & 0o022:
+        raise PermissionError(f'Arquivo de cache {path} pode ser alterado por outros usuários')
+
+
+class SharedCache(BaseCache):
+    """
+    Cache LRU limitado por quantidade de itens, compartilhado entre processos.
+
+    :param path: arquivo SQLite usado como armazenamento (obrigatório).
+    :param threshold: quantidade máxima de itens antes do descarte dos menos
+                      usados recentemente.
+    :param default_timeout: timeout padrão em segundos (0 = nunca expira).
+    :param mmap_size: tamanho máximo (bytes) mapeado em memória pelo SQLite.
+    """
+
+    def __init__(self, path, threshold=10000, default_timeout=300, mmap_size=64 * 1024 * 1024):
+        super().__init__(default_timeout=default_timeout)
+        self.path = path
+        self.threshold = threshold
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._contadores = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._operacoes = 0
+        self._sets = 0
+
+        _verificar_arquivo(path)
+        with self._conexao() as conn:
+            for ddl in _SCHEMA:
+                conn.execute(ddl)
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        path = config.get('CACHE_SHARED_PATH')
+        if not path:
+            os.makedirs(app.instance_path, exist_ok=True)
+            path = os.path.join(app.instance_path, 'bookbridge-cache.db')
+        kwargs.update(
+            dict(
+                path=path,
+                threshold=config['CACHE_THRESHOLD'],
+            )
+        )
+        return cls(*args, **kwargs)
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Conexão por thread, reaberta após um fork (o pid muda)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _expiracao(self, timeout) -> float:
+        timeout = self._normalize_timeout(timeout)
+        return 0 if timeout == 0 else time.time() + timeout
+
+    def _contar(self, nome: str, quantidade: int = 1):
+        with self._lock:
+            self._contadores[nome] += quantidade
+            self._operacoes += 1
+            descarregar = self._operacoes >= _DESCARGA_ESTATISTICAS
+        if descarregar:
+            self._descarregar_estatisticas()
+
+    def _descarregar_estatisticas(self):
+        with self._lock:
+            contadores = self._contadores
+            self._contadores = {nome: 0 for nome in contadores}
+            self._operacoes = 0
+        self._conexao().executemany(
+            """
+            INSERT INTO cache_estatisticas(nome, valor) VALUES (?, ?)
+            ON CONFLICT(nome) DO UPDATE SET valor = valor + excluded.valor
+            """,
+            [item for item in contadores.items() if item[1]]
+        )
+
+    def _normalize_timeout(self, timeout):
+        timeout = super()._normalize_timeout(timeout)
+        return max(timeout, 0)
+
+    def get(self, key):
+        agora = time.time()
+        linha = self._conexao().execute(
+            'SELECT valor, expira, acesso FROM cache WHERE chave = ?', (key,)
+        ).fetchone()
+
+        if linha is None or (linha[1] and linha[1] <= agora):
+            self._contar('misses')
+            return None
+
+        if agora - linha[2] > _RESOLUCAO_ACESSO:
+            self._conexao().execute('UPDATE cache SET acesso = ? WHERE chave = ?', (agora, key))
+
+        self._contar('hits')
+        return pickle.loads(linha[0])
+
+    def set(self, key, value, timeout=None):
+        self._conexao().execute(
+            'INSERT OR REPLACE INTO cache(chave, valor, expira, acesso) VALUES (?, ?, ?, ?)',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expiracao(timeout), time.time())
+        )
+        self._sets += 1
+        if self._sets % _VERIFICAR_LIMITE_A_CADA == 0:
+            self._aplicar_limite()
+        return True
+
+    def add(self, key, value, timeout=None):
+        conn = self._conexao()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM cache WHERE chave = ? AND expira != 0 AND expira <= ?', (key, time.time()))
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO cache(chave, valor, expira, acesso) VALUES (?, ?, ?, ?)',
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expiracao(timeout), time.time())
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        return self._conexao().execute('DELETE FROM cache WHERE chave = ?', (key,)).rowcount == 1
+
+    def has(self, key):
+        return self._conexao().execute(
+            'SELECT 1 FROM cache WHERE chave = ? AND (expira = 0 OR expira > ?)', (key, time.time())
+        ).fetchone() is not None
+
+    def clear(self):
+        with self._lock:
+            self._contadores = {nome: 0 for nome in self._contadores}
+            self._operacoes = 0
+        conn = self._conexao()
+        conn.execute('DELETE FROM cache')
+        conn.execute('DELETE FROM cache_estatisticas')
+        return True
+
+    def _aplicar_limite(self):
+        """Remove as entradas expiradas e, se necessário, as menos usadas recentemente."""
+        conn = self._conexao()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            removidas = conn.execute(
+                'DELETE FROM cache WHERE expira != 0 AND expira <= ?', (time.time(),)
+            ).rowcount
+            excesso = conn.execute('SELECT count(*) FROM cache').fetchone()[0] - self.threshold
+            if excesso > 0:
+                removidas += conn.execute(
+                    'DELETE FROM cache WHERE chave IN (SELECT chave FROM cache ORDER BY acesso LIMIT ?)',
+                    (excesso,)
+                ).rowcount
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        if removidas:
+            self._contar('evictions', removidas)
+
+    def estatisticas(self) -> dict:
+        """Contadores somados de todos os processos e a quantidade atual de itens."""
+        self._descarregar_estatisticas()
+        conn = self._conexao()
+        dados = {'hits': 0, 'misses': 0, 'evictions': 0}
+        dados.update(conn.execute('SELECT nome, valor FROM cache_estatisticas').fetchall())
+        dados['itens'] = conn.execute('SELECT count(*) FROM cache').fetchone()[0]
+        return dados
@@ -0,0 +1,72 @@
+from typing import Optional
+from flask import request, current_app, stream_with_context
+from src.utils import pagination
+
+# Respostas em NDJSON (um objeto JSON por linha) para listagens grandes. As
+# linhas são lidas do banco em blocos (yield_per) e enviadas conforme são
+# serializadas, então o primeiro byte sai sem esperar o resultado completo e
+# a memória usada depende apenas do tamanho do bloco.
+
+NDJSON = 'application/x-ndjson'
+
+TAMANHO_BLOCO = 500
+
+
+def pedido_ndjson() -> bool:
+    """Indica se a requisição atual prefere NDJSON (Accept: application/x-ndjson)."""
+    return request.accept_mimetypes.best_match(['application/json', NDJSON]) == NDJSON
+
+
+def ler_limite() -> Optional[int]:
+    """
+    Lê o `limit` opcional do modo NDJSON: sem ele, todos os itens são enviados.
+    Levanta ValueError se não for um inteiro positivo.
+    """
+    if 'limit' not in request.args:
+        return None
+    try:
+        limit = int(request.args['limit'])
+        assert limit > 0
+    except (ValueError, AssertionError):
+        raise ValueError('Parâmetro limit inválido')
+    return limit
+
+
+def responder_ndjson(query, chaves: list, serializar, cursor: Optional[str] = None, limite: Optional[int] = None):
+    """
+    Monta a resposta NDJSON de uma listagem.
+
+    Parâmetros de Entrada:
+        - query : Query do SQLAlchemy com as entidades/colunas a retornar
+        - chaves : list (ordem total dos itens, a mesma da paginação)
+        - serializar : função que recebe um item da query e retorna um dict
+        - cursor : Optional[str] (cursor da paginação; envia os itens posteriores)
+        - limite : Optional[int] (quantidade máxima de itens)
+
+    O cursor é validado antes do início da resposta (ValueError). Um erro
+    durante o envio é registrado e sinalizado por uma última linha com `error`.
+    """
+    query = pagination.ordenar(query, chaves, cursor)
+    if limite is not None:
+        query = query.limit(limite)
+
+    tamanho = current_app.config.get('NDJSON_TAMANHO_BLOCO', TAMANHO_BLOCO)
+    dumps = current_app.json.dumps
+
+    def gerar():
+        linhas = []
+        try:
+            for item in query.yield_per(tamanho):
+                linhas.append(dumps(serializar(item)))
+                if len(linhas) >= tamanho:
+                    yield '\n'.join(linhas) + '\n'
+                    linhas = []
+            if linhas:
+                yield '\n'.join(linhas) + '\n'
+
+        except Exception as e:
+            current_app.logger.exception("Erro durante o envio em NDJSON: %s", e)
+            linhas.append(dumps({'error': 'Erro interno no servidor'}))
+            yield '\n'.join(linhas) + '\n'
+
+    return current_app.response_class(stream_with_context(gerar()), mimetype=NDJSON)
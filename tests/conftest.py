@@ -1,11 +1,14 @@
 import pytest
 from src.app import create_app
 from src.database.models import db
+from src.database import ratings, sintetico, duplicados
 from sqlalchemy.sql import text
 
 @pytest.fixture(scope='session')
 def setup_database():
-    app = create_app()
+    # Auditoria de consultas ligada: as respostas trazem X-Consultas-SQL e
+    # consultas repetidas ou lentas aparecem no log
+    app = create_app({'AUDITORIA_CONSULTAS': True})
     app.config['TESTING'] = True
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
@@ -20,11 +23,13 @@ def setup_database():
                 for statement in sql_statements.split(';'):
                     if statement.strip():
                         db.session.execute(text(statement))
+                ratings.reconstruir_resumos(db.session.connection())
+                duplicados.reconstruir_indice(db.session.connection())
                 db.session.commit()
             app.logger.info("Banco de dados com dados locais populado com sucesso")
             
         except Exception as e:
-            app.logger.error(f"Erro ao carregar dados de teste: {e}")
+            app.logger.error("Erro ao carregar dados de teste: %s", e)
             db.session.rollback()
             raise e
         
@@ -35,3 +40,12 @@ def setup_database():
 def client(setup_database):
     with setup_database.test_client() as client:
         yield client
+
+@pytest.fixture(scope='session')
+def banco_sintetico(tmp_path_factory):
+    """App com um banco próprio populado pelo gerador sintético (escala pequena)."""
+    caminho = tmp_path_factory.mktemp('sintetico') / 'sintetico.db'
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{caminho}', 'DATABASE_PERFIL': 'testing'})
+    with app.app_context():
+        app.config['SINTETICO_TOTAIS'] = sintetico.gerar(sintetico.Escala.pequena())
+    yield app
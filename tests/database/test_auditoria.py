@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy import text
+from src.database.models import db, Livro
+from src.database import auditoria
+
+def test_capturar_registra_comandos(setup_database):
+    with setup_database.app_context():
+        with auditoria.capturar() as relatorio:
+            db.session.execute(text('SELECT 1')).all()
+            Livro.query.filter_by(id='L019').first()
+        assert relatorio.total == 2
+        assert relatorio.tempo > 0
+        assert relatorio.comandos[0].sql == 'SELECT 1'
+        assert not relatorio.repetidos()
+
+def test_orcamento_detecta_excesso_e_repeticao(setup_database):
+    with setup_database.app_context():
+        with pytest.raises(AssertionError, match='Orçamento de 1 consultas excedido'):
+            with auditoria.orcamento(1):
+                Livro.query.filter_by(id='L019').first()
+                Livro.query.filter_by(id='L020').first()
+
+        # N+1: a mesma consulta, com os mesmos parâmetros, dentro de um laço
+        with pytest.raises(AssertionError, match='Consultas repetidas'):
+            with auditoria.orcamento(5):
+                for _ in range(3):
+                    db.session.execute(text('SELECT nome FROM livro WHERE id = :id'), {'id': 'L019'}).all()
+
+        with auditoria.orcamento(5, repetidos=True) as relatorio:
+            for _ in range(3):
+                db.session.execute(text('SELECT nome FROM livro WHERE id = :id'), {'id': 'L019'}).all()
+        assert list(relatorio.repetidos().values()) == [3]
+
+def test_comandos_lentos():
+    relatorio = auditoria.Relatorio([auditoria.Comando('SELECT 1', (), 0.2), auditoria.Comando('SELECT 2', (), 0.001)])
+    assert [comando.sql for comando in relatorio.lentos(0.1)] == ['SELECT 1']
@@ -133,4 +133,12 @@ def test_verificar_avaliacoes(setup_database):
 
     assert resultado[1].nickname == 'User2'
     assert resultado[1].descricao == 'AFF, queria saber se Betina traiu ou não, sou curiosa, vou dar uma nota menor pq gostaria de saber mais 😒'
-    assert resultado[1].estrelas == 4
\ No newline at end of file
+    assert resultado[1].estrelas == 4
+
+# Teste para a serialização gerada dos modelos
+def test_serializacao_livro(setup_database):
+    livro = db.session.get(Livro, 'L019')
+    assert livro.to_dict() == {c.name: getattr(livro, c.name) for c in Livro.__table__.columns}
+
+    linha = db.session.query(*Livro.colunas()).filter(Livro.id == 'L019').one()
+    assert Livro.linha_para_dict(linha) == livro.to_dict()
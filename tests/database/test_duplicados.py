@@ -0,0 +1,112 @@
+import json
+import pytest
+from sqlalchemy import select, func
+from src.app import create_app
+from src.database.models import (db, Livro, Adiciona, Avaliacao, AvaliacaoResumo, LivroAssinatura, RecomendacaoPendente,
+                                 RecomendacaoClubePendente)
+from src.database import duplicados, importacao
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    caminho = tmp_path_factory.mktemp('duplicados') / 'duplicados.db'
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{caminho}', 'DATABASE_PERFIL': 'testing'})
+    with app.app_context():
+        db.session.add_all([
+            Livro(id='D1', nome='Dom Casmurro', autor='Machado de Assis', genero='Romance'),
+            Livro(id='D2', nome='Dom Casmuro', autor='Machado de Assís', genero='Romance'),
+            Livro(id='D3', nome='dom casmurro.', autor='M. de Assis', genero='Romance'),
+            Livro(id='H1', nome='Harry Potter 1', autor='J. K. Rowling', genero='Fantasia'),
+            Livro(id='H2', nome='Harry Potter 2', autor='J. K. Rowling', genero='Fantasia'),
+            Livro(id='O1', nome='O Alienista', autor='Machado de Assis', genero='Conto'),
+        ])
+        db.session.commit()
+    yield app
+
+def test_similaridade():
+    assert duplicados.normalizar('  Memórias Póstumas, de Brás Cubas! ') == 'memorias postumas de bras cubas'
+    assert duplicados.similaridade('Memórias Póstumas de Brás Cubas', 'Machado de Assis',
+                                   'Memorias Postumas de Bras Cubas', 'machado de assis') == 1
+    assert duplicados.similaridade('Dom Casmurro', 'Machado de Assis', 'Dom Casmuro', 'Machado de Assís') >= duplicados.LIMIAR
+    assert duplicados.similaridade('Dom Casmurro', 'Machado de Assis', 'O Alienista', 'Machado de Assis') < duplicados.LIMIAR
+    # Volumes diferentes nunca são duplicados
+    assert duplicados.similaridade('Harry Potter 1', 'J. K. Rowling', 'Harry Potter 2', 'J. K. Rowling') == 0
+
+def test_chaves_deterministicas():
+    chaves = duplicados.chaves('Dom Casmurro', 'Machado de Assis')
+    assert len(chaves) == duplicados.NUM_BANDAS
+    assert chaves == duplicados.chaves('dom  casmurro', 'MACHADO DE ASSIS')
+    assert set(chaves) & set(duplicados.chaves('Dom Casmuro', 'Machado de Assís'))
+
+def test_procurar_pelo_indice(app):
+    with app.app_context():
+        # Índice mantido pelos eventos do ORM
+        assert db.session.scalar(select(func.count(func.distinct(LivroAssinatura.livro_id)))) == 6
+        conn = db.session.connection()
+        assert [id for id, *_ in duplicados.procurar(conn, 'Dom Casmurro', 'Machado de Assis')] == ['D1', 'D2', 'D3']
+        assert [id for id, *_ in duplicados.procurar(conn, 'Dom Casmurro', 'Machado de Assis', excluir='D1')] == ['D2', 'D3']
+        assert [id for id, *_ in duplicados.procurar(conn, 'Harry Potter 3', 'J. K. Rowling')] == []
+
+        livro = db.session.get(Livro, 'O1')
+        livro.nome = 'O Alienista (edição anotada)'
+        db.session.commit()
+        conn = db.session.connection()
+        assert [id for id, *_ in duplicados.procurar(conn, 'O Alienista: edição anotada', 'Machado de Assis')] == ['O1']
+
+def test_importacao_indexa_os_livros(app):
+    with app.app_context():
+        linhas = [json.dumps({'nome': 'Iracema', 'autor': 'José de Alencar', 'genero': 'Romance', 'descricao': 'x'}) + '\n']
+        assert importacao.importar_livros(linhas).importados == 1
+        assert [nome for _, nome, *_ in duplicados.procurar(db.session.connection(), 'Iracema.', 'Jose de Alencar')] == ['Iracema']
+
+def test_titulos_fora_do_alfabeto_latino(app):
+    assert duplicados.normalizar('Война и мир') == 'воина и мир'
+    assert set(duplicados.chaves('Война и мир', 'Толстой')) & set(duplicados.chaves('Война и мир.', 'Л. Толстой'))
+    # Sem letras nem números não há chaves (e o livro nunca é candidato)
+    assert duplicados.chaves('???', '...') == []
+
+    with app.app_context():
+        linhas = [json.dumps({'nome': nome, 'autor': autor, 'genero': 'Romance', 'descricao': 'x'}) + '\n'
+                  for nome, autor in (('Война и мир', 'Толстой'), ('!!!', '???'))]
+        assert importacao.importar_livros(linhas).importados == 2
+        conn = db.session.connection()
+        assert [nome for _, nome, *_ in duplicados.procurar(conn, 'Война и мир', 'Лев Толстой')] == ['Война и мир']
+        assert duplicados.procurar(conn, '!!!', '???') == []
+        db.session.rollback()
+
+def test_agrupar_e_mesclar(app):
+    with app.app_context():
+        db.session.add_all([
+            Avaliacao(avaliador_id='U1', livro_id='D1', estrelas=5, descricao='a'),
+            Avaliacao(avaliador_id='U2', livro_id='D2', estrelas=3, descricao='b'),
+            Avaliacao(avaliador_id='U3', livro_id='D2', estrelas=4, descricao='c'),
+            Avaliacao(avaliador_id='U1', livro_id='D3', estrelas=1, descricao='d'),
+            Adiciona(usuario_id='U1', clube_id='C1', livro_id='D2'),
+            Adiciona(usuario_id='U1', clube_id='C1', livro_id='D3'),
+        ])
+        db.session.commit()
+        db.session.execute(RecomendacaoPendente.__table__.delete())
+        db.session.execute(RecomendacaoClubePendente.__table__.delete())
+        db.session.commit()
+
+        with db.engine.begin() as conn:
+            grupos = duplicados.agrupar(conn)
+            # D2 tem mais avaliações e adições: vira o canônico
+            assert [(g.canonico, g.duplicados) for g in grupos] == [('D2', ['D1', 'D3'])]
+            mesclagem = duplicados.mesclar(conn, grupos)
+
+        assert mesclagem.livros_removidos == ['D1', 'D3'] and mesclagem.clubes == {'C1'}
+        assert not db.session.scalar(select(func.count()).select_from(Livro).where(Livro.id.in_(['D1', 'D3'])))
+        # U1 avaliou D1 e D3: apenas uma das avaliações passa para D2
+        avaliacoes = db.session.execute(select(Avaliacao.avaliador_id, Avaliacao.livro_id).order_by(Avaliacao.avaliador_id)).all()
+        assert avaliacoes == [('U1', 'D2'), ('U2', 'D2'), ('U3', 'D2')]
+        assert db.session.execute(select(Adiciona.clube_id, Adiciona.livro_id)).all() == [('C1', 'D2')]
+
+        resumo = db.session.get(AvaliacaoResumo, 'D2')
+        assert resumo.total == 3
+        assert not db.session.get(AvaliacaoResumo, 'D1')
+        assert not db.session.scalar(select(func.count()).select_from(LivroAssinatura).where(LivroAssinatura.livro_id.in_(['D1', 'D3'])))
+        assert ('U1', 'D2') in db.session.execute(select(RecomendacaoPendente.usuario_id, RecomendacaoPendente.livro_id)).all()
+        assert db.session.scalars(select(RecomendacaoClubePendente.clube_id)).all() == ['C1']
+
+        with db.engine.begin() as conn:
+            assert duplicados.agrupar(conn) == []
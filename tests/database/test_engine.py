@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from src.app import create_app
+from src.database.models import db
+from src.database import engine
+
+@pytest.fixture
+def app_producao(tmp_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'producao.db'}",
+        'DATABASE_PERFIL': 'production',
+    })
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+        engine.engine_leitura().dispose()
+
+def test_pragmas_do_perfil(app_producao):
+    with app_producao.app_context(), db.engine.connect() as conn:
+        assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert conn.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+        assert conn.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+        assert conn.execute(text('PRAGMA cache_size')).scalar() == -64000
+        assert conn.execute(text('PRAGMA query_only')).scalar() == 0
+
+def test_pool_do_perfil(app_producao):
+    with app_producao.app_context():
+        assert db.engine.pool.size() == engine.PERFIS['production']['pool']['pool_size']
+
+def test_engine_leitura_somente_leitura(app_producao):
+    with app_producao.app_context():
+        leitura = engine.engine_leitura()
+        assert leitura is not db.engine
+        with leitura.connect() as conn:
+            assert conn.execute(text('SELECT count(*) FROM livro')).scalar() == 0
+            with pytest.raises(OperationalError):
+                conn.execute(text("INSERT INTO livro (id, autor, nome) VALUES ('X', 'Autor', 'Livro')"))
+
+def test_perfil_desconhecido(tmp_path):
+    with pytest.raises(ValueError):
+        create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}", 'DATABASE_PERFIL': 'inexistente'})
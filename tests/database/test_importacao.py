@@ -0,0 +1,48 @@
+import json
+import pytest
+from src.database.models import Livro
+from src.database import importacao
+
+def _ndjson(quantidade, autor):
+    for i in range(quantidade):
+        yield json.dumps({'nome': f'Livro {i}', 'autor': autor, 'genero': 'Teste', 'descricao': 'Importado'}) + '\n'
+
+def test_importar_ndjson_em_lotes(setup_database):
+    relatorio = importacao.importar_livros(_ndjson(25, 'Autor Importacao Lotes'), tamanho_lote=10)
+    assert relatorio.importados == 25
+    assert relatorio.total_erros == 0
+    assert Livro.query.filter_by(autor='Autor Importacao Lotes').count() == 25
+
+def test_importar_csv(setup_database):
+    linhas = [
+        'nome,autor,genero,descricao\n',
+        'Livro CSV,Autor Importacao CSV,Teste,"Descrição, com vírgula"\n',
+    ]
+    relatorio = importacao.importar_livros(linhas, importacao.FORMATO_CSV)
+    assert relatorio.importados == 1
+    assert Livro.query.filter_by(autor='Autor Importacao CSV').one().descricao == 'Descrição, com vírgula'
+
+def test_erros_por_linha_nao_interrompem(setup_database):
+    linhas = [
+        '{"nome": "Valido 1", "autor": "Autor Importacao Erros", "genero": "Teste", "descricao": "x"}\n',
+        '{invalido\n',
+        '\n',
+        '{"nome": "Sem autor", "genero": "Teste", "descricao": "x"}\n',
+        json.dumps({'nome': 'N' * 300, 'autor': 'Autor Importacao Erros', 'genero': 'Teste', 'descricao': 'x'}) + '\n',
+        '[1, 2]\n',
+        '{"nome": "Valido 2", "autor": "Autor Importacao Erros", "genero": "Teste", "descricao": "x"}\n',
+    ]
+    relatorio = importacao.importar_livros(linhas, tamanho_lote=1)
+    assert relatorio.importados == 2
+    assert [erro['linha'] for erro in relatorio.erros] == [2, 4, 5, 6]
+    assert 'autor' in relatorio.erros[1]['erro']
+
+def test_limite_de_erros_detalhados(setup_database, monkeypatch):
+    monkeypatch.setattr(importacao, 'ERROS_MAXIMOS', 3)
+    relatorio = importacao.importar_livros(['{}\n'] * 10)
+    assert relatorio.total_erros == 10
+    assert len(relatorio.erros) == 3
+
+def test_formato_invalido(setup_database):
+    with pytest.raises(ValueError):
+        importacao.importar_livros([], 'xml')
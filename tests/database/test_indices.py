@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import create_engine, inspect
+from src.database.models import db, Usuario, Clube, Livro, Participa, Adiciona, AvaliacaoResumo, Avaliacao
+from src.database import ratings, migrations
+
+def _plano(query):
+    sql = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    return [linha[-1] for linha in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}'))]
+
+def _usa_indice(plano, tabela):
+    passos = [passo for passo in plano if passo.split()[1] == tabela]
+    assert passos, plano
+    return all(passo.startswith('SEARCH') and 'INDEX' in passo for passo in passos)
+
+# Listagem dos usuários de um clube (get_users_club)
+def test_plano_usuarios_do_clube(setup_database):
+    plano = _plano(db.session.query(Usuario).join(Participa).filter(Participa.clube_id == 'C001'))
+    assert _usa_indice(plano, 'participa'), plano
+
+# Listagem dos livros de um clube (list_club_books)
+def test_plano_livros_do_clube(setup_database):
+    plano = _plano(
+        db.session.query(Livro.id, Livro.nome, Livro.autor, ratings.MEDIA)
+        .join(Adiciona, Adiciona.livro_id == Livro.id)
+        .outerjoin(AvaliacaoResumo, AvaliacaoResumo.livro_id == Livro.id)
+        .filter(Adiciona.clube_id == 'C001')
+        .distinct()
+    )
+    assert _usa_indice(plano, 'adiciona'), plano
+    assert _usa_indice(plano, 'livro'), plano
+
+@pytest.mark.parametrize('query', [
+    lambda: Avaliacao.query.filter(Avaliacao.livro_id == 'L001'),
+    lambda: Adiciona.query.filter(Adiciona.livro_id == 'L001'),
+    lambda: Clube.query.filter(Clube.criador == 'U001'),
+])
+def test_plano_chaves_estrangeiras(setup_database, query):
+    plano = _plano(query())
+    tabela = query().statement.get_final_froms()[0].name
+    assert _usa_indice(plano, tabela), plano
+
+# Migração de um banco criado antes dos índices
+def test_migracao_aplica_indices(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "antigo.db"}')
+    with engine.begin() as conn:
+        for statement in open('./src/database/create_tables.sql').read().split(';'):
+            if statement.strip() and 'CREATE INDEX' not in statement:
+                conn.exec_driver_sql(statement)
+
+    assert migrations.indices_pendentes(engine)
+    criados = migrations.aplicar_indices(engine)
+    assert 'ix_participa_clube_id' in criados
+    assert migrations.indices_pendentes(engine) == []
+    assert 'ix_adiciona_livro_id' in {i['name'] for i in inspect(engine).get_indexes('adiciona')}
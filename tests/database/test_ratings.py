@@ -0,0 +1,72 @@
+from src.database.models import db, Avaliacao, AvaliacaoResumo, Livro
+from src.database import ratings
+
+def _resumo(livro_id):
+    db.session.expire_all()
+    return db.session.get(AvaliacaoResumo, livro_id)
+
+# Teste para garantir que o resumo bate com a agregação direta sobre avaliacao
+def test_resumo_populado(setup_database):
+    for livro_id, total, soma in db.session.query(
+        Avaliacao.livro_id, db.func.count(), db.func.sum(Avaliacao.estrelas)
+    ).group_by(Avaliacao.livro_id):
+        resumo = _resumo(livro_id)
+        assert (resumo.total, resumo.soma_estrelas) == (total, soma)
+        assert sum(resumo.histograma) == total
+
+# Teste para inclusão, alteração e remoção de avaliações
+def test_resumo_incremental(setup_database):
+    db.session.add(Livro(id='LRES1', autor='Autor', nome='Livro Resumo', genero='Teste'))
+    db.session.add_all([
+        Avaliacao(avaliador_id='U001', livro_id='LRES1', estrelas=5),
+        Avaliacao(avaliador_id='U002', livro_id='LRES1', estrelas=2),
+    ])
+    db.session.commit()
+
+    resumo = _resumo('LRES1')
+    assert (resumo.total, resumo.soma_estrelas, resumo.media) == (2, 7, 3.5)
+    assert resumo.histograma == [0, 0, 1, 0, 0, 1]
+
+    db.session.get(Avaliacao, ('U002', 'LRES1')).estrelas = 4
+    db.session.commit()
+    resumo = _resumo('LRES1')
+    assert (resumo.total, resumo.soma_estrelas) == (2, 9)
+    assert resumo.histograma == [0, 0, 0, 0, 1, 1]
+
+    db.session.delete(db.session.get(Avaliacao, ('U001', 'LRES1')))
+    db.session.commit()
+    resumo = _resumo('LRES1')
+    assert (resumo.total, resumo.soma_estrelas, resumo.media) == (1, 4, 4.0)
+
+# Teste para a reconstrução completa do resumo
+def test_reconstruir_resumos(setup_database):
+    antes = {r.livro_id: r.histograma for r in AvaliacaoResumo.query.all()}
+    ratings.reconstruir_resumos(db.session.connection())
+    db.session.commit()
+    db.session.expire_all()
+    depois = {r.livro_id: r.histograma for r in AvaliacaoResumo.query.all() if r.total}
+    assert depois == {livro_id: h for livro_id, h in antes.items() if sum(h)}
+
+# Teste para a inserção em lote, com o resumo atualizado uma vez por lote
+def test_inserir_avaliacoes_em_lote(setup_database):
+    db.session.add_all([
+        Livro(id='LLOTE1', autor='Autor', nome='Livro Lote 1', genero='Teste'),
+        Livro(id='LLOTE2', autor='Autor', nome='Livro Lote 2', genero='Teste'),
+    ])
+    db.session.commit()
+
+    conn = db.session.connection()
+    assert ratings.livros_inexistentes(conn, ['LLOTE1', 'LLOTE2', 'LLOTE3']) == {'LLOTE3'}
+
+    avaliacoes = [
+        {'avaliador_id': f'U00{i}', 'livro_id': 'LLOTE1', 'estrelas': i} for i in range(1, 5)
+    ] + [{'avaliador_id': 'U001', 'livro_id': 'LLOTE2', 'estrelas': 0, 'descricao': 'Ruim'}]
+    ratings.inserir_avaliacoes(conn, avaliacoes, tamanho_lote=2)
+    db.session.commit()
+
+    assert Avaliacao.query.filter(Avaliacao.livro_id.in_(['LLOTE1', 'LLOTE2'])).count() == 5
+    assert (_resumo('LLOTE1').total, _resumo('LLOTE1').soma_estrelas) == (4, 10)
+    assert _resumo('LLOTE2').histograma == [1, 0, 0, 0, 0, 0]
+    assert ratings.avaliacoes_existentes(
+        db.session.connection(), [('U001', 'LLOTE1'), ('U001', 'LLOTE2'), ('U005', 'LLOTE1')]
+    ) == {('U001', 'LLOTE1'), ('U001', 'LLOTE2')}
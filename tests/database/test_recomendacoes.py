@@ -0,0 +1,203 @@
+import math
+import pytest
+from collections import defaultdict
+from sqlalchemy import select, func
+from src.app import create_app
+from src.database.models import (db, Avaliacao, LivroSimilar, LivroNorma, RecomendacaoPendente, Participa, Adiciona, ClubeSimilar,
+                                 RecomendacaoClubePendente)
+from src.database import sintetico, recomendacoes
+from src.database import model_validation as validator
+
+pytest.importorskip('scipy')
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    caminho = tmp_path_factory.mktemp('recomendacoes') / 'recomendacoes.db'
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{caminho}', 'DATABASE_PERFIL': 'testing'})
+    with app.app_context():
+        sintetico.gerar(sintetico.Escala.pequena())
+        with db.engine.begin() as conn:
+            recomendacoes.reconstruir(conn)
+            recomendacoes.reconstruir_clubes(conn)
+    yield app
+
+def _vizinhos(livro_id):
+    linhas = db.session.query(LivroSimilar.similar_id, LivroSimilar.similaridade).filter(LivroSimilar.livro_id == livro_id)
+    return {similar_id: similaridade for similar_id, similaridade in linhas}
+
+def _cosseno_ajustado():
+    """Similaridades calculadas diretamente, sem matrizes esparsas."""
+    notas = defaultdict(dict)
+    for usuario, livro, estrelas in db.session.query(Avaliacao.avaliador_id, Avaliacao.livro_id, Avaliacao.estrelas):
+        notas[usuario][livro] = estrelas
+    colunas = defaultdict(dict)
+    for usuario, livros in notas.items():
+        media = sum(livros.values()) / len(livros)
+        for livro, estrelas in livros.items():
+            if estrelas != media:
+                colunas[livro][usuario] = estrelas - media
+
+    def similaridade(a, b):
+        produto = sum(valor * colunas[b].get(usuario, 0) for usuario, valor in colunas[a].items())
+        normas = math.sqrt(sum(v * v for v in colunas[a].values())) * math.sqrt(sum(v * v for v in colunas[b].values()))
+        return produto / normas if normas else 0
+    return colunas, similaridade
+
+def test_reconstruir_calcula_o_cosseno_ajustado(app):
+    with app.app_context():
+        colunas, similaridade = _cosseno_ajustado()
+        populares = sorted(colunas, key=lambda livro: -len(colunas[livro]))[:3]
+        for livro in populares:
+            esperado = sorted((s for outro in colunas if outro != livro and (s := similaridade(livro, outro)) > 1e-9), reverse=True)
+            obtido = sorted(_vizinhos(livro).values(), reverse=True)
+            assert len(obtido) == min(len(esperado), recomendacoes.K_VIZINHOS) > 0
+            assert obtido == pytest.approx(esperado[:len(obtido)])
+
+def _normas():
+    return dict(db.session.query(LivroNorma.livro_id, LivroNorma.norma))
+
+def test_atualizar_aplica_as_avaliacoes_pendentes(app, monkeypatch):
+    # A atualização não monta a matriz completa
+    monkeypatch.setattr(recomendacoes, '_matriz', None)
+    with app.app_context():
+        usuario = sintetico.usuario_id(7)
+        avaliados = set(db.session.scalars(select(Avaliacao.livro_id).where(Avaliacao.avaliador_id == usuario)))
+        novos = [livro for livro in (sintetico.livro_id(i) for i in range(50)) if livro not in avaliados][:3]
+        for livro, estrelas in zip(novos, (5, 0, 4)):
+            db.session.add(Avaliacao(avaliador_id=usuario, livro_id=livro, estrelas=estrelas, descricao='Nova'))
+        db.session.commit()
+        assert db.session.scalar(select(func.count()).select_from(RecomendacaoPendente)) == 3
+
+        with db.engine.begin() as conn:
+            alterados = recomendacoes.atualizar(conn)
+        assert set(novos) | avaliados <= set(alterados)
+        assert not db.session.scalar(select(func.count()).select_from(RecomendacaoPendente))
+
+        # Os livros afetados ficam iguais aos de uma reconstrução completa
+        incremental = {livro: _vizinhos(livro) for livro in novos}
+        normas = _normas()
+        monkeypatch.undo()
+        with db.engine.begin() as conn:
+            recomendacoes.reconstruir(conn)
+        for livro in novos:
+            assert sorted(incremental[livro].values()) == pytest.approx(sorted(_vizinhos(livro).values()))
+        assert normas == pytest.approx(_normas())
+
+        with db.engine.begin() as conn:
+            assert recomendacoes.atualizar(conn) == []
+
+def test_atualizar_sem_normas_gravadas(app):
+    with app.app_context():
+        # Banco anterior a livro_norma: as normas que faltam são calculadas no banco
+        db.session.execute(LivroNorma.__table__.delete())
+        usuario = sintetico.usuario_id(11)
+        avaliados = set(db.session.scalars(select(Avaliacao.livro_id).where(Avaliacao.avaliador_id == usuario)))
+        livro = next(livro for livro in (sintetico.livro_id(i) for i in range(50)) if livro not in avaliados)
+        db.session.add(Avaliacao(avaliador_id=usuario, livro_id=livro, estrelas=1, descricao='Nova'))
+        db.session.commit()
+
+        with db.engine.begin() as conn:
+            recomendacoes.atualizar(conn)
+        incremental = _vizinhos(livro)
+        with db.engine.begin() as conn:
+            recomendacoes.reconstruir(conn)
+        assert incremental == pytest.approx(_vizinhos(livro))
+
+def test_get_livros_similares(app):
+    client = app.test_client()
+    with app.app_context():
+        livro = db.session.scalar(select(LivroSimilar.livro_id).group_by(LivroSimilar.livro_id).order_by(func.count().desc()))
+
+    response = client.get(f'/livros/{livro}/similares?limit=5')
+    assert response.status_code == 200
+    similares = response.json['similares']
+    assert response.json['livro_id'] == livro and len(similares) == 5
+    assert [s['similaridade'] for s in similares] == sorted((s['similaridade'] for s in similares), reverse=True)
+    assert set(similares[0]) == {'id', 'nome', 'autor', 'similaridade'}
+
+    assert client.get(f'/livros/{livro}/similares?limit=0').status_code == 400
+    assert client.get('/livros/L9999999/similares').status_code == 404
+
+def test_get_recomendacoes_livros(app):
+    client = app.test_client()
+    usuario = sintetico.usuario_id(3)
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {validator.get_token(usuario)}'}
+        avaliados = set(db.session.scalars(select(Avaliacao.livro_id).where(Avaliacao.avaliador_id == usuario)))
+
+    response = client.get('/usuarios/recomendacoes/livros?limit=5', headers=headers)
+    assert response.status_code == 200
+    livros = response.json['livros']
+    assert 0 < len(livros) <= 5
+    assert not {livro['id'] for livro in livros} & avaliados
+    assert all(livro['pontuacao'] > 0 for livro in livros)
+
+    assert client.get('/usuarios/recomendacoes/livros?limit=51', headers=headers).status_code == 400
+
+def _clubes_vizinhos(clube_id):
+    linhas = db.session.query(ClubeSimilar.similar_id, ClubeSimilar.similaridade).filter(ClubeSimilar.clube_id == clube_id)
+    return {similar_id: similaridade for similar_id, similaridade in linhas}
+
+def test_reconstruir_clubes_combina_membros_e_livros(app):
+    with app.app_context():
+        membros, livros = defaultdict(set), defaultdict(set)
+        for usuario, clube in db.session.query(Participa.usuario_id, Participa.clube_id):
+            membros[clube].add(usuario)
+        for livro, clube in db.session.query(Adiciona.livro_id, Adiciona.clube_id):
+            livros[clube].add(livro)
+
+        def cosseno(a, b):
+            return len(a & b) / math.sqrt(len(a) * len(b)) if a and b else 0
+
+        clube = max(membros, key=lambda c: len(membros[c]))
+        esperado = {
+            outro: recomendacoes.PESO_MEMBROS * cosseno(membros[clube], membros[outro])
+            + recomendacoes.PESO_LIVROS * cosseno(livros[clube], livros[outro])
+            for outro in membros.keys() | livros.keys() if outro != clube
+        }
+        obtido = _clubes_vizinhos(clube)
+        assert len(obtido) == recomendacoes.K_VIZINHOS
+        for outro, similaridade in obtido.items():
+            assert similaridade == pytest.approx(esperado[outro])
+        assert min(obtido.values()) == pytest.approx(sorted(esperado.values(), reverse=True)[recomendacoes.K_VIZINHOS - 1])
+
+def test_atualizar_clubes_aplica_as_alteracoes(app, monkeypatch):
+    # A atualização não monta a matriz de todos os clubes
+    monkeypatch.setattr(recomendacoes, '_matriz_clubes', None)
+    with app.app_context():
+        clube, usuario = sintetico.clube_id(5), sintetico.usuario_id(299)
+        participa = db.session.get(Participa, (usuario, clube))
+        if participa:
+            db.session.delete(participa)
+        else:
+            db.session.add(Participa(usuario_id=usuario, clube_id=clube))
+        db.session.commit()
+        assert db.session.scalars(select(RecomendacaoClubePendente.clube_id)).all() == [clube]
+
+        with db.engine.begin() as conn:
+            assert clube in recomendacoes.atualizar_clubes(conn)
+        incremental = _clubes_vizinhos(clube)
+        monkeypatch.undo()
+        with db.engine.begin() as conn:
+            recomendacoes.reconstruir_clubes(conn)
+        assert incremental == pytest.approx(_clubes_vizinhos(clube))
+
+        with db.engine.begin() as conn:
+            assert recomendacoes.atualizar_clubes(conn) == []
+
+def test_get_recomendacoes_clubes(app):
+    client = app.test_client()
+    usuario = sintetico.usuario_id(3)
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {validator.get_token(usuario)}'}
+        meus = set(db.session.scalars(select(Participa.clube_id).where(Participa.usuario_id == usuario)))
+    assert meus
+
+    response = client.get('/usuarios/recomendacoes/clubes?limit=5', headers=headers)
+    assert response.status_code == 200
+    clubes = response.json['clubes']
+    assert 0 < len(clubes) <= 5
+    assert not {clube['id'] for clube in clubes} & meus
+    assert [c['pontuacao'] for c in clubes] == sorted((c['pontuacao'] for c in clubes), reverse=True)
+
+    assert client.get('/usuarios/recomendacoes/clubes?limit=x', headers=headers).status_code == 400
@@ -0,0 +1,97 @@
+import json
+import pytest
+from sqlalchemy import text
+from src.app import create_app
+from src.database.models import db, Livro, Usuario
+from src.database import engine
+from src.database import model_validation as validator
+
+@pytest.fixture
+def app_replica(tmp_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primario.db'}",
+        'DATABASE_REPLICA_URI': f"sqlite:///{tmp_path / 'replica.db'}",
+        'DATABASE_JANELA_ESCRITA': 60,
+    })
+    with app.app_context():
+        db.session.add(Usuario(id='U1', email='u1@example.com', nickname='u1', nome='U', sobrenome='Um', senha='x'))
+        db.session.add(Livro(id='L1', nome='Dom Casmurro', autor='Machado de Assis', genero='Romance'))
+        db.session.commit()
+        assert engine.sincronizar_replica()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+        engine.engine_leitura().dispose()
+
+def _inserir_no_primario(app, livro_id, nome):
+    with app.app_context():
+        db.session.add(Livro(id=livro_id, nome=nome, autor='Machado de Assis', genero='Romance'))
+        db.session.commit()
+
+def _nomes(response):
+    return sorted(livro['nome'] for livro in response.json['livros'])
+
+def test_get_le_da_replica(app_replica):
+    _inserir_no_primario(app_replica, 'L2', 'Memorias Postumas')
+    with app_replica.test_client() as client:
+        response = client.get('/livros/buscar?autor=Machado')
+        assert _nomes(response) == ['Dom Casmurro']
+
+    with app_replica.app_context():
+        engine.sincronizar_replica()
+    with app_replica.test_client() as client:
+        response = client.get('/livros/buscar?autor=Machado')
+        assert _nomes(response) == ['Dom Casmurro', 'Memorias Postumas']
+
+def test_cache_calculado_no_primario(app_replica):
+    _inserir_no_primario(app_replica, 'L3', 'Quincas Borba')
+    with app_replica.test_client() as client:
+        assert client.get('/livros/L3').status_code == 200
+
+def test_replica_recusa_escrita(app_replica):
+    with app_replica.app_context(), engine.engine_leitura().connect() as conn:
+        with pytest.raises(Exception):
+            conn.execute(text("DELETE FROM livro"))
+
+def test_read_your_writes(app_replica):
+    with app_replica.app_context():
+        token = validator.get_token('U1')
+
+    with app_replica.test_client() as client:
+        response = client.post('/livros', data=json.dumps({'nome': 'Helena', 'autor': 'Machado de Assis', 'genero': 'Romance', 'descricao': 'Romance'}),
+                               headers={'Authorization': f'Bearer {token}'}, content_type='application/json',
+                               environ_base={'REMOTE_ADDR': '10.0.0.1'})
+        assert response.status_code == 201
+
+        # Mesmo IP ou mesmo usuário que escreveu: lê do primário
+        response = client.get('/livros/buscar?autor=Machado', environ_base={'REMOTE_ADDR': '10.0.0.1'})
+        assert 'Helena' in _nomes(response)
+        response = client.get('/livros/buscar?autor=Machado', headers={'Authorization': f'Bearer {token}'},
+                              environ_base={'REMOTE_ADDR': '10.0.0.3'})
+        assert 'Helena' in _nomes(response)
+
+        # Outro cliente: lê da réplica, ainda sem o livro
+        response = client.get('/livros/buscar?autor=Machado', environ_base={'REMOTE_ADDR': '10.0.0.2'})
+        assert 'Helena' not in _nomes(response)
+
+def test_read_your_writes_avaliacoes_lote(app_replica):
+    with app_replica.app_context():
+        token = validator.get_token('U1')
+    # Livro apenas no primário: só aparece na busca se a leitura for para o primário
+    _inserir_no_primario(app_replica, 'L4', 'Esau e Jaco')
+
+    with app_replica.test_client() as client:
+        response = client.post('/livros/avaliar/lote', data=json.dumps({'avaliacoes': [{'livro_id': 'L1', 'descricao': 'Bom', 'estrelas': 4}]}),
+                               headers={'Authorization': f'Bearer {token}'}, content_type='application/json',
+                               environ_base={'REMOTE_ADDR': '10.0.0.1'})
+        assert response.status_code == 201
+
+        # As escritas em lote (Core) também abrem a janela de leitura no primário
+        response = client.get('/livros/buscar?autor=Machado', environ_base={'REMOTE_ADDR': '10.0.0.1'})
+        assert 'Esau e Jaco' in _nomes(response)
+        response = client.get('/livros/buscar?autor=Machado', headers={'Authorization': f'Bearer {token}'},
+                              environ_base={'REMOTE_ADDR': '10.0.0.3'})
+        assert 'Esau e Jaco' in _nomes(response)
+
+        response = client.get('/livros/buscar?autor=Machado', environ_base={'REMOTE_ADDR': '10.0.0.2'})
+        assert 'Esau e Jaco' not in _nomes(response)
@@ -0,0 +1,42 @@
+from src.database.models import db, Livro
+from src.database import search
+
+def _buscar_ids(**termos):
+    return [livro.id for livro in search.buscar_livros_fts(termos).all()]
+
+# Teste para garantir que o índice acompanha inserções na tabela livro
+def test_fts_insert(setup_database):
+    db.session.add(Livro(
+        id='LFTS1',
+        autor='José de Alencar',
+        nome='Iracema',
+        genero='Romance Indianista',
+        descricao='A virgem dos lábios de mel.'
+    ))
+    db.session.commit()
+
+    assert 'LFTS1' in _buscar_ids(nome='iracema')
+    assert 'LFTS1' in _buscar_ids(autor='jose alencar')
+    # Correspondência por início de palavra, não por trecho
+    assert 'LFTS1' in _buscar_ids(genero='indian')
+    assert 'LFTS1' not in _buscar_ids(genero='dianista')
+
+# Teste para garantir que o índice acompanha atualizações
+def test_fts_update(setup_database):
+    livro = db.session.get(Livro, 'LFTS1')
+    livro.nome = 'Ubirajara'
+    db.session.commit()
+
+    assert 'LFTS1' not in _buscar_ids(nome='iracema')
+    assert 'LFTS1' in _buscar_ids(nome='ubiraj')
+
+# Teste para garantir que o índice acompanha remoções
+def test_fts_delete(setup_database):
+    db.session.delete(db.session.get(Livro, 'LFTS1'))
+    db.session.commit()
+
+    assert 'LFTS1' not in _buscar_ids(nome='ubirajara')
+
+def test_montar_consulta_fts():
+    assert search.montar_consulta_fts({'nome': 'Dom "Casmurro"', 'autor': None}) == 'nome : ("Dom"* "Casmurro"*)'
+    assert search.montar_consulta_fts({'nome': '!!!'}) == ''
@@ -0,0 +1,59 @@
+from collections import Counter
+from sqlalchemy import func, select
+from src.database.models import db, Usuario, Clube, Livro, Participa, Adiciona, Avaliacao, AvaliacaoResumo
+from src.database import sintetico
+
+def test_mesma_semente_gera_os_mesmos_dados():
+    escala = sintetico.Escala.pequena()
+    assert list(sintetico.adicoes(escala)) == list(sintetico.adicoes(escala))
+    assert list(sintetico.avaliacoes(escala)) != list(sintetico.avaliacoes(sintetico.Escala.pequena(semente=7)))
+
+    # Cada tabela tem o próprio gerador: mais avaliações não alteram os clubes
+    assert list(sintetico.participacoes(escala)) == list(sintetico.participacoes(sintetico.Escala.pequena(avaliacoes_por_usuario=50)))
+
+def test_assimetria_de_zipf():
+    escala = sintetico.Escala.pequena()
+    tamanhos = sorted(Counter(p['clube_id'] for p in sintetico.participacoes(escala)).values(), reverse=True)
+    assert tamanhos[0] > 10 * tamanhos[len(tamanhos) // 2]
+
+    popularidade = Counter(a['livro_id'] for a in sintetico.avaliacoes(escala))
+    mais_avaliados = sum(total for _, total in popularidade.most_common(escala.livros // 100))
+    # 1% dos livros concentra mais de 10% das avaliações (seriam ~1% sem assimetria)
+    assert mais_avaliados > 0.1 * sum(popularidade.values())
+
+def test_distintos_sem_repeticao():
+    zipf = sintetico.Zipf(100, 1.1)
+    aleatorio = sintetico.random.Random(1)
+    for quantidade in (10, 90, 150):
+        escolhidos = zipf.distintos(aleatorio, quantidade)
+        assert len(escolhidos) == len(set(escolhidos)) == min(quantidade, 100)
+
+def test_tamanhos_redistribui_o_excesso():
+    zipf = sintetico.Zipf(1000, 1.1)
+    tamanhos = zipf.tamanhos(20000, 100)
+    # Os mais pesados ficam no limite e o excesso vai para os demais: a média se mantém
+    assert max(tamanhos) == tamanhos[0] == 100
+    assert abs(sum(tamanhos) - 20000) < 0.01 * 20000
+    assert tamanhos == sorted(tamanhos, reverse=True)
+
+def test_gerar_grava_em_lotes(banco_sintetico):
+    totais = banco_sintetico.config['SINTETICO_TOTAIS']
+    with banco_sintetico.app_context():
+        for modelo in (Usuario, Clube, Livro, Participa, Adiciona, Avaliacao):
+            assert db.session.scalar(select(func.count()).select_from(modelo)) == totais[modelo.__tablename__] > 0
+
+        # Chaves estrangeiras válidas e criadores participando dos próprios clubes
+        assert not db.session.scalar(select(func.count()).select_from(Adiciona).where(Adiciona.livro_id.not_in(select(Livro.id))))
+        assert not db.session.scalar(
+            select(func.count()).select_from(Clube)
+            .outerjoin(Participa, (Participa.clube_id == Clube.id) & (Participa.usuario_id == Clube.criador))
+            .where(Participa.usuario_id.is_(None))
+        )
+        assert db.session.scalar(select(func.sum(AvaliacaoResumo.total))) == totais['avaliacao']
+
+def test_api_sobre_banco_sintetico(banco_sintetico):
+    cliente = banco_sintetico.test_client()
+    assert cliente.get(f'/livros/{sintetico.livro_id(0)}').status_code == 200
+    assert cliente.get(f'/clube/{sintetico.clube_id(0)}/livros').json['livros']
+    login = cliente.get('/usuarios/login/', json={'email': 'u1@bookbridge.com', 'senha': sintetico.SENHA})
+    assert login.status_code == 200
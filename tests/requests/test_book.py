@@ -1,5 +1,6 @@
 import pytest
 import json
+from src.utils import pagination
 
 @pytest.fixture(scope='function')
 def user_token(client):
@@ -28,6 +29,33 @@ def test_post_livro(client, user_token):
     assert 'message' in response.json
     assert response.json['message'] == 'Livro criado com sucesso'
 
+def test_post_livro_duplicado(client, user_token):
+    livro = {"nome": "Dom Casmuro", "autor": "Machado de Assís", "genero": "Romance", "descricao": "Cópia"}
+    headers = {'Authorization': f'Bearer {user_token}'}
+
+    # Padrão: cria o livro e lista os parecidos
+    response = client.post('/livros', data=json.dumps(livro), headers=headers, content_type='application/json')
+    assert response.status_code == 201
+    assert response.json['duplicados'][0]['id'] == 'L017'
+
+    client.application.config['LIVRO_DUPLICADOS'] = 'rejeitar'
+    try:
+        response = client.post('/livros', data=json.dumps(livro), headers=headers, content_type='application/json')
+        assert response.status_code == 409
+        assert {'L017'} < {item['id'] for item in response.json['duplicados']}
+
+        response = client.post('/livros', data=json.dumps({**livro, 'forcar': True}), headers=headers, content_type='application/json')
+        assert response.status_code == 201
+    finally:
+        client.application.config['LIVRO_DUPLICADOS'] = 'sinalizar'
+
+def test_post_livro_titulo_nao_latino(client, user_token):
+    headers = {'Authorization': f'Bearer {user_token}'}
+    for nome, autor in (('Война и мир', 'Лев Толстой'), ('...', '???')):
+        response = client.post('/livros', data=json.dumps({'nome': nome, 'autor': autor, 'genero': 'Romance', 'descricao': 'x'}),
+                               headers=headers, content_type='application/json')
+        assert response.status_code == 201
+
 def test_get_livro(client):
     response = client.get('/livros/L019')
     assert response.status_code == 200
@@ -56,3 +84,195 @@ def test_post_avaliacao(client, user_token):
     assert response.status_code == 201
     assert 'message' in response.json
     assert response.json['message'] == 'Avaliação realizada com sucesso'
+
+def test_get_livros_fulltext_ordenado_por_relevancia(client):
+    response = client.get('/livros/buscar?nome=cortico')
+    assert response.status_code == 200
+    assert response.json['livros'][0]['id'] == 'L019'
+
+def test_get_livros_substring(client):
+    response = client.get('/livros/buscar?autor=Machado&modo=substring')
+    assert response.status_code == 200
+    assert all('Machado' in livro['autor'] for livro in response.json['livros'])
+
+def test_get_livros_fulltext_sem_palavras(client):
+    # Termos só com pontuação não geram consulta FTS: a busca volta para o LIKE
+    for nome in ('%22', '-', '%2A'):
+        response = client.get(f'/livros/buscar?modo=fulltext&nome={nome}')
+        assert response.status_code == 200
+
+def test_get_livros_modo_invalido(client):
+    response = client.get('/livros/buscar?autor=Machado&modo=regex')
+    assert response.status_code == 400
+
+def test_get_livros_paginado(client):
+    completo = client.get('/livros/buscar?autor=Machado de Assis&modo=substring').json['livros']
+
+    livros, cursor = [], ''
+    while True:
+        response = client.get(f'/livros/buscar?autor=Machado de Assis&modo=substring&limit=1&cursor={cursor}')
+        assert response.status_code == 200
+        assert len(response.json['livros']) <= 1
+        livros += response.json['livros']
+        if not (cursor := response.json['next_cursor']):
+            break
+
+    assert [livro['id'] for livro in livros] == [livro['id'] for livro in completo]
+
+def test_get_livros_fulltext_paginado(client):
+    completo = client.get('/livros/buscar?genero=romance').json['livros']
+    primeira = client.get('/livros/buscar?genero=romance&limit=2').json
+    segunda = client.get(f"/livros/buscar?genero=romance&limit=2&cursor={primeira['next_cursor']}").json
+
+    assert [l['id'] for l in primeira['livros'] + segunda['livros']] == [l['id'] for l in completo[:4]]
+
+def test_get_livros_paginacao_invalida(client):
+    assert client.get('/livros/buscar?autor=Machado&limit=0').status_code == 400
+    assert client.get('/livros/buscar?autor=Machado&cursor=invalido').status_code == 400
+    # Cursor com a quantidade certa de valores, mas tipos diferentes da chave (rank, id)
+    cursor = pagination.codificar_cursor([1, 2])
+    assert client.get(f'/livros/buscar?autor=Machado&cursor={cursor}').status_code == 400
+    cursor = pagination.codificar_cursor([1])
+    assert client.get(f'/livros/buscar?autor=Machado&modo=substring&cursor={cursor}').status_code == 400
+
+def test_get_livro_inexistente_cache_negativo(client):
+    from sqlalchemy import event
+    from src.database.models import db
+
+    assert client.get('/livros/NAOEXISTE').status_code == 404
+
+    consultas = []
+    contar = lambda *args: consultas.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', contar)
+    try:
+        response = client.get('/livros/NAOEXISTE')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', contar)
+
+    assert response.status_code == 404
+    assert not [sql for sql in consultas if 'FROM livro' in sql]
+
+def test_get_livro_condicional(client):
+    response = client.get('/livros/L019')
+    assert response.status_code == 200
+    assert (etag := response.headers.get('ETag'))
+    assert response.headers.get('Last-Modified')
+
+    response = client.get('/livros/L019', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+def test_get_livros_buscar_condicional(client):
+    response = client.get('/livros/buscar?autor=Machado')
+    assert (etag := response.headers.get('ETag'))
+    assert client.get('/livros/buscar?autor=Machado', headers={'If-None-Match': etag}).status_code == 304
+
+def test_importar_livros(client, user_token):
+    corpo = '\n'.join([
+        json.dumps({'nome': 'Importado 1', 'autor': 'Autor Importacao HTTP', 'genero': 'Teste', 'descricao': 'x'}),
+        '{"nome": "Sem campos"}',
+        json.dumps({'nome': 'Importado 2', 'autor': 'Autor Importacao HTTP', 'genero': 'Teste', 'descricao': 'x'}),
+    ])
+    response = client.post('/livros/importar', data=corpo, content_type='application/x-ndjson',
+                           headers={'Authorization': f'Bearer {user_token}'})
+    assert response.status_code == 201
+    assert response.json['importados'] == 2
+    assert response.json['erros'] == [{'linha': 2, 'erro': 'O campo de autor não foi preenchido'}]
+
+    response = client.get('/livros/buscar?autor=Autor Importacao HTTP')
+    assert sorted(livro['nome'] for livro in response.json['livros']) == ['Importado 1', 'Importado 2']
+
+def test_importar_livros_csv(client, user_token):
+    corpo = 'nome,autor,genero,descricao\nImportado CSV,Autor Importacao HTTP CSV,Teste,x\n'
+    response = client.post('/livros/importar', data=corpo, content_type='text/csv',
+                           headers={'Authorization': f'Bearer {user_token}'})
+    assert response.status_code == 201
+    assert response.json['importados'] == 1
+
+def test_importar_livros_invalido(client, user_token):
+    response = client.post('/livros/importar?formato=xml', data='', headers={'Authorization': f'Bearer {user_token}'})
+    assert response.status_code == 400
+    response = client.post('/livros/importar', data='{}\n', content_type='application/x-ndjson',
+                           headers={'Authorization': f'Bearer {user_token}'})
+    assert response.status_code == 400
+    assert response.json['importados'] == 0
+
+def _avaliar_lote(client, user_token, avaliacoes):
+    return client.post('/livros/avaliar/lote', data=json.dumps({'avaliacoes': avaliacoes}),
+                       headers={'Authorization': f'Bearer {user_token}'}, content_type='application/json')
+
+def test_post_avaliacoes_lote(client, user_token):
+    response = _avaliar_lote(client, user_token, [
+        {'livro_id': 'L020', 'estrelas': 4, 'descricao': 'Bom'},
+        {'livro_id': 'L021', 'estrelas': 0, 'descricao': 'Não gostei'},
+    ])
+    assert response.status_code == 201
+    assert response.json['total'] == 2
+
+    # Os pares já existem: o lote inteiro é rejeitado
+    response = _avaliar_lote(client, user_token, [
+        {'livro_id': 'L022', 'estrelas': 3, 'descricao': 'Ok'},
+        {'livro_id': 'L020', 'estrelas': 5, 'descricao': 'De novo'},
+    ])
+    assert response.status_code == 409
+    assert response.json['livros'] == ['L020']
+
+def test_post_avaliacoes_lote_invalido(client, user_token):
+    response = _avaliar_lote(client, user_token, [])
+    assert response.status_code == 400
+
+    response = _avaliar_lote(client, user_token, [{'livro_id': 'L022', 'estrelas': 6, 'descricao': 'x'}])
+    assert response.status_code == 400
+
+    response = _avaliar_lote(client, user_token, [{'livro_id': 'L022', 'estrelas': True, 'descricao': 'x'}])
+    assert response.status_code == 400
+
+    response = _avaliar_lote(client, user_token, [
+        {'livro_id': 'L022', 'estrelas': 3, 'descricao': 'x'},
+        {'livro_id': 'L022', 'estrelas': 4, 'descricao': 'y'},
+    ])
+    assert response.status_code == 400
+    assert response.json['livros'] == ['L022']
+
+    response = _avaliar_lote(client, user_token, [
+        {'livro_id': 'L022', 'estrelas': 3, 'descricao': 'x'},
+        {'livro_id': 'NAOEXISTE', 'estrelas': 4, 'descricao': 'y'},
+    ])
+    assert response.status_code == 404
+    assert response.json['livros'] == ['NAOEXISTE']
+
+def _ndjson(response):
+    return [json.loads(linha) for linha in response.get_data(as_text=True).splitlines()]
+
+def test_get_livros_ndjson(client):
+    paginado = client.get('/livros/buscar?autor=Machado&modo=substring&limit=200').json['livros']
+
+    response = client.get('/livros/buscar?autor=Machado&modo=substring', headers={'Accept': 'application/x-ndjson'})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+    assert _ndjson(response) == paginado
+
+    response = client.get(f'/livros/buscar?autor=Machado&modo=substring&limit=1', headers={'Accept': 'application/x-ndjson'})
+    assert _ndjson(response) == paginado[:1]
+
+    response = client.get('/livros/buscar?autor=Machado&cursor=invalido', headers={'Accept': 'application/x-ndjson'})
+    assert response.status_code == 400
+
+def test_get_livros_fields(client):
+    response = client.get('/livros/buscar?autor=Machado&modo=substring&fields=nome,id')
+    assert response.status_code == 200
+    assert response.json['livros']
+    assert all(list(livro) == ['id', 'nome'] for livro in response.json['livros'])
+
+    response = client.get('/livros/buscar?autor=Machado&modo=substring&fields=id', headers={'Accept': 'application/x-ndjson'})
+    assert all(list(livro) == ['id'] for livro in _ndjson(response))
+
+    assert client.get('/livros/buscar?autor=Machado&fields=senha').status_code == 400
+    assert client.get('/livros/buscar?autor=Machado&fields=,').status_code == 400
+
+def test_get_livro_fields(client):
+    response = client.get('/livros/L019?fields=nome')
+    assert response.status_code == 200
+    assert response.json['livro'] == {'nome': "O Cortiço"}
+    assert client.get('/livros/L019?fields=isbn').status_code == 400
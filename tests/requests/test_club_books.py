@@ -51,3 +51,62 @@ def test_delete_club_books(client, user_token):
     assert response.status_code == 200
     assert 'message' in response.json
     assert response.json['message'] == 'Livro removido com sucesso do grupo'
+
+def test_get_club_books_media_avaliacoes(client):
+    from src.database.models import db, Avaliacao
+
+    response = client.get('/clube/C001/livros')
+    assert response.status_code == 200
+
+    for livro in response.json['livros']:
+        media = db.session.query(db.func.avg(Avaliacao.estrelas)).filter(Avaliacao.livro_id == livro['id']).scalar()
+        assert livro['media_avaliacoes'] == media
+
+def test_get_club_books_condicional(client, user_token):
+    etag = client.get('/clube/C003/livros').headers['ETag']
+    assert client.get('/clube/C003/livros', headers={'If-None-Match': etag}).status_code == 304
+
+    client.post(
+        '/clube/livros',
+        data=json.dumps({"clube_id": "C003", "livro_id": "L016"}),
+        headers={'Authorization': f'Bearer {user_token}'},
+        content_type='application/json'
+    )
+    response = client.get('/clube/C003/livros', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert 'L016' in [livro['id'] for livro in response.json['livros']]
+
+    client.delete(
+        '/clube/livros',
+        data=json.dumps({"clube_id": "C003", "livro_id": "L016"}),
+        headers={'Authorization': f'Bearer {user_token}'},
+        content_type='application/json'
+    )
+
+def test_get_club_books_ndjson(client):
+    paginado = client.get('/clube/C001/livros').json['livros']
+    response = client.get('/clube/C001/livros', headers={'Accept': 'application/x-ndjson'})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert [json.loads(linha) for linha in response.get_data(as_text=True).splitlines()] == paginado
+
+    # A resposta em streaming não substitui a entrada JSON do cache
+    assert client.get('/clube/C001/livros').json['livros'] == paginado
+
+def test_get_club_books_fields(client):
+    completo = client.get('/clube/C001/livros').json['livros']
+    response = client.get('/clube/C001/livros?fields=id,media_avaliacoes')
+    assert response.status_code == 200
+    assert response.json['livros'] == [
+        {'id': livro['id'], 'media_avaliacoes': livro['media_avaliacoes']} for livro in completo
+    ]
+    assert client.get('/clube/C001/livros?fields=genero').status_code == 400
+
+def test_get_club_books_fields_ndjson(client):
+    # Livros diferentes com os mesmos valores nos campos pedidos continuam em linhas separadas
+    paginado = client.get('/clube/C001/livros?fields=media_avaliacoes').json['livros']
+    response = client.get('/clube/C001/livros?fields=media_avaliacoes', headers={'Accept': 'application/x-ndjson'})
+    assert response.status_code == 200
+    assert [json.loads(linha) for linha in response.get_data(as_text=True).splitlines()] == paginado
+    assert len(paginado) == len(client.get('/clube/C001/livros').json['livros'])
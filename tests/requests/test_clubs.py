@@ -44,6 +44,13 @@ def test_find_clubs(client):
         assert 'clubes' in response.json
         assert isinstance(response.json['clubes'], list)
 
+def test_find_clubs_ndjson(client):
+    response = client.get('/clubes/buscar?nome=Clube', headers={'Accept': 'application/x-ndjson'})
+    assert response.status_code == 200
+    clubes = [json.loads(linha) for linha in response.get_data(as_text=True).splitlines()]
+    assert clubes and all('Clube' in clube['nome'] for clube in clubes)
+    assert [clube['id'] for clube in clubes] == sorted(clube['id'] for clube in clubes)
+
 def test_update_club(client, user_token):
     club_id = "C001"
     data = {
@@ -71,3 +78,10 @@ def test_delete_club(client, user_token):
     if response.status_code == 200:
         assert 'message' in response.json
         assert response.json['message'] == 'Clube deletado com sucesso'
+
+def test_find_clubs_fields(client):
+    response = client.get('/clubes/buscar?nome=Clube&fields=nome')
+    assert response.status_code == 200
+    assert response.json['clubes']
+    assert all(list(clube) == ['nome'] for clube in response.json['clubes'])
+    assert client.get('/clubes/buscar?nome=Clube&fields=senha').status_code == 400
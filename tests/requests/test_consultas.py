@@ -0,0 +1,60 @@
+import pytest
+import json
+from src.database import auditoria
+
+# Orçamento de comandos SQL por endpoint. Com a auditoria ligada no conftest,
+# uma rota que passe a consultar mais (ou a repetir a mesma consulta) falha aqui.
+
+@pytest.fixture(scope='function')
+def user_token(client):
+    login_data = {
+        "email": "user1@example.com",
+        "senha": "Senha@123"
+    }
+    response = client.get('/usuarios/login/', data=json.dumps(login_data),
+                           content_type='application/json')
+    assert (token := response.json.get('token'))
+    return token
+
+@pytest.mark.parametrize('url, maximo', [
+    ('/livros/L019', 1),
+    ('/livros/buscar?autor=Machado', 1),
+    ('/livros/buscar?autor=Machado&modo=substring', 1),
+    ('/clubes/C002', 1),
+    ('/clubes/buscar?nome=Clube', 1),
+    ('/clube/C002/livros', 2),
+    ('/usuarios/clube/C002', 2),
+])
+def test_orcamento_consultas_get(client, url, maximo):
+    # Cache vazio: conta as consultas da própria rota
+    client.application.cache.clear()
+    with auditoria.orcamento(maximo):
+        response = client.get(url)
+    assert response.status_code == 200
+    assert int(response.headers['X-Consultas-SQL']) <= maximo
+
+def test_orcamento_consultas_club_books(client, user_token):
+    data = json.dumps({"clube_id": "C003", "livro_id": "L016"})
+    headers = {'Authorization': f'Bearer {user_token}'}
+    # Carrega o usuário do token no cache de autenticação
+    assert client.get('/usuarios', headers=headers).status_code == 200
+
+    # Validação (clube, livro, participação) + escrita (livro e fila de
+    # recomendações), sem recarregar o usuário depois do commit
+    with auditoria.orcamento(5):
+        response = client.post('/clube/livros', data=data, headers=headers, content_type='application/json')
+    assert response.status_code == 200
+
+    with auditoria.orcamento(6):
+        response = client.delete('/clube/livros', data=data, headers=headers, content_type='application/json')
+    assert response.status_code == 200
+
+def test_orcamento_consultas_post_club(client, user_token):
+    with auditoria.orcamento(4):
+        response = client.post(
+            '/clubes',
+            data=json.dumps({'nome': 'Clube Orçamento', 'descricao': 'Clube do teste de consultas'}),
+            headers={'Authorization': f'Bearer {user_token}'},
+            content_type='application/json'
+        )
+    assert response.status_code == 200
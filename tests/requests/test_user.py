@@ -91,4 +91,68 @@ def test_delete_user(client, user_token):
         '/usuarios', headers={'Authorization': f'Bearer {user_token}'})
     assert response.status_code == 200
     assert 'message' in response.json
-    
\ No newline at end of file
+    
+def test_find_user_cache_negativo_invalidado_na_criacao(client):
+    novo_usuario = {
+        "email": "negativo@example.com",
+        "senha": "Senha@123",
+        "nickname": "nicknegativo",
+        "nome": "Nega",
+        "sobrenome": "Tivo"
+    }
+    token = client.post('/usuarios', data=json.dumps({**novo_usuario, "nickname": "outronick"}),
+                        content_type='application/json').json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    assert client.get('/usuarios/nicknegativo', headers=headers).status_code == 404
+
+    response = client.put('/usuarios', headers=headers, data=json.dumps({"nickname": "nicknegativo"}),
+                          content_type='application/json')
+    assert 'nickname' in response.json['atualizados']
+
+    response = client.get('/usuarios/nicknegativo', headers=headers)
+    assert response.status_code == 200
+    assert response.json['nickname'] == 'nicknegativo'
+    assert client.get('/usuarios/outronick', headers=headers).status_code == 404
+
+def test_usuario_autenticado_em_cache(client, setup_database, monkeypatch):
+    import jwt
+    from sqlalchemy import event
+    from src.database.models import db
+    from src.utils import cache
+
+    token = client.post('/usuarios', data=json.dumps({
+        "email": "cacheado@example.com", "senha": "Senha@123", "nickname": "cacheado",
+        "nome": "Cache", "sobrenome": "Ado"
+    }), content_type='application/json').json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/usuarios', headers=headers).status_code == 200
+
+    decodificacoes, consultas = [], []
+    decode = jwt.decode
+    monkeypatch.setattr(jwt, 'decode', lambda *a, **k: decodificacoes.append(1) or decode(*a, **k))
+    contar = lambda *args: consultas.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', contar)
+    try:
+        response = client.get('/usuarios', headers=headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', contar)
+
+    assert response.status_code == 200
+    assert response.json['nickname'] == 'cacheado'
+    assert not decodificacoes
+    # A senha não fica no cache: só é lida do banco porque a rota a devolve
+    assert len(consultas) == 1 and 'usuario.senha' in consultas[0] and 'usuario.nome' not in consultas[0]
+
+    # O usuário fica no cache da aplicação (compartilhado entre os processos)
+    with setup_database.test_request_context():
+        user_id = jwt.decode(token, options={'verify_signature': False})['user_id']
+        dados = cache.obter(cache.chave(cache.AUTENTICACAO, user_id))
+    assert dados['nickname'] == 'cacheado' and 'senha' not in dados
+
+    # Alterações e remoção invalidam o usuário em cache
+    client.put('/usuarios', headers=headers, data=json.dumps({"nome": "Novo"}), content_type='application/json')
+    assert client.get('/usuarios', headers=headers).json['nome'] == 'Novo'
+
+    assert client.delete('/usuarios', headers=headers).status_code == 200
+    assert client.get('/usuarios', headers=headers).status_code == 401
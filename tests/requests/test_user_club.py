@@ -47,3 +47,18 @@ def test_delete_user_clubs(client, user_token):
     elif response.status_code == 404:
         assert 'error' in response.json
         assert response.json['error'] == 'Clube não encontrado' or response.json['error'] == 'Não existe um registro de participação'
+
+def test_users_club_cache_invalidado(client, user_token):
+    clube_id = "C002"
+    headers = {'Authorization': f'Bearer {user_token}'}
+
+    def ids():
+        return [user['id'] for user in client.get(f'/usuarios/clube/{clube_id}').json.get('users', [])]
+
+    assert 'U001' not in ids()
+
+    assert client.post(f'/usuarios/clube/{clube_id}', headers=headers).status_code == 201
+    assert 'U001' in ids()
+
+    assert client.delete(f'/usuarios/clube/{clube_id}', headers=headers).status_code == 200
+    assert 'U001' not in ids()
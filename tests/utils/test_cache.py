@@ -0,0 +1,84 @@
+from src.utils import cache
+
+def test_chave_estavel_ate_invalidar(setup_database):
+    with setup_database.app_context():
+        primeira = cache.chave(cache.CLUBE_LIVROS, 'CX', 50, '')
+        assert cache.chave(cache.CLUBE_LIVROS, 'CX', 50, '') == primeira
+
+        cache.salvar(primeira, {'livros': []})
+        assert cache.obter(primeira) == {'livros': []}
+
+        cache.invalidar(cache.CLUBE_LIVROS, 'CX')
+        segunda = cache.chave(cache.CLUBE_LIVROS, 'CX', 50, '')
+        assert segunda != primeira
+        assert cache.obter(segunda) is None
+
+def test_invalidar_isola_namespaces_e_ids(setup_database):
+    with setup_database.app_context():
+        outro_id = cache.chave(cache.CLUBE_LIVROS, 'CY')
+        outro_namespace = cache.chave(cache.CLUBE, 'CX')
+
+        cache.invalidar(cache.CLUBE_LIVROS, 'CX')
+
+        assert cache.chave(cache.CLUBE_LIVROS, 'CY') == outro_id
+        assert cache.chave(cache.CLUBE, 'CX') == outro_namespace
+
+def test_single_flight_calcula_uma_vez(setup_database):
+    import threading, time
+
+    chamadas = []
+    def calcular():
+        chamadas.append(1)
+        time.sleep(0.1)
+        return 'resultado'
+
+    resultados = []
+    def requisicao():
+        with setup_database.app_context():
+            resultados.append(cache.single_flight('chave-sf', calcular))
+
+    threads = [threading.Thread(target=requisicao) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert resultados == ['resultado'] * 8
+    assert len(chamadas) == 1
+
+def test_cacheado_serve_stale_e_recalcula(setup_database):
+    from flask import Flask, jsonify
+    from flask_caching import Cache
+
+    app = Flask(__name__)
+    app.config.update(CACHE_TYPE='SimpleCache', CACHE_DEFAULT_TIMEOUT=60)
+    app.cache = Cache(app)
+    chamadas = []
+
+    @app.route('/recurso/<id>')
+    @cache.cacheado('teste', 'id', timeout=1, stale=60)
+    def recurso(id):
+        chamadas.append(id)
+        return jsonify(versao=len(chamadas)), 200
+
+    client = app.test_client()
+    assert client.get('/recurso/1').json == {'versao': 1}
+    assert client.get('/recurso/1').json == {'versao': 1}
+    assert len(chamadas) == 1
+
+    with app.test_request_context():
+        chave_atual = cache.chave('teste', '1')
+        entrada = cache.obter(chave_atual)
+        entrada['atual_ate'] = 0
+        cache.salvar(chave_atual, entrada)
+
+        # Outra requisição já recalculando: a entrada vencida é servida
+        voo, _ = cache._entrar_no_voo(chave_atual)
+    assert client.get('/recurso/1').json == {'versao': 1}
+    assert len(chamadas) == 1
+    cache._sair_do_voo(chave_atual, voo)
+
+    # Sem ninguém recalculando, esta requisição recalcula
+    assert client.get('/recurso/1').json == {'versao': 2}
+    assert client.get('/recurso/1').json == {'versao': 2}
+    assert len(chamadas) == 2
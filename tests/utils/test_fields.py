@@ -0,0 +1,19 @@
+import pytest
+from flask import Flask
+from src.utils import fields
+
+PERMITIDOS = ['id', 'nome', 'autor']
+
+def _ler(query):
+    with Flask(__name__).test_request_context(query):
+        return fields.ler_campos(PERMITIDOS)
+
+def test_ler_campos():
+    assert _ler('/') is None
+    assert _ler('/?fields=autor, id') == ['id', 'autor']
+
+def test_ler_campos_invalidos():
+    with pytest.raises(ValueError):
+        _ler('/?fields=')
+    with pytest.raises(ValueError):
+        _ler('/?fields=id,senha')
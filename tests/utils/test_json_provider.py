@@ -0,0 +1,31 @@
+import json
+import uuid
+from datetime import datetime, timezone
+from flask.json.provider import DefaultJSONProvider
+from src.utils import json_provider
+
+def test_mesma_saida_do_provider_padrao(setup_database):
+    padrao = DefaultJSONProvider(setup_database)
+    dados = {
+        'b': [1, 2.5, None, True],
+        'a': 'Memórias Póstumas',
+        'data': datetime(2024, 11, 11, 10, 0, tzinfo=timezone.utc),
+        'id': uuid.UUID(int=1),
+    }
+    assert json.loads(setup_database.json.dumps(dados)) == json.loads(padrao.dumps(dados))
+    # Chaves ordenadas, como no provider padrão
+    assert list(json.loads(setup_database.json.dumps({'b': 1, 'a': 2}))) == ['a', 'b']
+    assert json.loads(setup_database.json.dumps({1: 'x'})) == {'1': 'x'}
+
+def test_response(setup_database):
+    with setup_database.test_request_context():
+        response = setup_database.json.response(livros=[{'nome': 'Iracema'}])
+    assert response.mimetype == 'application/json'
+    assert response.get_data() == '{"livros":[{"nome":"Iracema"}]}\n'.encode()
+
+def test_argumentos_do_json_padrao(setup_database):
+    assert setup_database.json.dumps({'a': 1}, indent=4) == json.dumps({'a': 1}, indent=4, sort_keys=True)
+
+def test_sem_orjson(setup_database, monkeypatch):
+    monkeypatch.setattr(json_provider, 'orjson', None)
+    assert setup_database.json.loads(setup_database.json.dumps({'a': 'ç'})) == {'a': 'ç'}
@@ -0,0 +1,53 @@
+import logging
+from flask import Flask
+from src.utils import logs
+
+def _app(tmp_path, **config):
+    app = Flask('teste_logs')
+    app.config.update({
+        'LOG_ARQUIVO': str(tmp_path / 'app.log'),
+        'LOG_NIVEL': 'DEBUG',
+        'LOG_TAMANHO_MAXIMO': 10 * 1024 * 1024,
+        'LOG_BACKUPS': 2,
+        'LOG_AMOSTRAGEM': {},
+        'LOG_CONSOLE': False,
+        'LOG_ASSINCRONO': True,
+        **config
+    })
+    return app
+
+def _registro(nivel):
+    return logging.LogRecord('teste', nivel, __file__, 1, 'mensagem %s', ('x',), None)
+
+def test_amostragem_por_nivel():
+    filtro = logs.Amostragem({'INFO': 0, 'DEBUG': 1})
+    assert not filtro.filter(_registro(logging.INFO))
+    assert filtro.filter(_registro(logging.DEBUG))
+    assert filtro.filter(_registro(logging.ERROR))
+
+def test_fila_nao_formata_na_thread_da_requisicao():
+    registro = _registro(logging.INFO)
+    assert logs.FilaHandler(None).prepare(registro) is registro
+    assert registro.msg == 'mensagem %s' and registro.args == ('x',)
+
+def test_log_assincrono_grava_no_arquivo(tmp_path):
+    app = _app(tmp_path, LOG_AMOSTRAGEM={'DEBUG': 0})
+    listener = logs.configurar(app)
+    app.logger.info('Livro %s encontrado', 'L001')
+    app.logger.debug('descartado pela amostragem')
+    logs._parar(listener)
+
+    conteudo = (tmp_path / 'app.log').read_text(encoding='utf-8')
+    assert 'Livro L001 encontrado' in conteudo
+    assert 'descartado' not in conteudo
+
+def test_reconfigurar_substitui_handlers_e_rotaciona(tmp_path):
+    logs.configurar(_app(tmp_path))
+    app = _app(tmp_path, LOG_ASSINCRONO=False, LOG_TAMANHO_MAXIMO=200)
+    assert logs.configurar(app) is None
+    assert len([h for h in app.logger.handlers if isinstance(h, (logs.FilaHandler, logging.FileHandler))]) == 1
+
+    for i in range(20):
+        app.logger.info('linha de log número %d', i)
+    assert (tmp_path / 'app.log.1').exists()
+    assert not (tmp_path / 'app.log.3').exists()
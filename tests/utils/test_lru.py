@@ -0,0 +1,23 @@
+import time
+from src.utils.lru import LRUCache
+
+def test_descarta_menos_usado():
+    cache = LRUCache(tamanho=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+
+def test_expiracao():
+    cache = LRUCache(tamanho=10, timeout=0.05)
+    cache.set('a', 1)
+    cache.set('b', 2, timeout=10)
+    time.sleep(0.06)
+
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
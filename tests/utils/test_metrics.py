@@ -0,0 +1,32 @@
+from src.utils import metrics
+
+def test_histograma_acumula_buckets():
+    registro = metrics.Registro()
+    registro.registrar_requisicao('livros.get_livro', 'GET', 200, 0.003, 2, 0.001)
+    registro.registrar_requisicao('livros.get_livro', 'GET', 404, 0.2, 1, 0.0005)
+    texto = registro.exportar()
+
+    rotulos = 'endpoint="livros.get_livro",metodo="GET"'
+    assert f'bookbridge_requisicao_duracao_segundos_bucket{{{rotulos},le="0.005"}} 1' in texto
+    assert f'bookbridge_requisicao_duracao_segundos_bucket{{{rotulos},le="0.25"}} 2' in texto
+    assert f'bookbridge_requisicao_duracao_segundos_bucket{{{rotulos},le="+Inf"}} 2' in texto
+    assert f'bookbridge_requisicao_duracao_segundos_count{{{rotulos}}} 2' in texto
+    assert 'bookbridge_requisicoes_total{endpoint="livros.get_livro",metodo="GET",status="404"} 1' in texto
+    assert 'bookbridge_consultas_banco_total{endpoint="livros.get_livro"} 3' in texto
+
+def test_endpoint_metrics(client):
+    client.get('/livros/L019')
+    client.get('/livros/L019')
+    client.get('/livros/buscar?autor=Machado')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    texto = response.get_data(as_text=True)
+
+    assert 'bookbridge_requisicoes_total{endpoint="livros.get_livro",metodo="GET",status="200"}' in texto
+    assert 'bookbridge_requisicao_duracao_segundos_count{endpoint="livros.get_livros",metodo="GET"}' in texto
+    assert 'bookbridge_cache_total{namespace="livro",resultado="hit"}' in texto
+    consultas = [linha for linha in texto.splitlines() if linha.startswith('bookbridge_consultas_banco_total{endpoint="livros.get_livros"}')]
+    assert consultas and int(consultas[0].split()[-1]) > 0
+    assert 'endpoint="metricas"' not in texto
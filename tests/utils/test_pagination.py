@@ -0,0 +1,33 @@
+import pytest
+from src.database.models import Livro
+from src.utils import pagination
+
+def test_cursor_ida_e_volta():
+    cursor = pagination.codificar_cursor([-1.5e-06, 'L001'])
+    assert pagination.decodificar_cursor(cursor, 2) == [-1.5e-06, 'L001']
+
+def test_cursor_invalido():
+    with pytest.raises(ValueError):
+        pagination.decodificar_cursor('nao-e-um-cursor', 1)
+    with pytest.raises(ValueError):
+        pagination.decodificar_cursor(pagination.codificar_cursor(['L001']), 2)
+
+def test_cursor_com_tipos_da_chave():
+    tipos = [float, str]
+    assert pagination.decodificar_cursor(pagination.codificar_cursor([-2, 'L001']), 2, tipos) == [-2, 'L001']
+    for valores in ([1, 2], ['L001', 'L002'], [True, 'L001'], [None, 'L001']):
+        with pytest.raises(ValueError):
+            pagination.decodificar_cursor(pagination.codificar_cursor(valores), 2, tipos)
+
+def test_paginar_percorre_todos_os_registros(setup_database):
+    esperados = [livro.id for livro in Livro.query.order_by(Livro.id).all()]
+
+    ids, cursor = [], None
+    while True:
+        pagina = pagination.paginar(Livro.query, [Livro.id], 3, cursor)
+        assert len(pagina.itens) <= 3
+        ids += [livro.id for livro in pagina.itens]
+        if not (cursor := pagina.next_cursor):
+            break
+
+    assert ids == esperados
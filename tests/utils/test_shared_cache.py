@@ -0,0 +1,79 @@
+import os
+import multiprocessing
+import time
+import pytest
+from src.utils.shared_cache import SharedCache
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'cache.db')
+
+def _gravar(path):
+    SharedCache(path=path).set('livro:L001', {'nome': 'Dom Casmurro'})
+
+def test_compartilhado_entre_processos(cache_path):
+    processo = multiprocessing.get_context('fork').Process(target=_gravar, args=(cache_path,))
+    processo.start()
+    processo.join()
+
+    assert SharedCache(path=cache_path).get('livro:L001') == {'nome': 'Dom Casmurro'}
+
+def test_add_e_expiracao(cache_path):
+    cache = SharedCache(path=cache_path)
+    assert cache.add('chave', 1)
+    assert not cache.add('chave', 2)
+    assert cache.get('chave') == 1
+
+    cache.set('temporaria', 'x', timeout=1)
+    assert cache.has('temporaria')
+    time.sleep(1.1)
+    assert cache.get('temporaria') is None
+    assert cache.add('temporaria', 'y')
+
+def test_descarte_lru_e_contadores(cache_path):
+    cache = SharedCache(path=cache_path, threshold=10)
+    for i in range(40):
+        cache.set(f'chave_{i}', i)
+        cache.get(f'chave_{i}')
+    cache.get('inexistente')
+
+    estatisticas = cache.estatisticas()
+    assert estatisticas['itens'] <= 10 + 32
+    assert estatisticas['evictions'] >= 30 - 10
+    assert estatisticas['hits'] >= 40 - estatisticas['evictions']
+    assert estatisticas['misses'] >= 1
+    assert cache.get('chave_39') == 39
+
+def test_selecionado_pela_configuracao(cache_path):
+    from src.app import create_app
+    app = create_app({'CACHE_TYPE': 'src.utils.shared_cache.SharedCache', 'CACHE_SHARED_PATH': cache_path})
+    with app.app_context():
+        assert isinstance(app.cache.cache, SharedCache)
+
+def test_arquivo_protegido(cache_path):
+    SharedCache(path=cache_path)
+    assert os.stat(cache_path).st_mode & 0o777 == 0o600
+
+    # Arquivo que outros usuários podem alterar é recusado
+    os.chmod(cache_path, 0o666)
+    with pytest.raises(PermissionError):
+        SharedCache(path=cache_path)
+
+def test_caminho_padrao_na_pasta_instance(tmp_path):
+    from flask import Flask
+    from flask_caching import Cache
+    app = Flask(__name__, instance_path=str(tmp_path / 'instance'))
+    app.config.update(CACHE_TYPE='src.utils.shared_cache.SharedCache', CACHE_THRESHOLD=100)
+    cache = Cache(app)
+    with app.app_context():
+        assert cache.cache.path == str(tmp_path / 'instance' / 'bookbridge-cache.db')
+
+def test_clear_zera_contadores(cache_path):
+    cache = SharedCache(path=cache_path)
+    cache.set('chave', 1)
+    cache.get('chave')
+    cache.get('inexistente')
+    assert cache.estatisticas()['hits'] == 1
+
+    cache.clear()
+    assert cache.estatisticas() == {'hits': 0, 'misses': 0, 'evictions': 0, 'itens': 0}